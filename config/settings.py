@@ -3,6 +3,7 @@ import os
 # Configuración de detección
 DETECTION_CONFIDENCE_THRESHOLD = 0.5
 NMS_THRESHOLD = 0.4
+DETECTION_BATCH_SIZE = 8  # Frames por llamada al modelo en inferencia por lotes
 
 # Buscar el archivo YOLO en diferentes ubicaciones
 POSSIBLE_YOLO_PATHS = [
@@ -25,12 +26,91 @@ for path in POSSIBLE_YOLO_PATHS:
 if YOLO_MODEL_PATH is None:
     YOLO_MODEL_PATH = "data/yolov8n.pt"
 
+# Backend de inferencia: "pytorch", "onnx" u "openvino". Los backends
+# exportados se generan una vez junto a los pesos y se reutilizan.
+MODEL_BACKEND = "pytorch"
+MODEL_IMAGE_SIZE = 640
+MODEL_WARMUP_RUNS = 3
+
+# Detección por mosaicos para cámaras 1080p/4K con personas pequeñas
+TILED_DETECTION_ENABLED = False
+TILE_SIZE = 640
+TILE_OVERLAP = 0.2  # Fracción de superposición entre mosaicos vecinos
+# Regiones de interés por cámara o video: {fuente: [(x1, y1, x2, y2), ...]}
+# Solo se procesan los mosaicos que cubren esas regiones
+CAMERA_ROIS = {}
+
+# Control adaptativo de resolución y salto de frames según la latencia medida
+ADAPTIVE_CONTROL_ENABLED = False
+ADAPTIVE_TARGET_LATENCY_MS = 66  # Costo de detección objetivo por frame (~15 FPS)
+ADAPTIVE_IMAGE_SIZES = (320, 416, 512, 640)  # Tamaños de entrada permitidos
+ADAPTIVE_MAX_STRIDE = 4  # Detectar como mínimo cada N frames
+
+# Compuerta de movimiento (opcional): omitir YOLO en frames estáticos
+MOTION_GATE_ENABLED = False
+MOTION_THRESHOLD = 0.005  # Fracción de píxeles cambiados para ejecutar el detector
+MOTION_REFRESH_INTERVAL = 30  # Forzar detección cada N frames
+MOTION_DOWNSCALE_WIDTH = 160  # Ancho de la imagen reducida para comparar
+
+# Tracker: "simple" (último centroide) o "kalman" (predictivo, tipo SORT)
+TRACKER_TYPE = "simple"
+# Costo de asociación: "centroid", "iou" o "combined" (IoU + distancia normalizada)
+TRACKING_COST = "centroid"
+TRACKING_IOU_WEIGHT = 0.5  # Peso del IoU en el costo "combined"
+# Radio de compuerta relativo al tamaño de la caja; None usa MAX_TRACKING_DISTANCE (px)
+TRACKING_GATE_SCALE = None
+
+# Líneas virtuales de entrada/salida. Si hay alguna, la ocupación es
+# entradas - salidas en lugar de las personas visibles. Cruzar de derecha a
+# izquierda (mirando del primer punto al segundo) es entrada; 'invert' lo cambia.
+# Ejemplo: [{'name': 'puerta', 'points': (400, 0, 400, 720), 'invert': False}]
+COUNTING_LINES = []
+TRAJECTORY_LENGTH = 32  # Posiciones recientes guardadas por track
+
+# Zonas poligonales por cámara o video, cada una con su propio conteo y capacidad:
+# {fuente: [{'name': 'fila', 'points': [(x, y), ...], 'capacity': 10}, ...]}
+CAMERA_ZONES = {}
+
+# Historial de ocupación en memoria (acotado)
+HISTORY_CAPACITY = 200000  # Registros máximos (~20 bytes cada uno)
+HISTORY_RETENTION_HOURS = 168  # Antigüedad máxima de los registros
+HISTORY_RAW_WINDOW_MINUTES = 60  # Registros recientes guardados sin reducir
+HISTORY_DOWNSAMPLE_SECONDS = 60  # Un registro por intervalo para datos antiguos
+HISTORY_SNAPSHOT_INTERVAL = 1000  # Llegadas/salidas de IDs entre instantáneas completas
+
+# Historial durable (SQLite en modo WAL) escrito por lotes en segundo plano;
+# al reiniciar, la aplicación retoma la sesión guardada
+OCCUPANCY_STORE_ENABLED = True
+OCCUPANCY_DB_PATH = "output/occupancy.db"
+OCCUPANCY_STORE_BATCH_SIZE = 500
+
+# Alertas de ocupación: para bajar de nivel hay que quedar por debajo del
+# umbral menos la histéresis, y un nivel debe sostenerse un tiempo mínimo
+ALERT_HYSTERESIS = 0.05  # Fracción de la capacidad
+ALERT_MIN_DWELL_SECONDS = 2.0
+ALERT_RATE_LIMIT_SECONDS = 60.0  # Intervalo mínimo entre alertas del mismo nivel
+ALERT_WEBHOOK_URL = None  # p. ej. "http://127.0.0.1:8080/alertas"; None lo desactiva
+
 # Configuración de cámara
 DEFAULT_CAMERA_INDEX = 0
 FRAME_WIDTH = 1280
 FRAME_HEIGHT = 720
 FPS = 30
 
+# Configuración de análisis offline
+OFFLINE_DECODE_QUEUE_SIZE = 16  # Frames decodificados en espera de detección
+OFFLINE_WORKERS = 1  # Procesos en paralelo (>1 divide el video en segmentos)
+OFFLINE_SEGMENT_OVERLAP = 30  # Frames para calentar el tracker en cada borde
+
+# Sitio con varias cámaras (src/multi_main.py): modelos compartidos entre fuentes
+MULTI_SOURCE_WORKERS = 2  # Workers de detección, cada uno con un modelo cargado
+MULTI_SOURCE_BATCH_SIZE = 8  # Frames máximos por lote (uno por fuente)
+MULTI_SOURCE_PROCESSES = False  # Workers en procesos, con frames en memoria compartida
+
+# Filtros aplicados al video en vivo antes de dibujar (src/preprocessing/filter_chain.py).
+# Nombres o (nombre, {parámetros}); ejemplo: ['denoise', ('clahe', {'clip_limit': 2.0})]
+LIVE_FILTER_CHAIN = []
+
 # Configuración de UI
 WINDOW_TITLE = "Sistema de Detección y Conteo de Personas"
 UI_UPDATE_INTERVAL = 50  # ms
@@ -1,19 +1,44 @@
 import cv2
+import numpy as np
 import threading
 import time
+from src.capture.frame_buffer import FrameRingBuffer
 
 class CameraCapture:
-    def __init__(self, source=0, width=1280, height=720):
+    def __init__(self, source=0, width=1280, height=720, buffer_slots=4, transport=None,
+                 source_index=0):
+        """
+        Inicializa la captura de una cámara o un archivo de video.
+
+        Args:
+            source (int | str): Índice de cámara o ruta del video
+            width (int): Ancho de captura
+            height (int): Alto de captura
+            buffer_slots (int): Slots del buffer local de frames
+            transport (SharedFrameTransport): Transporte opcional hacia procesos de
+                                              detección; si se indica, los frames se
+                                              decodifican directamente en él y no en
+                                              el buffer local
+            source_index (int): Índice de esta fuente en los mensajes del transporte
+        """
         self.source = source
         self.width = width
         self.height = height
         self.cap = None
-        self.frame = None
+        self.buffer_slots = buffer_slots
+        self.buffer = None  # Buffer local; solo se reserva si no hay transporte
         self.running = False
+        self.finished = False  # Un archivo de video llegó al final
+        self.frame_interval = 0.0
         self.thread = None
         self.fps = 0
         self.frame_count = 0
         self.start_time = time.time()
+
+        self.transport = transport
+        self.source_index = source_index
+        self.sequence = -1  # Último frame publicado en el transporte
+        self.dropped_frames = 0  # Frames descartados por falta de slots en el transporte
     
     def initialize(self):
         """Inicializa la cámara."""
@@ -25,6 +50,13 @@ class CameraCapture:
             self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
             self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
             self.cap.set(cv2.CAP_PROP_FPS, 30)
+            if self.transport is None and self.buffer is None:
+                self.buffer = FrameRingBuffer(self.buffer_slots, self.width, self.height)
+
+            # Un archivo se reproduce a su velocidad real para simular una cámara
+            if isinstance(self.source, str):
+                file_fps = self.cap.get(cv2.CAP_PROP_FPS)
+                self.frame_interval = 1.0 / file_fps if file_fps > 0 else 0.0
             
             return True
         except Exception as e:
@@ -45,10 +77,23 @@ class CameraCapture:
     
     def _capture_loop(self):
         """Bucle de captura de frames."""
+        next_frame_time = time.time()
         while self.running:
-            ret, frame = self.cap.read()
+            if self.frame_interval:
+                delay = next_frame_time - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                next_frame_time = max(next_frame_time + self.frame_interval, time.time() - 1.0)
+
+            if self.transport is not None:
+                ret = self._publish_frame()
+            else:
+                # Decodificar directamente sobre el siguiente slot del buffer
+                index, slot = self.buffer.get_write_slot()
+                ret, frame = self.cap.read(slot)
+                if ret:
+                    self.buffer.commit(index, frame, time.time())
             if ret:
-                self.frame = frame.copy()
                 self.frame_count += 1
                 
                 # Calcular FPS
@@ -57,12 +102,71 @@ class CameraCapture:
                     self.fps = self.frame_count / elapsed_time
                     self.frame_count = 0
                     self.start_time = time.time()
+            elif isinstance(self.source, str):
+                self.finished = True
+                break
             else:
                 time.sleep(0.01)
     
-    def get_frame(self):
-        """Obtiene el frame actual."""
-        return self.frame.copy() if self.frame is not None else None
+    def _publish_frame(self):
+        """
+        Decodifica el siguiente frame sobre un slot del transporte y lo publica.
+
+        Returns:
+            bool: True si se leyó un frame (publicado o descartado)
+        """
+        index = self.transport.acquire()
+        if index is None:
+            # Sin slots libres: se avanza la fuente sin decodificar
+            self.dropped_frames += 1
+            return self.cap.grab()
+
+        slot = self.transport.slot(index)
+        ret, frame = self.cap.read(slot)
+        if not ret:
+            self.transport.release(index)
+            return False
+
+        if not np.may_share_memory(frame, slot):
+            # Resolución distinta a la del transporte
+            if frame.shape == slot.shape:
+                np.copyto(slot, frame)
+            else:
+                cv2.resize(frame, (slot.shape[1], slot.shape[0]), dst=slot)
+        self.sequence += 1
+        self.transport.publish(index, self.source_index, self.sequence, time.time())
+        return True
+
+    def get_frame(self, attempts=3):
+        """Obtiene una copia independiente del frame actual (sin transporte)."""
+        for _ in range(attempts):
+            latest = self.read_latest()
+            if latest is None:
+                return None
+            frame = latest[0].copy()
+            # Si el productor empezó a sobrescribir el slot, la copia puede estar mezclada
+            if self.is_valid(latest[1]):
+                return frame
+        return None
+
+    def read_latest(self, last_sequence=-1):
+        """
+        Presta el frame más reciente sin copiarlo.
+
+        Args:
+            last_sequence (int): Última secuencia consumida por el llamador
+
+        Returns:
+            tuple: (frame de solo lectura, secuencia, timestamp, frames saltados)
+                   o None si no hay un frame nuevo
+        """
+        if self.buffer is None:
+            return None
+        return self.buffer.read_latest(last_sequence)
+
+    def is_valid(self, sequence):
+        """Verifica si el frame prestado con esa secuencia aún no fue sobrescrito."""
+        return self.buffer is not None and self.buffer.is_valid(sequence)
     
     def get_fps(self):
         """Obtiene los FPS actuales."""
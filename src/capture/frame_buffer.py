@@ -0,0 +1,113 @@
+import threading
+import numpy as np
+
+
+class FrameRingBuffer:
+    def __init__(self, num_slots=4, width=1280, height=720, channels=3):
+        """
+        Inicializa un buffer circular de frames preasignado.
+
+        El productor decodifica directamente sobre los slots y los consumidores
+        reciben vistas de solo lectura, de modo que el camino caliente no
+        reserva memoria por frame.
+
+        Args:
+            num_slots (int): Número de slots del buffer (mínimo 2)
+            width (int): Ancho esperado del frame
+            height (int): Alto esperado del frame
+            channels (int): Número de canales del frame
+        """
+        if num_slots < 2:
+            raise ValueError("El buffer necesita al menos 2 slots")
+
+        self.num_slots = num_slots
+        self.latest_sequence = -1
+        self._lock = threading.Lock()
+        self._allocate((height, width, channels))
+
+    def _allocate(self, shape):
+        """Reserva los slots y sus metadatos para la forma indicada."""
+        self.shape = tuple(shape)
+        self.slots = np.empty((self.num_slots,) + self.shape, dtype=np.uint8)
+        self.sequences = np.full(self.num_slots, -1, dtype=np.int64)
+        self.timestamps = np.zeros(self.num_slots, dtype=np.float64)
+
+        # Vistas creadas una sola vez por slot
+        self._write_views = [self.slots[index] for index in range(self.num_slots)]
+        self._read_views = []
+        for index in range(self.num_slots):
+            view = self.slots[index].view()
+            view.flags.writeable = False
+            self._read_views.append(view)
+
+    def get_write_slot(self):
+        """
+        Retorna el slot donde debe escribirse el siguiente frame.
+
+        El slot se invalida antes de entregarlo, de modo que is_valid() de
+        una vista prestada de ese slot sea False mientras se sobrescribe.
+
+        Returns:
+            tuple: (índice del slot, vista escribible del slot)
+        """
+        with self._lock:
+            index = (self.latest_sequence + 1) % self.num_slots
+            self.sequences[index] = -1
+            return index, self._write_views[index]
+
+    def commit(self, index, frame, timestamp):
+        """
+        Publica el frame escrito en el slot indicado.
+
+        Si el decodificador no pudo escribir directamente en el slot (por
+        ejemplo, porque la resolución real difiere de la configurada), el
+        buffer se redimensiona una vez y el frame se copia.
+
+        Args:
+            index (int): Índice del slot retornado por get_write_slot
+            frame (np.ndarray): Frame retornado por el decodificador
+            timestamp (float): Instante de captura (time.time())
+
+        Returns:
+            int: Número de secuencia asignado al frame
+        """
+        with self._lock:
+            if not np.may_share_memory(frame, self._write_views[index]):
+                if frame.shape != self.shape:
+                    self._allocate(frame.shape)
+                    index = (self.latest_sequence + 1) % self.num_slots
+                np.copyto(self.slots[index], frame)
+
+            sequence = self.latest_sequence + 1
+            self.sequences[index] = sequence
+            self.timestamps[index] = timestamp
+            self.latest_sequence = sequence
+            return sequence
+
+    def read_latest(self, last_sequence=-1):
+        """
+        Presta el frame más reciente como vista de solo lectura.
+
+        La vista sigue siendo válida mientras el productor no haya dado la
+        vuelta completa al buffer; después de copiarla, is_valid() confirma
+        que la copia no se mezcló con un frame nuevo.
+
+        Args:
+            last_sequence (int): Última secuencia consumida por el llamador
+
+        Returns:
+            tuple: (frame, secuencia, timestamp, frames saltados) o None si
+                   no hay un frame más nuevo que last_sequence
+        """
+        with self._lock:
+            sequence = self.latest_sequence
+            if sequence < 0 or sequence <= last_sequence:
+                return None
+
+            index = sequence % self.num_slots
+            skipped = sequence - last_sequence - 1 if last_sequence >= 0 else 0
+            return self._read_views[index], sequence, self.timestamps[index], skipped
+
+    def is_valid(self, sequence):
+        """Verifica si el frame prestado con esa secuencia aún no fue sobrescrito."""
+        return self.sequences[sequence % self.num_slots] == sequence
@@ -0,0 +1,137 @@
+import multiprocessing as mp
+import queue
+import numpy as np
+from multiprocessing import shared_memory
+
+
+class SharedFrameTransport:
+    def __init__(self, num_slots=16, width=1280, height=720, channels=3, context=None):
+        """
+        Inicializa un transporte de frames entre procesos en memoria compartida.
+
+        Los píxeles viven en un bloque de shared_memory con num_slots slots
+        fijos; entre procesos solo viajan mensajes pequeños (slot, fuente,
+        secuencia, timestamp). El productor toma un slot libre, decodifica
+        directamente sobre él y lo publica; el consumidor lo lee sin copiarlo
+        y lo libera al terminar. Un slot nunca está a la vez en escritura y en
+        lectura, así que no hay frames a medio escribir. Si no quedan slots
+        libres el productor descarta el frame en lugar de bloquearse.
+
+        El objeto se pasa tal cual a multiprocessing.Process; el proceso hijo
+        se conecta al mismo bloque por nombre.
+
+        Args:
+            num_slots (int): Frames que pueden estar en tránsito a la vez
+            width (int): Ancho de los frames
+            height (int): Alto de los frames
+            channels (int): Canales de los frames
+            context (multiprocessing.context.BaseContext): Contexto para las colas
+        """
+        context = context or mp.get_context()
+        self.num_slots = num_slots
+        self.shape = (height, width, channels)
+        self._shm = shared_memory.SharedMemory(create=True, size=num_slots * int(np.prod(self.shape)))
+        self._owner = True
+
+        self._free = context.Queue()
+        self._messages = context.Queue()
+        self._in_flight = context.Value('i', 0)
+        for index in range(num_slots):
+            self._free.put(index)
+        self._attach()
+
+    def _attach(self):
+        """Crea las vistas de NumPy sobre el bloque compartido."""
+        self.slots = np.ndarray((self.num_slots,) + self.shape, dtype=np.uint8, buffer=self._shm.buf)
+        self._read_views = []
+        for index in range(self.num_slots):
+            view = self.slots[index].view()
+            view.flags.writeable = False
+            self._read_views.append(view)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['slots'], state['_read_views']
+        state['_shm'] = self._shm.name
+        state['_owner'] = False
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._shm = shared_memory.SharedMemory(name=state['_shm'])
+        self._attach()
+
+    def acquire(self):
+        """
+        Toma un slot libre para escribir, sin bloquear.
+
+        Returns:
+            int: Índice del slot, o None si todos están en uso
+        """
+        try:
+            index = self._free.get_nowait()
+        except queue.Empty:
+            return None
+        with self._in_flight.get_lock():
+            self._in_flight.value += 1
+        return index
+
+    def slot(self, index):
+        """Vista escribible de un slot tomado con acquire()."""
+        return self.slots[index]
+
+    def publish(self, index, source, sequence, timestamp):
+        """
+        Publica el frame escrito en un slot.
+
+        Args:
+            index (int): Slot tomado con acquire()
+            source (int): Índice de la fuente del frame
+            sequence (int): Número de frame dentro de la fuente
+            timestamp (float): Instante de captura (time.time())
+        """
+        self._messages.put((index, source, sequence, timestamp))
+
+    def receive(self, timeout=None):
+        """
+        Espera el siguiente frame publicado.
+
+        Returns:
+            tuple: (slot, fuente, secuencia, timestamp), o None si se agotó el tiempo
+        """
+        try:
+            return self._messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def receive_available(self, limit):
+        """Retorna hasta limit frames ya publicados, sin esperar."""
+        messages = []
+        while len(messages) < limit:
+            try:
+                messages.append(self._messages.get_nowait())
+            except queue.Empty:
+                break
+        return messages
+
+    def view(self, index):
+        """Vista de solo lectura de un slot publicado."""
+        return self._read_views[index]
+
+    def release(self, index):
+        """Devuelve un slot a los libres (después de leerlo o si no se pudo escribir)."""
+        with self._in_flight.get_lock():
+            self._in_flight.value -= 1
+        self._free.put(index)
+
+    def in_flight(self):
+        """Slots tomados y aún no liberados."""
+        return self._in_flight.value
+
+    def close(self):
+        """Desconecta este proceso del bloque; el creador además lo elimina."""
+        self.slots = None
+        self._read_views = []
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
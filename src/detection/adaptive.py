@@ -0,0 +1,110 @@
+import time
+
+class AdaptiveDetectionController:
+    def __init__(self, detector, target_latency_ms=66.0, image_sizes=(320, 416, 512, 640),
+                 max_stride=4, adjust_every=15, smoothing=0.2, logger=None):
+        """
+        Inicializa el controlador adaptativo de resolución y salto de frames.
+
+        Mide la latencia de inferencia por frame y ajusta dos perillas para
+        mantener el presupuesto configurado: el tamaño de entrada del modelo
+        y cada cuántos frames se ejecuta el detector. Al exceder el
+        presupuesto primero baja la resolución y luego aumenta el salto; al
+        sobrar margen deshace los cambios en orden inverso.
+
+        Args:
+            detector (PersonDetector): Detector a controlar (debe exponer imgsz)
+            target_latency_ms (float): Costo de detección objetivo por frame de entrada
+            image_sizes (tuple): Tamaños de entrada permitidos, de menor a mayor
+            max_stride (int): Máximo salto de frames entre detecciones
+            adjust_every (int): Detecciones entre decisiones consecutivas
+            smoothing (float): Peso de cada medición en el promedio exponencial (0-1)
+            logger (SystemLogger): Logger donde se registran las decisiones
+        """
+        self.detector = detector
+        self.target_latency_ms = target_latency_ms
+        self.image_sizes = sorted(image_sizes)
+        self.max_stride = max_stride
+        self.adjust_every = adjust_every
+        self.smoothing = smoothing
+        self.logger = logger
+
+        # Empezar con el tamaño permitido más cercano al actual del detector
+        current = getattr(detector, 'imgsz', None) or self.image_sizes[-1]
+        self.size_index = min(range(len(self.image_sizes)),
+                              key=lambda i: abs(self.image_sizes[i] - current))
+        self.detector.imgsz = self.image_sizes[self.size_index]
+
+        self.stride = 1
+        self.latency_ms = None
+        self._samples = 0
+        self._frame_counter = 0
+
+    @property
+    def batch_size(self):
+        """Tamaño de lote del detector controlado."""
+        return self.detector.batch_size
+
+    def should_detect(self):
+        """Indica si el frame actual toca detección según el salto vigente."""
+        detect = self._frame_counter % self.stride == 0
+        self._frame_counter += 1
+        return detect
+
+    def detect_persons(self, frame):
+        """Detecta personas midiendo la latencia."""
+        return self.detect_persons_batch([frame])[0]
+
+    def detect_persons_batch(self, frames):
+        """Detecta personas en una lista de frames midiendo la latencia por frame."""
+        started = time.perf_counter()
+        detections = self.detector.detect_persons_batch(frames)
+        if frames:
+            self._record((time.perf_counter() - started) * 1000.0 / len(frames))
+        return detections
+
+    def _record(self, latency_ms):
+        """Actualiza el promedio de latencia y ajusta las perillas si corresponde."""
+        if self.latency_ms is None:
+            self.latency_ms = latency_ms
+        else:
+            self.latency_ms += self.smoothing * (latency_ms - self.latency_ms)
+
+        self._samples += 1
+        if self._samples >= self.adjust_every:
+            self._adjust()
+
+    def _adjust(self):
+        """Decide si cambiar el tamaño de entrada o el salto de frames."""
+        cost = self.latency_ms / self.stride
+        size = self.image_sizes[self.size_index]
+        old_size, old_stride = size, self.stride
+
+        if cost > self.target_latency_ms * 1.1:
+            # Sobre el presupuesto: bajar resolución y luego saltar más frames
+            if self.size_index > 0:
+                self.size_index -= 1
+            elif self.stride < self.max_stride:
+                self.stride += 1
+        else:
+            # Recuperar solo si la estimación del nuevo costo cabe con margen
+            # (la latencia escala aproximadamente con el área de entrada)
+            budget = self.target_latency_ms * 0.9
+            if self.stride > 1 and self.latency_ms / (self.stride - 1) <= budget:
+                self.stride -= 1
+            elif (self.stride == 1 and self.size_index < len(self.image_sizes) - 1 and
+                  cost * (self.image_sizes[self.size_index + 1] / size) ** 2 <= budget):
+                self.size_index += 1
+
+        new_size = self.image_sizes[self.size_index]
+        if (new_size, self.stride) != (old_size, old_stride):
+            # Estimar la nueva latencia para no reaccionar dos veces al mismo exceso
+            self.latency_ms *= (new_size / old_size) ** 2
+            self.detector.imgsz = new_size
+            if self.logger:
+                self.logger.info(
+                    f"Control adaptativo: imgsz {old_size}->{new_size}, "
+                    f"detección cada {old_stride}->{self.stride} frames "
+                    f"(latencia {cost:.1f} ms/frame, objetivo {self.target_latency_ms:.1f} ms)")
+
+        self._samples = 0
@@ -1,35 +1,72 @@
 import numpy as np
 from src.utils.constants import PERSON_CLASS_ID
-from src.utils.helper import calculate_centroid
+
+# Detecciones compactas: una fila por persona, sin diccionarios por caja
+DETECTION_DTYPE = np.dtype([
+    ('bbox', np.int32, (4,)),
+    ('centroid', np.int32, (2,)),
+    ('confidence', np.float32)
+])
+
+def as_detection_array(detections):
+    """
+    Convierte detecciones al arreglo estructurado DETECTION_DTYPE.
+
+    Acepta el arreglo estructurado (se retorna tal cual) o la lista de
+    diccionarios {'bbox', 'centroid', 'confidence'} usada anteriormente.
+    """
+    if isinstance(detections, np.ndarray) and detections.dtype == DETECTION_DTYPE:
+        return detections
+
+    array = np.empty(len(detections), dtype=DETECTION_DTYPE)
+    for i, detection in enumerate(detections):
+        array[i] = (detection['bbox'], detection['centroid'], detection.get('confidence', 1.0))
+    return array
 
 class PersonDetector:
-    def __init__(self, model, confidence_threshold=0.5):
+    def __init__(self, model, confidence_threshold=0.5, batch_size=8, imgsz=None):
         self.model = model
         self.confidence_threshold = confidence_threshold
+        self.batch_size = batch_size
+        self.imgsz = imgsz  # None usa el tamaño de entrada por defecto del modelo
     
     def detect_persons(self, frame):
         """Detecta personas en el frame."""
-        results = self.model(frame)
-        result = results[0]
+        return self.detect_persons_batch([frame])[0]
+    
+    def detect_persons_batch(self, frames):
+        """
+        Detecta personas en una lista de frames.
+        
+        Los frames se envían al modelo en lotes de batch_size para amortizar
+        el costo fijo de cada llamada.
+        
+        Returns:
+            list: Arreglo DETECTION_DTYPE por frame, en el mismo orden
+        """
+        # Clase y confianza se filtran dentro del modelo, antes de NMS
+        options = {'verbose': False, 'classes': [PERSON_CLASS_ID], 'conf': self.confidence_threshold}
+        if self.imgsz is not None:
+            options['imgsz'] = self.imgsz
+        
+        detections = []
+        for start in range(0, len(frames), self.batch_size):
+            results = self.model(frames[start:start + self.batch_size], **options)
+            detections.extend(self._parse_result(result) for result in results)
+        return detections
+    
+    def _parse_result(self, result):
+        """Convierte el resultado de YOLO de un frame en un arreglo de detecciones."""
+        # Una sola transferencia: columnas x1, y1, x2, y2, conf, cls
+        data = result.boxes.data.cpu().numpy()
         
-        # Extraer información de detecciones
-        classes = np.array(result.boxes.cls.cpu(), dtype="int")
-        confidence = np.array(result.boxes.conf.cpu())
-        bboxes = np.array(result.boxes.xyxy.cpu(), dtype="int")
+        # Filtro defensivo por si el backend ignora classes/conf
+        data = data[(data[:, 5] == PERSON_CLASS_ID) & (data[:, 4] >= self.confidence_threshold)]
         
-        # Filtrar solo personas con confianza suficiente
-        person_detections = []
-        for i in range(len(classes)):
-            if (classes[i] == PERSON_CLASS_ID and 
-                confidence[i] >= self.confidence_threshold):
-                
-                bbox = bboxes[i].tolist()
-                centroid = calculate_centroid(bbox)
-                
-                person_detections.append({
-                    'bbox': bbox,
-                    'centroid': centroid,
-                    'confidence': confidence[i]
-                })
+        detections = np.empty(len(data), dtype=DETECTION_DTYPE)
+        bboxes = data[:, :4].astype(np.int32)
+        detections['bbox'] = bboxes
+        detections['centroid'] = (bboxes[:, :2] + bboxes[:, 2:]) // 2
+        detections['confidence'] = data[:, 4]
         
-        return person_detections
\ No newline at end of file
+        return detections
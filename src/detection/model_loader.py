@@ -1,25 +1,100 @@
+import hashlib
 import os
+import numpy as np
 from ultralytics import YOLO
 
+# Backends de exportación soportados y el sufijo del artefacto generado
+EXPORT_SUFFIXES = {
+    'onnx': '.onnx',
+    'openvino': '_openvino_model'
+}
+
 class ModelLoader:
-    def __init__(self, model_path="data/yolov8n.pt"):
+    def __init__(self, model_path="data/yolov8n.pt", backend="pytorch", imgsz=640, warmup_runs=3):
         self.model_path = model_path
+        self.backend = backend
+        self.imgsz = imgsz
+        self.warmup_runs = warmup_runs
         self.model = None
-    
+
     def load_model(self):
         """Carga el modelo YOLO."""
         try:
             if not os.path.exists(self.model_path):
                 print(f"Descargando modelo YOLO a {self.model_path}...")
                 os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
-            
+
             self.model = YOLO(self.model_path)
+
+            # Usar el backend exportado si está configurado; si falla, seguir con .pt
+            if self.backend != "pytorch":
+                try:
+                    artifact = self.export_backend()
+                    self.model = YOLO(artifact, task="detect")
+                    print(f"Backend {self.backend} cargado: {artifact}")
+                except Exception as e:
+                    print(f"No se pudo usar el backend {self.backend}, usando PyTorch: {e}")
+
+            self._warm_up()
             print(f"Modelo YOLO cargado exitosamente: {self.model_path}")
             return True
         except Exception as e:
             print(f"Error cargando modelo: {e}")
             return False
-    
+
+    def export_backend(self):
+        """
+        Exporta el modelo al backend configurado, reutilizando la caché.
+
+        El artefacto se guarda junto a los pesos con el hash de los pesos en
+        el nombre, de modo que cambiar el .pt genera una exportación nueva.
+
+        Returns:
+            str: Ruta del artefacto exportado
+        """
+        if self.backend not in EXPORT_SUFFIXES:
+            raise ValueError(f"Backend no soportado: {self.backend}")
+
+        if self.model is None:
+            self.model = YOLO(self.model_path)
+
+        weights_path = self._weights_path()
+        stem = os.path.splitext(weights_path)[0]
+        artifact = f"{stem}_{self._weights_hash(weights_path)}{EXPORT_SUFFIXES[self.backend]}"
+        if os.path.exists(artifact):
+            return artifact
+
+        print(f"Exportando modelo a {self.backend} (solo la primera vez)...")
+        exported = self.model.export(format=self.backend, imgsz=self.imgsz, dynamic=True)
+
+        # Mover el resultado al nombre con hash
+        os.replace(str(exported), artifact)
+        return artifact
+
+    def _weights_path(self):
+        """Retorna la ruta real de los pesos .pt (pueden haberse descargado en otra ubicación)."""
+        if os.path.exists(self.model_path):
+            return self.model_path
+        ckpt_path = getattr(self.model, "ckpt_path", None)
+        if ckpt_path and os.path.exists(ckpt_path):
+            return ckpt_path
+        raise FileNotFoundError(f"No se encontraron los pesos: {self.model_path}")
+
+    @staticmethod
+    def _weights_hash(weights_path):
+        """Calcula un hash corto del archivo de pesos."""
+        digest = hashlib.sha256()
+        with open(weights_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()[:12]
+
+    def _warm_up(self):
+        """Ejecuta inferencias de prueba para que la primera detección real no pague la inicialización."""
+        dummy = np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8)
+        for _ in range(self.warmup_runs):
+            self.model(dummy, verbose=False, imgsz=self.imgsz)
+
     def get_model(self):
         """Obtiene el modelo cargado."""
-        return self.model
\ No newline at end of file
+        return self.model
@@ -0,0 +1,185 @@
+import cv2
+import numpy as np
+from src.detection.detect import DETECTION_DTYPE
+
+EDGE_TOLERANCE = 2  # Píxeles desde el borde de un mosaico para considerar una caja recortada
+
+def generate_tiles(width, height, tile_size=640, overlap=0.2, rois=None):
+    """
+    Genera mosaicos superpuestos que cubren el frame o las regiones de interés.
+
+    Args:
+        width (int): Ancho del frame
+        height (int): Alto del frame
+        tile_size (int): Lado de cada mosaico en píxeles
+        overlap (float): Fracción de superposición entre mosaicos vecinos (0-1)
+        rois (list): Regiones (x1, y1, x2, y2) a cubrir; None cubre el frame completo
+
+    Returns:
+        np.ndarray: Arreglo (N, 4) con los mosaicos (x1, y1, x2, y2)
+    """
+    regions = rois if rois else [(0, 0, width, height)]
+    step = max(1, int(tile_size * (1 - overlap)))
+
+    tiles = []
+    for rx1, ry1, rx2, ry2 in regions:
+        rx1, ry1 = max(0, int(rx1)), max(0, int(ry1))
+        rx2, ry2 = min(width, int(rx2)), min(height, int(ry2))
+
+        # Inicios de cada eje; el último mosaico se alinea al borde de la región
+        xs = list(range(rx1, max(rx1, rx2 - tile_size) + 1, step))
+        ys = list(range(ry1, max(ry1, ry2 - tile_size) + 1, step))
+        if xs[-1] + tile_size < rx2:
+            xs.append(rx2 - tile_size)
+        if ys[-1] + tile_size < ry2:
+            ys.append(ry2 - tile_size)
+
+        for y in ys:
+            for x in xs:
+                tiles.append((x, y, min(width, x + tile_size), min(height, y + tile_size)))
+
+    return np.unique(np.array(tiles, dtype=np.int32).reshape(-1, 4), axis=0)
+
+class TiledPersonDetector:
+    def __init__(self, detector, tile_size=640, overlap=0.2, nms_threshold=0.4,
+                 containment_threshold=0.8, rois=None, include_full_frame=True):
+        """
+        Inicializa el detector por mosaicos para frames de alta resolución.
+
+        Cada frame se divide en mosaicos superpuestos que se envían al detector
+        en un solo lote; las cajas se trasladan a coordenadas del frame y se
+        combinan con NMS entre mosaicos.
+
+        Args:
+            detector (PersonDetector): Detector base
+            tile_size (int): Lado de cada mosaico en píxeles
+            overlap (float): Fracción de superposición entre mosaicos (0-1)
+            nms_threshold (float): Umbral IoU del NMS entre mosaicos
+            containment_threshold (float): Fracción del área de una caja contenida
+                                           en otra mayor a partir de la cual se
+                                           descarta (personas cortadas en el borde
+                                           de un mosaico)
+            rois (list): Regiones (x1, y1, x2, y2) a cubrir; None cubre todo el frame
+            include_full_frame (bool): Agregar el frame completo al lote para
+                                       personas grandes que cruzan varios mosaicos.
+                                       Se ignora si hay regiones de interés.
+        """
+        self.detector = detector
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.nms_threshold = nms_threshold
+        self.containment_threshold = containment_threshold
+        self.rois = rois
+        self.include_full_frame = include_full_frame and not rois
+        self._tiles_cache = {}
+
+    @property
+    def batch_size(self):
+        """Tamaño de lote del detector base."""
+        return self.detector.batch_size
+
+    @property
+    def imgsz(self):
+        """Tamaño de entrada del modelo usado para cada mosaico."""
+        return self.detector.imgsz
+
+    @imgsz.setter
+    def imgsz(self, value):
+        self.detector.imgsz = value
+
+    def get_tiles(self, frame_shape):
+        """Retorna (y cachea) los mosaicos para una forma de frame."""
+        key = frame_shape[:2]
+        if key not in self._tiles_cache:
+            height, width = key
+            tiles = generate_tiles(width, height, self.tile_size, self.overlap, self.rois)
+            if self.include_full_frame:
+                tiles = np.vstack([tiles, [(0, 0, width, height)]]).astype(np.int32)
+            self._tiles_cache[key] = tiles
+        return self._tiles_cache[key]
+
+    def detect_persons(self, frame):
+        """Detecta personas en el frame usando mosaicos."""
+        return self.detect_persons_batch([frame])[0]
+
+    def detect_persons_batch(self, frames):
+        """
+        Detecta personas en una lista de frames usando mosaicos.
+
+        Returns:
+            list: Arreglo DETECTION_DTYPE por frame, en el mismo orden
+        """
+        crops = []
+        for frame in frames:
+            for x1, y1, x2, y2 in self.get_tiles(frame.shape):
+                crops.append(frame[y1:y2, x1:x2])
+
+        # Todos los mosaicos de todos los frames en una sola pasada por lotes
+        tile_detections = self.detector.detect_persons_batch(crops)
+
+        per_frame = [[] for _ in frames]
+        tile_index = 0
+        for frame_index, frame in enumerate(frames):
+            height, width = frame.shape[:2]
+            tiles = self.get_tiles(frame.shape)
+            for x1, y1, x2, y2 in tiles:
+                detections = tile_detections[tile_index]
+                tile_index += 1
+                if len(detections):
+                    # Cajas que tocan un borde del mosaico interior al frame
+                    bboxes = detections['bbox']
+                    clipped = (((bboxes[:, 0] <= EDGE_TOLERANCE) & (x1 > 0)) |
+                               ((bboxes[:, 1] <= EDGE_TOLERANCE) & (y1 > 0)) |
+                               ((bboxes[:, 2] >= x2 - x1 - EDGE_TOLERANCE) & (x2 < width)) |
+                               ((bboxes[:, 3] >= y2 - y1 - EDGE_TOLERANCE) & (y2 < height)))
+                    detections['bbox'] += (x1, y1, x1, y1)
+                    detections['centroid'] += (x1, y1)
+                    per_frame[frame_index].append((detections, clipped))
+
+        return [self._merge(chunks) for chunks in per_frame]
+
+    def _merge(self, chunks):
+        """
+        Combina las detecciones de los mosaicos de un frame con NMS.
+
+        Args:
+            chunks (list): Tuplas (detecciones, recortadas) por mosaico; recortadas
+                           marca las cajas que tocan un borde interior del mosaico
+        """
+        if not chunks:
+            return np.empty(0, dtype=DETECTION_DTYPE)
+
+        detections = np.concatenate([chunk for chunk, _ in chunks])
+        clipped = np.concatenate([chunk_clipped for _, chunk_clipped in chunks])
+
+        # Descartar detecciones cuyo centroide cae fuera de las regiones de interés
+        if self.rois:
+            centroids = detections['centroid']
+            rois = np.asarray(self.rois)
+            inside = ((centroids[:, None, 0] >= rois[:, 0]) & (centroids[:, None, 0] < rois[:, 2]) &
+                      (centroids[:, None, 1] >= rois[:, 1]) & (centroids[:, None, 1] < rois[:, 3]))
+            inside = inside.any(axis=1)
+            detections, clipped = detections[inside], clipped[inside]
+
+        if len(detections) < 2:
+            return detections
+
+        bboxes = detections['bbox']
+        boxes_xywh = np.column_stack([bboxes[:, :2], bboxes[:, 2:] - bboxes[:, :2]])
+        keep = cv2.dnn.NMSBoxes(boxes_xywh, detections['confidence'], 0.0, self.nms_threshold)
+        keep = np.asarray(keep, dtype=np.int64).reshape(-1)
+        detections, clipped = detections[keep], clipped[keep]
+
+        # Una caja recortada por el borde de un mosaico tiene IoU bajo con la
+        # caja completa; se descarta si queda casi contenida en otra mayor. Las
+        # cajas que no tocan un borde interior (una persona delante de otra)
+        # quedan solo sujetas al NMS
+        bboxes = detections['bbox'].astype(np.int64)
+        areas = np.prod(bboxes[:, 2:] - bboxes[:, :2], axis=1)
+        top_left = np.maximum(bboxes[:, None, :2], bboxes[None, :, :2])
+        bottom_right = np.minimum(bboxes[:, None, 2:], bboxes[None, :, 2:])
+        intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+        contained = intersection >= self.containment_threshold * np.maximum(areas[None, :], 1)
+        larger = (areas[:, None] > areas[None, :]) | (
+            (areas[:, None] == areas[None, :]) & np.tri(len(areas), k=-1, dtype=bool).T)
+        return detections[~((contained & larger).any(axis=0) & clipped)]
@@ -0,0 +1,116 @@
+import argparse
+import sys
+import os
+import time
+import threading
+from datetime import datetime
+from functools import partial
+
+# Agregar el directorio raíz al path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+def parse_args():
+    """Lee los argumentos de línea de comandos."""
+    parser = argparse.ArgumentParser(
+        description="Conteo de ocupación de un sitio con varias cámaras o videos")
+    parser.add_argument("sources", nargs="+",
+                        help="Índices de cámara o archivos de video (los videos simulan cámaras)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Workers de detección compartidos (por defecto MULTI_SOURCE_WORKERS)")
+    parser.add_argument("--processes", action="store_true",
+                        help="Workers en procesos con frames en memoria compartida")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="Frames máximos por lote (por defecto MULTI_SOURCE_BATCH_SIZE)")
+    parser.add_argument("--duration", type=float, default=None,
+                        help="Segundos de ejecución; por defecto hasta que terminen los videos")
+    parser.add_argument("--capacity", type=int, default=None,
+                        help="Capacidad máxima del sitio")
+    parser.add_argument("--model", default=None,
+                        help="Ruta del modelo YOLO (por defecto YOLO_MODEL_PATH)")
+    parser.add_argument("--output-dir", default=None,
+                        help="Directorio de salida (por defecto OUTPUT_DIR)")
+    return parser.parse_args()
+
+def create_detector(model_path):
+    """Carga un modelo y crea su detector; se ejecuta una vez en cada worker."""
+    from config import settings
+    from src.detection.model_loader import ModelLoader
+    from src.detection.detect import PersonDetector
+
+    model_loader = ModelLoader(model_path, backend=settings.MODEL_BACKEND,
+                               imgsz=settings.MODEL_IMAGE_SIZE,
+                               warmup_runs=settings.MODEL_WARMUP_RUNS)
+    if not model_loader.load_model():
+        raise Exception(f"No se pudo cargar el modelo: {model_path}")
+    return PersonDetector(model_loader.get_model(),
+                          confidence_threshold=settings.DETECTION_CONFIDENCE_THRESHOLD,
+                          batch_size=settings.DETECTION_BATCH_SIZE)
+
+def main():
+    """Cuenta la ocupación combinada de todas las fuentes sin interfaz gráfica."""
+    args = parse_args()
+
+    # Importar después de configurar el path
+    from config import settings
+    from src.tracking.costs import AssociationCost
+    from src.occupancy.count import OccupancyCounter
+    from src.occupancy.alerts import AlertEngine, LogSink
+    from src.pipeline.multi_source import MultiSourceRuntime
+    from src.system_logger import SystemLogger
+
+    logger = SystemLogger(settings.LOGS_DIR)
+    output_dir = args.output_dir or settings.OUTPUT_DIR
+    os.makedirs(output_dir, exist_ok=True)
+    model_path = args.model or settings.YOLO_MODEL_PATH
+
+    sources = [int(source) if source.isdigit() else source for source in args.sources]
+    log_sink = LogSink(logger)
+    counter = OccupancyCounter(
+        max_capacity=args.capacity,
+        alert_engine=AlertEngine(sinks=[log_sink], hysteresis=settings.ALERT_HYSTERESIS,
+                                 min_dwell_seconds=settings.ALERT_MIN_DWELL_SECONDS,
+                                 rate_limit_seconds=settings.ALERT_RATE_LIMIT_SECONDS))
+    tracker_options = {
+        'cost': AssociationCost(settings.TRACKING_COST, iou_weight=settings.TRACKING_IOU_WEIGHT,
+                                gate_scale=settings.TRACKING_GATE_SCALE),
+        'trajectory_length': settings.TRAJECTORY_LENGTH
+    }
+    runtime = MultiSourceRuntime(sources, partial(create_detector, model_path), counter,
+                                 workers=args.workers or settings.MULTI_SOURCE_WORKERS,
+                                 batch_size=args.batch_size or settings.MULTI_SOURCE_BATCH_SIZE,
+                                 tracker_type=settings.TRACKER_TYPE,
+                                 tracker_options=tracker_options,
+                                 width=settings.FRAME_WIDTH, height=settings.FRAME_HEIGHT,
+                                 use_processes=args.processes or settings.MULTI_SOURCE_PROCESSES)
+
+    # Reporte periódico del conteo mientras corre el runtime
+    done = threading.Event()
+
+    def report():
+        while not done.wait(5.0):
+            logger.info(f"Sitio: {counter.get_current_count()} personas - "
+                        f"por fuente: {runtime.get_source_counts()}")
+
+    logger.info(f"Iniciando sitio con {len(sources)} fuentes")
+    threading.Thread(target=report, daemon=True).start()
+    start = time.time()
+    try:
+        runtime.run(duration=args.duration)
+    except KeyboardInterrupt:
+        logger.info("Detenido por el usuario")
+    finally:
+        done.set()
+        runtime.close()
+
+    json_path = os.path.join(output_dir, f"site_occupancy_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    counter.export_data(json_path)
+    log_sink.close()
+    frames = sum(state.processed_frames for state in runtime.sources)
+    elapsed = time.time() - start
+    logger.info(f"{frames} frames detectados en {elapsed:.1f} s "
+                f"- pico del sitio: {counter.get_peak_count()} personas")
+    logger.info(f"Resultados: {json_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+import json
+import threading
+import time
+import urllib.request
+from collections import deque
+from datetime import datetime
+from src.pipeline.queues import DropOldestQueue
+
+LEVELS = ('warning', 'critical', 'full')
+
+ALERT_MESSAGES = {
+    'warning': 'ADVERTENCIA: Alta ocupación detectada ({:.1f}%)',
+    'critical': 'CRÍTICO: Capacidad casi completa ({:.1f}%)',
+    'full': 'ALERTA MÁXIMA: Capacidad completa o excedida ({:.1f}%)'
+}
+
+ALERT_SEVERITIES = {
+    'warning': 'MEDIUM',
+    'critical': 'HIGH',
+    'full': 'CRITICAL'
+}
+
+
+class AlertEngine:
+    def __init__(self, thresholds=None, hysteresis=0.05, min_dwell_seconds=2.0,
+                 rate_limit_seconds=60.0, sinks=None, source=None):
+        """
+        Inicializa el motor de alertas de ocupación.
+
+        Para subir a un nivel basta con alcanzar su umbral, pero para bajar
+        hay que quedar por debajo del umbral menos la histéresis; además cada
+        cambio debe mantenerse min_dwell_seconds antes de aceptarse. Así una
+        detección falsa que hace oscilar el conteo en un umbral no genera
+        alertas. Cada nivel se notifica como máximo una vez cada
+        rate_limit_seconds. Las alertas se envían a los sinks, que las
+        procesan en segundo plano sin bloquear al llamador.
+
+        Args:
+            thresholds (dict): Fracción de la capacidad de cada nivel
+                               ('warning', 'critical', 'full')
+            hysteresis (float): Banda (fracción de la capacidad) para bajar de nivel
+            min_dwell_seconds (float): Tiempo que un nivel debe mantenerse
+            rate_limit_seconds (float): Intervalo mínimo entre alertas del mismo nivel
+            sinks (list): Destinos de las alertas (LogSink, WebhookSink, UISink)
+            source (str): Nombre opcional del origen (p. ej. una zona)
+        """
+        self.thresholds = thresholds if thresholds is not None else {
+            'warning': 0.75,  # 75% de capacidad
+            'critical': 0.90,  # 90% de capacidad
+            'full': 1.0  # 100% de capacidad
+        }
+        self.hysteresis = hysteresis
+        self.min_dwell_seconds = min_dwell_seconds
+        self.rate_limit_seconds = rate_limit_seconds
+        self.sinks = list(sinks) if sinks else []
+        self.source = source
+        self.reset()
+
+    def reset(self):
+        """Olvida el nivel actual, los cambios pendientes y los límites de frecuencia."""
+        self.level = None
+        self._active = {name: False for name in LEVELS}
+        self._pending_since = {name: None for name in LEVELS}
+        self._last_sent = {}
+
+    def evaluate(self, count, max_capacity, timestamp=None):
+        """
+        Evalúa el conteo actual y retorna una alerta si se confirma un cambio de nivel.
+
+        Args:
+            count (int): Conteo actual
+            max_capacity (int): Capacidad máxima, o None
+            timestamp (float): Instante del conteo (epoch); por defecto el actual
+
+        Returns:
+            dict: Alerta generada, o None
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        if not max_capacity:
+            self.reset()
+            return None
+
+        ratio = count / max_capacity
+        target = self._update_levels(ratio, timestamp)
+        if target == self.level:
+            return None
+
+        self.level = target
+        if target is None:
+            return None
+
+        last_sent = self._last_sent.get(target)
+        if last_sent is not None and timestamp - last_sent < self.rate_limit_seconds:
+            return None
+        self._last_sent[target] = timestamp
+        return self._build_alert(target, count, max_capacity, ratio, timestamp)
+
+    def dispatch(self, alert):
+        """Entrega una alerta a todos los sinks sin esperar a que la procesen."""
+        for sink in self.sinks:
+            sink.emit(alert)
+
+    def _update_levels(self, ratio, timestamp):
+        """
+        Actualiza el estado de cada nivel y retorna el más alto activo.
+
+        Cada nivel se activa al alcanzar su umbral y se desactiva por debajo
+        del umbral menos la histéresis, pero el cambio solo se acepta si la
+        condición se sostiene min_dwell_seconds.
+        """
+        level = None
+        for name in LEVELS:
+            active = self._active[name]
+            threshold = self.thresholds[name] - (self.hysteresis if active else 0.0)
+            wanted = ratio >= threshold
+            if wanted == active:
+                self._pending_since[name] = None
+            else:
+                if self._pending_since[name] is None:
+                    self._pending_since[name] = timestamp
+                if timestamp - self._pending_since[name] >= self.min_dwell_seconds:
+                    self._active[name] = wanted
+                    self._pending_since[name] = None
+            if self._active[name]:
+                level = name
+        return level
+
+    def _build_alert(self, level, count, max_capacity, ratio, timestamp):
+        """Construye el diccionario de una alerta."""
+        percentage = min(100.0, ratio * 100.0)
+        message = ALERT_MESSAGES[level].format(percentage)
+        if self.source is not None:
+            message = f"[{self.source}] {message}"
+        return {
+            'timestamp': datetime.fromtimestamp(timestamp),
+            'type': f'OCCUPANCY_{level.upper()}',
+            'level': level,
+            'message': message,
+            'severity': ALERT_SEVERITIES[level],
+            'source': self.source,
+            'current_count': count,
+            'max_capacity': max_capacity,
+            'occupancy_percentage': percentage,
+            'remaining_capacity': max(0, max_capacity - count)
+        }
+
+
+class AlertSink:
+    def __init__(self, max_pending=100):
+        """
+        Base de los destinos de alertas con cola e hilo propios.
+
+        emit() nunca bloquea: si el destino es lento, las alertas más antiguas
+        en espera se descartan. Las subclases implementan handle().
+
+        Args:
+            max_pending (int): Alertas máximas en espera
+        """
+        self._queue = DropOldestQueue(maxsize=max_pending)
+        self._stop_event = threading.Event()
+        self.sent = 0
+        self.failed = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def emit(self, alert):
+        """Encola una alerta."""
+        self._queue.put(alert)
+
+    def handle(self, alert):
+        """Entrega una alerta al destino; se ejecuta en el hilo del sink."""
+        raise NotImplementedError
+
+    def close(self, timeout=2.0):
+        """Entrega las alertas pendientes (hasta timeout segundos) y detiene el hilo."""
+        self._stop_event.set()
+        self._thread.join(timeout)
+
+    def _run(self):
+        """Procesa las alertas en orden hasta que se cierre el sink y la cola quede vacía."""
+        while True:
+            alert = self._queue.get(timeout=0.2)
+            if alert is None:
+                if self._stop_event.is_set():
+                    break
+                continue
+            try:
+                self.handle(alert)
+                self.sent += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"Error enviando alerta ({type(self).__name__}): {e}")
+
+
+class LogSink(AlertSink):
+    def __init__(self, logger, max_pending=100):
+        """
+        Registra las alertas en el log del sistema.
+
+        Args:
+            logger (SystemLogger): Logger donde se escriben las alertas
+            max_pending (int): Alertas máximas en espera
+        """
+        self.logger = logger
+        super().__init__(max_pending)
+
+    def handle(self, alert):
+        self.logger.warning(alert['message'])
+
+
+class WebhookSink(AlertSink):
+    def __init__(self, url, timeout=2.0, max_pending=100):
+        """
+        Envía cada alerta como JSON por HTTP POST (p. ej. a un servicio local).
+
+        Args:
+            url (str): URL del webhook
+            timeout (float): Segundos máximos de espera por solicitud
+            max_pending (int): Alertas máximas en espera
+        """
+        self.url = url
+        self.timeout = timeout
+        super().__init__(max_pending)
+
+    def handle(self, alert):
+        body = json.dumps(alert, ensure_ascii=False, default=str).encode('utf-8')
+        request = urllib.request.Request(self.url, data=body, method='POST',
+                                         headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class UISink:
+    def __init__(self, max_pending=100):
+        """
+        Guarda las alertas para que la interfaz las muestre desde su propio hilo.
+
+        Tk no es seguro entre hilos, así que en lugar de un hilo de entrega la
+        interfaz llama a drain() en su ciclo de actualización.
+
+        Args:
+            max_pending (int): Alertas máximas en espera
+        """
+        self._pending = deque(maxlen=max_pending)
+        self._lock = threading.Lock()
+
+    def emit(self, alert):
+        """Guarda una alerta."""
+        with self._lock:
+            self._pending.append(alert)
+
+    def drain(self):
+        """Retorna y limpia las alertas pendientes."""
+        with self._lock:
+            alerts = list(self._pending)
+            self._pending.clear()
+        return alerts
+
+    def close(self, timeout=None):
+        """No hay hilo que detener."""
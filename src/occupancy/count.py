@@ -1,33 +1,85 @@
+from collections import deque
 from datetime import datetime
 import json
+import numpy as np
+from src.occupancy.history import OccupancyHistory, ARRIVAL
+from src.occupancy.rollups import RunningStats, OccupancyRollups
+from src.occupancy.alerts import AlertEngine
 
 class OccupancyCounter:
-    def __init__(self, max_capacity=None):
+    def __init__(self, max_capacity=None, history=None, store=None, alert_engine=None):
         """
         Inicializa el contador de ocupación.
 
         Args:
             max_capacity (int): Capacidad máxima del espacio
+            history (OccupancyHistory): Historial acotado donde se registran los
+                                        conteos; por defecto uno con valores estándar
+            store (OccupancyStore): Almacenamiento durable opcional; si se indica,
+                                    la sesión guardada se retoma al iniciar
+            alert_engine (AlertEngine): Motor de alertas con histéresis, tiempo mínimo
+                                        y límite de frecuencia; por defecto uno estándar
         """
         self.current_ids = set()
         self.max_capacity = max_capacity
-        self.history = []
-        self.alerts = []
+        self.history = history if history is not None else OccupancyHistory()
+        self.stats = RunningStats()  # Agregados de toda la sesión
+        self.rollups = OccupancyRollups()  # Agregados por minuto, hora y día
+        self.alerts = deque(maxlen=100)  # Alertas pendientes de leer con get_alerts
         self.current_count = 0
         self.peak_count = 0
-        self.alert_thresholds = {
-            'warning': 0.75,  # 75% de capacidad
-            'critical': 0.90,  # 90% de capacidad
-            'full': 1.0  # 100% de capacidad
-        }
-        self._last_alert_level = None
+        self.alert_engine = alert_engine if alert_engine is not None else AlertEngine()
+        self.alert_thresholds = self.alert_engine.thresholds
+
+        self.store = store
+        if self.store is not None:
+            self._resume()
 
-    def update_ids(self, detected_ids):
+    def _resume(self):
+        """
+        Retoma conteo, pico, agregados e historial reciente de la sesión guardada en el store.
+
+        El tiempo que la aplicación estuvo detenida no se pondera en los promedios.
+        """
+        session_start = float(self.store.get_state('session_start', '-inf'))
+        summary = self.store.query_statistics(start=session_start)
+        if summary is None:
+            return
+
+        self.stats = RunningStats.from_summary(summary)
+        self.stats.interrupt()
+        for resolution in self.rollups.levels:
+            self.rollups.restore(resolution, self.store.query_rollups(resolution, start=session_start))
+        self.peak_count = summary['max']
+        self.current_count = summary['last_count']
+        self.current_ids = set(summary['last_ids'])
+        self._restore_history(max(session_start, summary['last_ts'] - self.history.raw_window_seconds))
+
+    def _restore_history(self, start):
+        """Reconstruye el historial en memoria con los registros del store desde start."""
+        ids = set(self.store.ids_at(start))
+        events = self.store.query_events(start)
+        pending = next(events, None)
+        for timestamp, count in self.store.query_counts(start):
+            # Aplicar las llegadas y salidas hasta el instante del registro
+            while pending is not None and pending[0] <= timestamp:
+                _, obj_id, kind = pending
+                if kind == ARRIVAL:
+                    ids.add(obj_id)
+                else:
+                    ids.discard(obj_id)
+                pending = next(events, None)
+            self.history.append(datetime.fromtimestamp(timestamp), count, ids)
+        events.close()
+
+    def update_ids(self, detected_ids, timestamp=None):
         """
         Actualiza el conteo actual basada en un conjunto de IDs únicos detectados.
 
         Args:
             detected_ids (list): Lista de identificadores únicos detectados
+            timestamp (datetime): Instante del registro; por defecto el actual.
+                                  El análisis offline pasa el tiempo del video.
         """
         if isinstance(detected_ids, (list, tuple)):
             self.current_ids = set(detected_ids)
@@ -35,20 +87,42 @@ class OccupancyCounter:
             self.current_ids = set([detected_ids]) if detected_ids is not None else set()
 
         self.current_count = len(self.current_ids)
+        self._record(timestamp)
+
+    def update_count(self, count, detected_ids=None, timestamp=None):
+        """
+        Actualiza el conteo con un valor calculado externamente.
 
+        Se usa con el conteo por líneas virtuales, donde la ocupación es
+        entradas - salidas y no el número de IDs visibles.
+
+        Args:
+            count (int): Ocupación actual
+            detected_ids (list): IDs visibles en este frame (solo informativo)
+            timestamp (datetime): Instante del registro; por defecto el actual.
+        """
+        if detected_ids is not None:
+            self.current_ids = set(detected_ids)
+        self.current_count = max(0, int(count))
+        self._record(timestamp)
+
+    def _record(self, timestamp):
+        """Actualiza el pico, el historial y las alertas con el conteo actual."""
         # Actualizar el pico máximo
         if self.current_count > self.peak_count:
             self.peak_count = self.current_count
 
-        # Registrar el historial de conteo
-        self.history.append({
-            'timestamp': datetime.now(),
-            'count': self.current_count,
-            'ids': list(self.current_ids)
-        })
+        # Registrar el historial de conteo y actualizar los agregados
+        timestamp = timestamp if timestamp is not None else datetime.now()
+        self.history.append(timestamp, self.current_count, self.current_ids)
+        epoch = timestamp.timestamp()
+        self.stats.add(epoch, self.current_count)
+        self.rollups.add(epoch, self.current_count)
+        if self.store is not None:
+            self.store.append(epoch, self.current_count, self.current_ids)
 
         # Verificar alertas
-        self._check_alerts()
+        self._check_alerts(epoch)
 
     def set_max_capacity(self, capacity):
         """
@@ -108,61 +182,14 @@ class OccupancyCounter:
             return False
         return self.current_count > self.max_capacity
 
-    def _check_alerts(self):
-        """Genera alertas basadas en el nivel de ocupación actual"""
-        if self.max_capacity is None or self.max_capacity == 0:
-            return
-
-        occupancy_percentage = self.get_occupancy_percentage()
-        current_alert_level = None
-
-        # Determinar el nivel de alerta actual
-        if occupancy_percentage >= 100:
-            current_alert_level = 'full'
-        elif occupancy_percentage >= self.alert_thresholds['critical'] * 100:
-            current_alert_level = 'critical'
-        elif occupancy_percentage >= self.alert_thresholds['warning'] * 100:
-            current_alert_level = 'warning'
-
-        # Solo generar alerta si cambió el nivel
-        if current_alert_level != self._last_alert_level and current_alert_level is not None:
-            self._generate_alert(current_alert_level, occupancy_percentage)
-            self._last_alert_level = current_alert_level
-        elif current_alert_level is None:
-            self._last_alert_level = None
-
-    def _generate_alert(self, level, occupancy_percentage):
-        """
-        Genera una alerta específica basada en el nivel.
-
-        Args:
-            level (str): Nivel de alerta ('warning', 'critical', 'full')
-            occupancy_percentage (float): Porcentaje actual de ocupación
-        """
-        alert_messages = {
-            'warning': f'ADVERTENCIA: Alta ocupación detectada ({occupancy_percentage:.1f}%)',
-            'critical': f'CRÍTICO: Capacidad casi completa ({occupancy_percentage:.1f}%)',
-            'full': f'ALERTA MÁXIMA: Capacidad completa o excedida ({occupancy_percentage:.1f}%)'
-        }
-
-        alert_severities = {
-            'warning': 'MEDIUM',
-            'critical': 'HIGH',
-            'full': 'CRITICAL'
-        }
-
-        alert = {
-            'timestamp': datetime.now(),
-            'type': f'OCCUPANCY_{level.upper()}',
-            'message': alert_messages[level],
-            'severity': alert_severities[level],
-            'current_count': self.current_count,
-            'max_capacity': self.max_capacity,
-            'occupancy_percentage': occupancy_percentage,
-            'remaining_capacity': self.get_remaining_capacity()
-        }
-
-        self.alerts.append(alert)
+    def _check_alerts(self, timestamp=None):
+        """Evalúa el nivel de ocupación y despacha la alerta si el motor la confirma."""
+        if timestamp is None and self.stats.last_timestamp is not None:
+            timestamp = self.stats.last_timestamp
+        alert = self.alert_engine.evaluate(self.current_count, self.max_capacity, timestamp)
+        if alert is not None:
+            self.alerts.append(alert)
+            self.alert_engine.dispatch(alert)
 
     def get_current_count(self):
         """Retorna el conteo actual de personas únicas"""
@@ -174,7 +201,7 @@ class OccupancyCounter:
 
     def get_alerts(self):
         """Retorna y limpia la lista de alertas pendientes"""
-        alerts = self.alerts.copy()
+        alerts = list(self.alerts)
         self.alerts.clear()
         return alerts
 
@@ -182,30 +209,64 @@ class OccupancyCounter:
         """Retorna los IDs actualmente detectados"""
         return list(self.current_ids)
 
-    def get_statistics(self):
-        """Retorna estadísticas basadas en el historial de conteo"""
-        if not self.history:
-            return None
+    def get_ids_at(self, timestamp):
+        """
+        Retorna los IDs presentes en un instante, desde el store si existe.
+
+        Args:
+            timestamp (datetime): Instante a consultar
+
+        Returns:
+            list: IDs presentes, ordenados
+        """
+        if self.store is not None:
+            return self.store.ids_at(timestamp.timestamp())
+        return self.history.ids_at_time(timestamp)
+
+    def get_dwell_time(self, obj_id):
+        """
+        Retorna los segundos que un ID estuvo presente en el historial en memoria.
 
-        counts = [record['count'] for record in self.history]
-        timestamps = [record['timestamp'] for record in self.history]
+        Los IDs del tracker se reinician al relanzar la aplicación, por lo que
+        la permanencia se calcula solo con el historial en memoria (la ventana
+        reciente retomada del store y esta ejecución).
+        """
+        return self.history.dwell_time(obj_id)
+
+    def get_dwell_times(self):
+        """Retorna {id: segundos presente} de todos los IDs del historial en memoria."""
+        return self.history.dwell_times()
+
+    def get_statistics(self, start=None, end=None):
+        """
+        Retorna estadísticas de la sesión a partir de los agregados incrementales.
+
+        Args:
+            start (datetime): Inicio opcional del rango a consultar
+            end (datetime): Fin opcional (exclusivo) del rango a consultar
+        """
+        running = self.stats if start is None and end is None else self._range_stats(start, end)
+        if running is None or running.samples == 0:
+            return None
 
         # Calcular duración de la sesión
+        session_start = datetime.fromtimestamp(running.first_timestamp)
         session_duration = None
-        if len(timestamps) > 1:
-            session_duration = timestamps[-1] - timestamps[0]
+        if running.samples > 1:
+            session_duration = datetime.fromtimestamp(running.last_timestamp) - session_start
 
         stats = {
             'current': self.current_count,
-            'max': max(counts),
-            'min': min(counts),
-            'average': sum(counts) / len(counts),
+            'max': running.max,
+            'min': running.min,
+            'average': running.average,
+            'time_weighted_average': running.time_weighted_average,
             'peak_session': self.peak_count,
-            'total_records': len(self.history),
+            'total_records': running.samples,
             'max_capacity': self.max_capacity,
             'current_occupancy_percentage': self.get_occupancy_percentage(),
             'remaining_capacity': self.get_remaining_capacity(),
-            'session_start': timestamps[0] if timestamps else None,
+            'session_start': session_start,
             'session_duration': session_duration,
             'is_at_capacity': self.is_at_capacity(),
             'is_over_capacity': self.is_over_capacity()
@@ -213,70 +274,131 @@ class OccupancyCounter:
 
         return stats
 
+    def _range_stats(self, start, end):
+        """Calcula los agregados de un rango desde el store o, sin store, desde el historial."""
+        start = start.timestamp() if start is not None else None
+        end = end.timestamp() if end is not None else None
+        if self.store is not None:
+            summary = self.store.query_statistics(start, end)
+            return RunningStats.from_summary(summary) if summary else None
+
+        running = RunningStats()
+        timestamps = self.history.get_timestamps()
+        counts = self.history.get_counts()
+        first = 0 if start is None else np.searchsorted(timestamps, start, side='left')
+        last = len(timestamps) if end is None else np.searchsorted(timestamps, end, side='left')
+        for timestamp, count in zip(timestamps[first:last].tolist(), counts[first:last].tolist()):
+            running.add(timestamp, count)
+        return running
+
     def get_hourly_statistics(self):
         """Retorna estadísticas agrupadas por hora"""
-        if not self.history:
+        if self.stats.samples == 0:
             return None
+        return self.rollups.get('hour')
 
-        hourly_data = {}
-
-        for record in self.history:
-            hour_key = record['timestamp'].strftime('%Y-%m-%d %H:00')
-            if hour_key not in hourly_data:
-                hourly_data[hour_key] = []
-            hourly_data[hour_key].append(record['count'])
-
-        hourly_stats = {}
-        for hour, counts in hourly_data.items():
-            hourly_stats[hour] = {
-                'average': sum(counts) / len(counts),
-                'max': max(counts),
-                'min': min(counts),
-                'samples': len(counts)
-            }
+    def get_rollups(self, resolution='hour'):
+        """
+        Retorna estadísticas agrupadas por intervalo de tiempo.
+
+        Args:
+            resolution (str): 'minute', 'hour' o 'day'
 
-        return hourly_stats
+        Returns:
+            dict: {inicio del intervalo: {'average', 'time_weighted_average',
+                   'max', 'min', 'samples'}}
+        """
+        return self.rollups.get(resolution)
 
-    def export_data(self, filepath):
+    def export_data(self, filepath, start=None, end=None):
         """
         Exporta los datos históricos a un archivo JSON.
 
+        El conjunto de IDs se exporta como una instantánea al inicio del rango
+        más las llegadas y salidas posteriores. Con store los registros se
+        leen del rango pedido y se escriben uno a uno, sin cargar la sesión
+        completa en memoria.
+
         Args:
             filepath (str): Ruta del archivo donde guardar los datos
+            start (datetime): Inicio opcional del rango a exportar
+            end (datetime): Fin opcional (exclusivo) del rango a exportar
         """
+        if start is None and self.store is None and len(self.history):
+            start = datetime.fromtimestamp(self.history.get_timestamps()[0])
+
         data = {
             'export_timestamp': datetime.now().isoformat(),
             'max_capacity': self.max_capacity,
             'current_count': self.current_count,
             'peak_count': self.peak_count,
-            'statistics': self.get_statistics(),
-            'history': []
+            'statistics': self.get_statistics(start, end),
+            'id_snapshot': {
+                'timestamp': start.isoformat() if start is not None else None,
+                'ids': self.get_ids_at(start) if start is not None else []
+            }
         }
 
-        # Convertir timestamps a strings para JSON
-        for record in self.history:
-            data['history'].append({
-                'timestamp': record['timestamp'].isoformat(),
-                'count': record['count'],
-                'ids': record['ids']
-            })
-
         try:
             with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+                # El encabezado termina en "\n}"; el historial y los eventos se agregan al final
+                header = json.dumps(data, indent=2, ensure_ascii=False, default=str)
+                f.write(header[:-2] + ',\n  "history": [')
+                self._write_items(f, self._export_records(start, end))
+                f.write('\n  ],\n  "id_events": [')
+                self._write_items(f, self._export_events(start, end))
+                f.write('\n  ]\n}\n')
             return True
         except Exception as e:
             print(f"Error exportando datos: {e}")
             return False
 
+    @staticmethod
+    def _write_items(f, items):
+        """Escribe los elementos de una lista JSON uno por línea."""
+        for i, item in enumerate(items):
+            f.write((',' if i else '') + '\n    ' + json.dumps(item, ensure_ascii=False))
+
+    def _export_records(self, start, end):
+        """Recorre los conteos a exportar, desde el store si existe."""
+        if self.store is not None:
+            records = self.store.query_counts(start.timestamp() if start is not None else None,
+                                              end.timestamp() if end is not None else None)
+            for timestamp, count in records:
+                yield {'timestamp': datetime.fromtimestamp(timestamp).isoformat(), 'count': count}
+        else:
+            for record in self.history.records(start, end):
+                yield {'timestamp': record['timestamp'].isoformat(), 'count': record['count']}
+
+    def _export_events(self, start, end):
+        """Recorre las llegadas y salidas de IDs a exportar, desde el store si existe."""
+        if self.store is not None:
+            events = self.store.query_events(start.timestamp() if start is not None else None,
+                                             end.timestamp() if end is not None else None)
+        else:
+            events = self.history.events(start, end)
+        for timestamp, obj_id, kind in events:
+            yield {'timestamp': datetime.fromtimestamp(timestamp).isoformat(), 'id': obj_id,
+                   'event': 'arrival' if kind == ARRIVAL else 'departure'}
+
+    def close(self):
+        """Escribe los registros pendientes y cierra el store, si existe."""
+        if self.store is not None:
+            self.store.close()
+
     def reset_session(self):
         """Reinicia los datos de la sesión actual"""
         self.current_ids = set()
         self.current_count = 0
         self.peak_count = 0
-        self.history = []
-        self.alerts = []
-        self._last_alert_level = None
+        self.history.clear()
+        self.stats = RunningStats()
+        self.rollups.clear()
+        if self.store is not None:
+            # Los registros se conservan; la sesión retomada empieza aquí
+            self.store.set_state('session_start', datetime.now().timestamp())
+        self.alerts.clear()
+        self.alert_engine.reset()
 
     def configure_alert_thresholds(self, warning=0.75, critical=0.90):
         """
@@ -308,5 +430,5 @@ class OccupancyCounter:
             'is_over_capacity': self.is_over_capacity(),
             'peak_count': self.peak_count,
             'active_ids': self.get_active_ids(),
-            'alert_level': self._last_alert_level
+            'alert_level': self.alert_engine.level
         }
\ No newline at end of file
@@ -0,0 +1,314 @@
+from bisect import bisect_right
+from datetime import datetime
+import numpy as np
+
+ARRIVAL = 1
+DEPARTURE = -1
+
+
+class OccupancyHistory:
+    def __init__(self, capacity=200000, retention_seconds=7 * 86400,
+                 raw_window_seconds=3600, downsample_seconds=60, snapshot_interval=1000):
+        """
+        Inicializa el historial de ocupación en arreglos columnares acotados.
+
+        Cada registro ocupa una fila de tres columnas preasignadas: instante
+        (epoch en segundos), conteo y posición en el log de eventos de IDs.
+        El log solo guarda llegadas y salidas, con una instantánea completa
+        del conjunto cada snapshot_interval eventos; el conjunto de IDs de
+        cualquier instante se reconstruye desde la instantánea previa más
+        los eventos siguientes. Cada downsample_seconds (y al llenarse) los
+        registros fuera de la retención se descartan y los más antiguos que
+        la ventana reciente se reducen a uno por intervalo (el de mayor
+        conteo). La ventana reciente nunca se reduce: si por sí sola llena el
+        historial, se descartan sus registros más antiguos.
+
+        Args:
+            capacity (int): Registros máximos en memoria
+            retention_seconds (float): Antigüedad máxima de los registros
+            raw_window_seconds (float): Ventana reciente que se guarda sin reducir
+            downsample_seconds (float): Intervalo de los registros antiguos reducidos
+            snapshot_interval (int): Eventos entre instantáneas completas del conjunto
+        """
+        self.capacity = capacity
+        self.retention_seconds = retention_seconds
+        self.raw_window_seconds = raw_window_seconds
+        self.downsample_seconds = downsample_seconds
+        self.snapshot_interval = snapshot_interval
+
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.counts = np.zeros(capacity, dtype=np.int32)
+        self.event_offsets = np.zeros(capacity, dtype=np.int64)
+        self.size = 0
+
+        self._event_timestamps = np.zeros(1024, dtype=np.float64)
+        self._event_ids = np.zeros(1024, dtype=np.int64)
+        self._event_kinds = np.zeros(1024, dtype=np.int8)
+        self.clear()
+
+    def __len__(self):
+        return self.size
+
+    def append(self, timestamp, count, ids):
+        """
+        Agrega un registro; del conjunto de IDs solo se guardan los cambios.
+
+        Args:
+            timestamp (datetime): Instante del registro
+            count (int): Conteo registrado
+            ids (iterable): IDs presentes
+        """
+        epoch = timestamp.timestamp()
+        ids = set(ids)
+        if ids != self._current_ids:
+            for obj_id in sorted(self._current_ids - ids):
+                self._add_event(epoch, obj_id, DEPARTURE)
+            for obj_id in sorted(ids - self._current_ids):
+                self._add_event(epoch, obj_id, ARRIVAL)
+            self._current_ids = ids
+
+        if self._num_events - self._snapshot_offsets[-1] >= self.snapshot_interval:
+            self._add_snapshot(epoch)
+
+        if self.size == self.capacity or epoch >= self._next_compaction:
+            self._compact(epoch)
+
+        row = self.size
+        self.timestamps[row] = epoch
+        self.counts[row] = count
+        self.event_offsets[row] = self._num_events
+        self.size += 1
+
+    def get_timestamps(self):
+        """Instantes (epoch) de los registros en memoria, de solo lectura."""
+        view = self.timestamps[:self.size]
+        view.flags.writeable = False
+        return view
+
+    def get_counts(self):
+        """Conteos de los registros en memoria, de solo lectura."""
+        view = self.counts[:self.size]
+        view.flags.writeable = False
+        return view
+
+    def ids_at(self, row):
+        """Retorna la lista de IDs del registro indicado."""
+        return self._ids_at_offset(int(self.event_offsets[row]))
+
+    def ids_at_time(self, timestamp):
+        """
+        Reconstruye el conjunto de IDs presentes en un instante.
+
+        Args:
+            timestamp (datetime): Instante a consultar
+
+        Returns:
+            list: IDs presentes, ordenados
+        """
+        events = self._event_timestamps[:self._num_events - self._event_base]
+        position = int(np.searchsorted(events, timestamp.timestamp(), side='right'))
+        return self._ids_at_offset(self._event_base + position)
+
+    def records(self, start=None, end=None):
+        """
+        Recorre los registros de conteo, opcionalmente en un rango de tiempo.
+
+        Args:
+            start (datetime): Inicio del rango (inclusive)
+            end (datetime): Fin del rango (exclusive)
+
+        Yields:
+            dict: {'timestamp': datetime, 'count': int}
+        """
+        first, last = self._row_range(start, end)
+        for row in range(first, last):
+            yield {
+                'timestamp': datetime.fromtimestamp(self.timestamps[row]),
+                'count': int(self.counts[row])
+            }
+
+    def events(self, start=None, end=None):
+        """
+        Recorre las llegadas y salidas de IDs posteriores a start y anteriores a end.
+
+        Yields:
+            tuple: (timestamp epoch, id, tipo) con tipo ARRIVAL o DEPARTURE
+        """
+        count = self._num_events - self._event_base
+        timestamps = self._event_timestamps[:count]
+        first = 0 if start is None else int(np.searchsorted(timestamps, start.timestamp(), side='right'))
+        last = count if end is None else int(np.searchsorted(timestamps, end.timestamp(), side='left'))
+        for i in range(first, last):
+            yield float(timestamps[i]), int(self._event_ids[i]), int(self._event_kinds[i])
+
+    def dwell_time(self, obj_id, now=None):
+        """
+        Tiempo total (segundos) que un ID estuvo presente dentro del historial retenido.
+
+        Args:
+            obj_id (int): ID a consultar
+            now (datetime): Instante hasta el que se cuenta si sigue presente;
+                            por defecto el del último registro
+        """
+        return self.dwell_times(now, ids=[obj_id]).get(obj_id, 0.0)
+
+    def dwell_times(self, now=None, ids=None):
+        """
+        Tiempo de permanencia de cada ID, calculado de forma vectorizada.
+
+        La permanencia es la suma de (salida - llegada); los IDs presentes al
+        inicio del log retenido cuentan desde su instantánea base y los
+        presentes ahora, hasta now. Por defecto now es el instante del último
+        registro, de modo que el resultado depende solo de los datos (también
+        al analizar un video, donde el tiempo es el del video).
+
+        Args:
+            now (datetime): Instante hasta el que se cuenta a los presentes
+            ids (list): IDs a consultar; por defecto todos los del log
+
+        Returns:
+            dict: {id: segundos}
+        """
+        if now is not None:
+            now = now.timestamp()
+        else:
+            now = float(self.timestamps[self.size - 1]) if self.size else 0.0
+        count = self._num_events - self._event_base
+        event_ids = self._event_ids[:count]
+        timestamps = self._event_timestamps[:count]
+        kinds = self._event_kinds[:count]
+        if ids is not None:
+            mask = np.isin(event_ids, ids)
+            event_ids, timestamps, kinds = event_ids[mask], timestamps[mask], kinds[mask]
+
+        # Salidas suman su instante y llegadas lo restan
+        unique_ids, inverse = np.unique(event_ids, return_inverse=True)
+        totals = np.zeros(len(unique_ids))
+        np.add.at(totals, inverse, np.where(kinds == DEPARTURE, timestamps, -timestamps))
+        dwell = dict(zip(unique_ids.tolist(), totals.tolist()))
+
+        base_timestamp, base_ids = self._snapshot_timestamps[0], self._snapshots[0]
+        wanted = None if ids is None else set(ids)
+        for obj_id in base_ids.tolist():
+            if wanted is None or obj_id in wanted:
+                dwell[obj_id] = dwell.get(obj_id, 0.0) - base_timestamp
+        for obj_id in self._current_ids:
+            if wanted is None or obj_id in wanted:
+                dwell[obj_id] = dwell.get(obj_id, 0.0) + now
+        return dwell
+
+    def clear(self):
+        """Elimina todos los registros y eventos."""
+        self.size = 0
+        self._event_base = 0
+        self._num_events = 0
+        self._current_ids = set()
+        self._snapshot_offsets = [0]
+        self._snapshot_timestamps = [0.0]
+        self._snapshots = [np.empty(0, dtype=np.int64)]
+        self._next_compaction = -np.inf
+        self._reduced_until = -np.inf  # Los registros anteriores ya están reducidos
+
+    def _row_range(self, start, end):
+        """Filas [primera, última) dentro de un rango de tiempo."""
+        timestamps = self.timestamps[:self.size]
+        first = 0 if start is None else int(np.searchsorted(timestamps, start.timestamp(), side='left'))
+        last = self.size if end is None else int(np.searchsorted(timestamps, end.timestamp(), side='left'))
+        return first, last
+
+    def _add_event(self, timestamp, obj_id, kind):
+        """Agrega un evento al log, creciendo los arreglos si hace falta."""
+        index = self._num_events - self._event_base
+        if index == len(self._event_ids):
+            size = 2 * len(self._event_ids)
+            for name in ('_event_timestamps', '_event_ids', '_event_kinds'):
+                array = getattr(self, name)
+                grown = np.zeros(size, dtype=array.dtype)
+                grown[:index] = array[:index]
+                setattr(self, name, grown)
+
+        self._event_timestamps[index] = timestamp
+        self._event_ids[index] = obj_id
+        self._event_kinds[index] = kind
+        self._num_events += 1
+
+    def _add_snapshot(self, timestamp):
+        """Guarda el conjunto de IDs vigente como instantánea completa."""
+        self._snapshot_offsets.append(self._num_events)
+        self._snapshot_timestamps.append(timestamp)
+        self._snapshots.append(np.array(sorted(self._current_ids), dtype=np.int64))
+
+    def _ids_at_offset(self, offset):
+        """Reconstruye el conjunto tras los primeros `offset` eventos."""
+        index = bisect_right(self._snapshot_offsets, offset) - 1
+        ids = set(self._snapshots[index].tolist())
+
+        # Para cada ID solo importa su último evento posterior a la instantánea
+        first = self._snapshot_offsets[index] - self._event_base
+        last = offset - self._event_base
+        event_ids = self._event_ids[first:last][::-1]
+        kinds = self._event_kinds[first:last][::-1]
+        unique_ids, positions = np.unique(event_ids, return_index=True)
+        last_kinds = kinds[positions]
+        ids.difference_update(unique_ids[last_kinds == DEPARTURE].tolist())
+        ids.update(unique_ids[last_kinds == ARRIVAL].tolist())
+        return sorted(ids)
+
+    def _compact(self, now):
+        """Aplica la retención, reduce los registros antiguos y, si sigue lleno, descarta los más antiguos."""
+        self._next_compaction = now + self.downsample_seconds
+
+        expired = int(np.searchsorted(self.timestamps[:self.size], now - self.retention_seconds, side='left'))
+        if expired:
+            self._select(np.arange(expired, self.size))
+        self._downsample(now - self.raw_window_seconds)
+
+        # La ventana reciente no se reduce: si llena el historial se descartan los más antiguos
+        if self.size > self.capacity * 3 // 4:
+            self._select(np.arange(self.size - self.capacity // 2, self.size))
+
+        self._compact_events()
+
+    def _downsample(self, cutoff):
+        """Deja un registro (el de mayor conteo) por intervalo entre los anteriores a cutoff."""
+        timestamps = self.timestamps[:self.size]
+        # Solo se revisa desde el intervalo que contenía el corte anterior
+        reduced = np.floor(self._reduced_until / self.downsample_seconds) * self.downsample_seconds
+        first = int(np.searchsorted(timestamps, reduced, side='left'))
+        old = int(np.searchsorted(timestamps, cutoff, side='left'))
+        self._reduced_until = max(self._reduced_until, cutoff)
+        if old - first < 2:
+            return
+
+        buckets = np.floor(timestamps[first:old] / self.downsample_seconds).astype(np.int64)
+        order = np.lexsort((-self.counts[first:old], buckets))
+        first_in_bucket = np.r_[True, buckets[order][1:] != buckets[order][:-1]]
+        rows = first + np.sort(order[first_in_bucket])
+        self._select(np.concatenate([np.arange(first), rows, np.arange(old, self.size)]))
+
+    def _select(self, rows):
+        """Conserva solo las filas indicadas (en orden)."""
+        count = len(rows)
+        self.timestamps[:count] = self.timestamps[rows]
+        self.counts[:count] = self.counts[rows]
+        self.event_offsets[:count] = self.event_offsets[rows]
+        self.size = count
+
+    def _compact_events(self):
+        """Descarta los eventos e instantáneas anteriores al primer registro retenido."""
+        oldest = int(self.event_offsets[0]) if self.size else self._num_events
+        index = bisect_right(self._snapshot_offsets, oldest) - 1
+        if index == 0:
+            return
+
+        base = self._snapshot_offsets[index]
+        drop = base - self._event_base
+        remaining = self._num_events - base
+        for name in ('_event_timestamps', '_event_ids', '_event_kinds'):
+            array = getattr(self, name)
+            array[:remaining] = array[drop:drop + remaining]
+
+        self._event_base = base
+        del self._snapshot_offsets[:index]
+        del self._snapshot_timestamps[:index]
+        del self._snapshots[:index]
@@ -0,0 +1,218 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+RESOLUTIONS = {
+    'minute': 60,
+    'hour': 3600,
+    'day': 86400
+}
+
+
+class RunningStats:
+    def __init__(self):
+        """Agregados incrementales de una serie de conteos: O(1) por muestra y por consulta."""
+        self.samples = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+        self.weighted_total = 0.0
+        self.duration = 0.0
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self.last_value = None
+        self._interrupted = False
+
+    @classmethod
+    def from_summary(cls, summary):
+        """
+        Crea los agregados a partir de un resumen ya calculado.
+
+        Args:
+            summary (dict): Claves de OccupancyStore.query_statistics
+
+        Returns:
+            RunningStats: Agregados equivalentes a haber agregado esas muestras
+        """
+        stats = cls()
+        stats.samples = summary['samples']
+        stats.total = summary['total']
+        stats.min = summary['min']
+        stats.max = summary['max']
+        stats.weighted_total = summary['weighted_total']
+        stats.duration = summary['duration']
+        stats.first_timestamp = summary['first_ts']
+        stats.last_timestamp = summary['last_ts']
+        stats.last_value = summary['last_count']
+        return stats
+
+    def add(self, timestamp, value):
+        """
+        Agrega una muestra.
+
+        El promedio ponderado en el tiempo asume que cada valor se mantiene
+        hasta la muestra siguiente.
+
+        Args:
+            timestamp (float): Instante de la muestra (epoch en segundos)
+            value (int): Conteo observado
+        """
+        if self.last_timestamp is None:
+            self.first_timestamp = timestamp
+        elif not self._interrupted:
+            elapsed = max(0.0, timestamp - self.last_timestamp)
+            self.weighted_total += self.last_value * elapsed
+            self.duration += elapsed
+        self._interrupted = False
+
+        self.samples += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.last_timestamp = timestamp
+        self.last_value = value
+
+    def interrupt(self):
+        """Marca una interrupción (aplicación detenida): el tiempo hasta la próxima muestra no se pondera."""
+        self._interrupted = True
+
+    @property
+    def average(self):
+        """Promedio simple de las muestras."""
+        return self.total / self.samples if self.samples else 0.0
+
+    @property
+    def time_weighted_average(self):
+        """Promedio ponderado por el tiempo que se mantuvo cada conteo."""
+        if self.duration > 0:
+            return self.weighted_total / self.duration
+        return float(self.last_value) if self.last_value is not None else 0.0
+
+    def to_dict(self):
+        """Retorna los agregados como diccionario."""
+        return {
+            'average': self.average,
+            'time_weighted_average': self.time_weighted_average,
+            'max': self.max,
+            'min': self.min,
+            'samples': self.samples
+        }
+
+
+class RollupBuckets:
+    def __init__(self, resolution_seconds, max_buckets):
+        """
+        Agregados por intervalos de tiempo (minuto, hora o día) mantenidos al vuelo.
+
+        Los intervalos se alinean a la medianoche local. Solo se calcula la
+        clave de un intervalo al cruzar su límite, así que agregar una muestra
+        es O(1); se conservan los últimos max_buckets intervalos.
+
+        Args:
+            resolution_seconds (int): Duración de cada intervalo
+            max_buckets (int): Intervalos conservados
+        """
+        self.resolution_seconds = resolution_seconds
+        self.max_buckets = max_buckets
+        self.buckets = OrderedDict()
+        self._current = None
+        self._current_start = None
+        self._current_end = None
+
+    def add(self, timestamp, value):
+        """Agrega una muestra al intervalo que le corresponde."""
+        if self._current is None or not self._current_start <= timestamp < self._current_end:
+            self._open_bucket(timestamp)
+        self._current.add(timestamp, value)
+
+    def _open_bucket(self, timestamp):
+        """Ubica (o crea) el intervalo que contiene al instante dado."""
+        moment = datetime.fromtimestamp(timestamp)
+        midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+        offset = (moment - midnight).total_seconds()
+        start = midnight + timedelta(seconds=offset // self.resolution_seconds * self.resolution_seconds)
+        end = start + timedelta(seconds=self.resolution_seconds)
+
+        key = start.strftime('%Y-%m-%d %H:%M')
+        if key not in self.buckets:
+            self.buckets[key] = RunningStats()
+            while len(self.buckets) > self.max_buckets:
+                self.buckets.popitem(last=False)
+
+        self._current = self.buckets[key]
+        self._current_start = start.timestamp()
+        self._current_end = end.timestamp()
+
+    def restore(self, summaries):
+        """
+        Reemplaza los intervalos por resúmenes ya calculados (p. ej. desde el store).
+
+        Args:
+            summaries (dict): {clave del intervalo: resumen}, en orden cronológico
+        """
+        self.clear()
+        for key, summary in list(summaries.items())[-self.max_buckets:]:
+            stats = RunningStats.from_summary(summary)
+            stats.interrupt()
+            self.buckets[key] = stats
+
+    def to_dict(self):
+        """Retorna {clave del intervalo: agregados}."""
+        return {key: stats.to_dict() for key, stats in self.buckets.items()}
+
+    def clear(self):
+        """Elimina todos los intervalos."""
+        self.buckets.clear()
+        self._current = None
+
+
+class OccupancyRollups:
+    def __init__(self, max_minutes=1440, max_hours=744, max_days=366):
+        """
+        Agregados por minuto, hora y día del conteo de ocupación.
+
+        Args:
+            max_minutes (int): Intervalos de un minuto conservados
+            max_hours (int): Intervalos de una hora conservados
+            max_days (int): Intervalos de un día conservados
+        """
+        self.levels = {
+            'minute': RollupBuckets(RESOLUTIONS['minute'], max_minutes),
+            'hour': RollupBuckets(RESOLUTIONS['hour'], max_hours),
+            'day': RollupBuckets(RESOLUTIONS['day'], max_days)
+        }
+
+    def add(self, timestamp, value):
+        """Agrega una muestra a todos los niveles."""
+        for level in self.levels.values():
+            level.add(timestamp, value)
+
+    def get(self, resolution):
+        """
+        Retorna los agregados de un nivel.
+
+        Args:
+            resolution (str): 'minute', 'hour' o 'day'
+
+        Returns:
+            dict: {clave del intervalo: agregados}
+        """
+        if resolution not in self.levels:
+            raise ValueError(f"Resolución no soportada: {resolution}")
+        return self.levels[resolution].to_dict()
+
+    def restore(self, resolution, summaries):
+        """
+        Reemplaza los agregados de un nivel por resúmenes ya calculados.
+
+        Args:
+            resolution (str): 'minute', 'hour' o 'day'
+            summaries (dict): {clave del intervalo: resumen} de OccupancyStore.query_rollups
+        """
+        if resolution not in self.levels:
+            raise ValueError(f"Resolución no soportada: {resolution}")
+        self.levels[resolution].restore(summaries)
+
+    def clear(self):
+        """Elimina los agregados de todos los niveles."""
+        for level in self.levels.values():
+            level.clear()
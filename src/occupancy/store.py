@@ -0,0 +1,331 @@
+from contextlib import closing
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+ARRIVAL = 1
+DEPARTURE = -1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS counts (
+    ts REAL NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_counts_ts ON counts (ts);
+CREATE TABLE IF NOT EXISTS id_events (
+    ts REAL NOT NULL,
+    obj_id INTEGER NOT NULL,
+    kind INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_id_events_ts ON id_events (ts);
+CREATE TABLE IF NOT EXISTS id_snapshots (
+    ts REAL NOT NULL,
+    event_rowid INTEGER NOT NULL,
+    ids TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_id_snapshots_ts ON id_snapshots (ts);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Clave de cada intervalo, igual a la de RollupBuckets (alineada a la medianoche local)
+ROLLUP_FORMATS = {
+    'minute': '%Y-%m-%d %H:%M',
+    'hour': '%Y-%m-%d %H:00',
+    'day': '%Y-%m-%d 00:00'
+}
+
+
+class OccupancyStore:
+    def __init__(self, db_path="output/occupancy.db", batch_size=500, flush_interval=1.0,
+                 snapshot_interval=1000):
+        """
+        Inicializa el almacenamiento durable de solo escritura al final (SQLite en modo WAL).
+
+        Los registros se encolan sin bloquear y un hilo los escribe por lotes
+        en una sola transacción. Las consultas usan el índice por tiempo, de
+        modo que exportar o calcular estadísticas de un rango no carga toda la
+        sesión en memoria.
+
+        Del conjunto de IDs solo se guardan las llegadas y salidas, con una
+        instantánea completa cada snapshot_interval eventos; el conjunto de un
+        instante se reconstruye desde la instantánea previa más los eventos
+        posteriores.
+
+        Args:
+            db_path (str): Ruta de la base de datos
+            batch_size (int): Registros máximos por transacción
+            flush_interval (float): Segundos máximos que un registro espera en la cola
+            snapshot_interval (int): Eventos de IDs entre instantáneas completas
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.snapshot_interval = snapshot_interval
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+        # Conjunto vigente al retomar, para seguir registrando solo los cambios
+        self._current_ids = set(self.ids_at(None))
+        self._events_since_snapshot = 0
+
+    def _connect(self):
+        """Abre una conexión nueva (cada hilo usa la suya); quien la abre debe cerrarla."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def append(self, timestamp, count, ids):
+        """
+        Encola un registro (y los cambios de IDs) para escribirlo en el próximo lote.
+
+        Args:
+            timestamp (float): Instante del registro (epoch en segundos)
+            count (int): Conteo registrado
+            ids (iterable): IDs presentes
+        """
+        ids = set(ids)
+        events = []
+        if ids != self._current_ids:
+            events = ([(timestamp, obj_id, DEPARTURE) for obj_id in sorted(self._current_ids - ids)] +
+                      [(timestamp, obj_id, ARRIVAL) for obj_id in sorted(ids - self._current_ids)])
+            self._current_ids = ids
+        self._queue.put(('record', (timestamp, int(count)), events))
+
+        self._events_since_snapshot += len(events)
+        if self._events_since_snapshot >= self.snapshot_interval:
+            self._queue.put(('snapshot', timestamp, ' '.join(str(obj_id) for obj_id in sorted(ids))))
+            self._events_since_snapshot = 0
+
+    def flush(self):
+        """Bloquea hasta que todos los registros encolados estén escritos; tras close no espera."""
+        if self._writer.is_alive():
+            self._queue.join()
+
+    def close(self):
+        """Escribe lo pendiente y detiene el hilo escritor."""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+
+    def _write_loop(self):
+        """Agrupa los registros encolados y los escribe por lotes."""
+        conn = self._connect()
+        running = True
+        try:
+            while running:
+                item = self._queue.get()
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+                while item is not None:
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    try:
+                        item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                if item is None:
+                    running = False
+
+                try:
+                    with conn:
+                        self._write_batch(conn, batch)
+                except Exception as e:
+                    print(f"Error escribiendo historial de ocupación: {e}")
+                for _ in range(len(batch) + (0 if running else 1)):
+                    self._queue.task_done()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _write_batch(conn, batch):
+        """Escribe un lote en orden; cada instantánea apunta al último evento previo."""
+        counts, events = [], []
+        for kind, *payload in batch:
+            if kind == 'record':
+                counts.append(payload[0])
+                events.extend(payload[1])
+                continue
+
+            conn.executemany("INSERT INTO id_events (ts, obj_id, kind) VALUES (?, ?, ?)", events)
+            events = []
+            timestamp, ids = payload
+            conn.execute(
+                "INSERT INTO id_snapshots (ts, event_rowid, ids) "
+                "SELECT ?, COALESCE(MAX(rowid), 0), ? FROM id_events", (timestamp, ids))
+
+        conn.executemany("INSERT INTO counts (ts, count) VALUES (?, ?)", counts)
+        conn.executemany("INSERT INTO id_events (ts, obj_id, kind) VALUES (?, ?, ?)", events)
+
+    def set_state(self, key, value):
+        """Guarda un valor de estado (p. ej. inicio de la sesión)."""
+        self.flush()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def get_state(self, key, default=None):
+        """Lee un valor de estado guardado."""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def query_counts(self, start=None, end=None):
+        """
+        Recorre los conteos de un rango de tiempo sin cargarlos todos en memoria.
+
+        Args:
+            start (float): Inicio del rango, epoch (inclusive)
+            end (float): Fin del rango, epoch (exclusive)
+
+        Yields:
+            tuple: (timestamp, count)
+        """
+        self.flush()
+        conn = self._connect()
+        try:
+            yield from conn.execute(
+                "SELECT ts, count FROM counts WHERE ts >= ? AND ts < ? ORDER BY ts",
+                self._range(start, end))
+        finally:
+            conn.close()
+
+    def query_events(self, start=None, end=None):
+        """
+        Recorre las llegadas y salidas de IDs posteriores a start y anteriores a end.
+
+        Yields:
+            tuple: (timestamp, id, tipo) con tipo ARRIVAL o DEPARTURE
+        """
+        self.flush()
+        conn = self._connect()
+        try:
+            yield from conn.execute(
+                "SELECT ts, obj_id, kind FROM id_events WHERE ts > ? AND ts < ? ORDER BY rowid",
+                self._range(start, end))
+        finally:
+            conn.close()
+
+    def ids_at(self, timestamp):
+        """
+        Reconstruye el conjunto de IDs presentes en un instante.
+
+        Args:
+            timestamp (float): Instante a consultar (epoch); None para el último
+
+        Returns:
+            list: IDs presentes, ordenados
+        """
+        timestamp = float('inf') if timestamp is None else timestamp
+        self.flush()
+        with closing(self._connect()) as conn:
+            snapshot = conn.execute(
+                "SELECT event_rowid, ids FROM id_snapshots WHERE ts <= ? "
+                "ORDER BY ts DESC, rowid DESC LIMIT 1",
+                (timestamp,)).fetchone()
+            event_rowid, ids = snapshot if snapshot else (0, '')
+            ids = set(int(obj_id) for obj_id in ids.split())
+
+            # Para cada ID solo importa su último evento posterior a la instantánea
+            events = conn.execute(
+                "SELECT obj_id, kind FROM id_events WHERE rowid > ? AND ts <= ? ORDER BY rowid",
+                (event_rowid, timestamp))
+            for obj_id, kind in events:
+                if kind == ARRIVAL:
+                    ids.add(obj_id)
+                else:
+                    ids.discard(obj_id)
+        return sorted(ids)
+
+    def query_statistics(self, start=None, end=None):
+        """
+        Calcula agregados de un rango de tiempo directamente en la base de datos.
+
+        Returns:
+            dict: samples, total, min, max, weighted_total, duration, first_ts,
+                  last_ts, last_count y last_ids; None si no hay registros
+        """
+        self.flush()
+        with closing(self._connect()) as conn:
+            samples, total, minimum, maximum, first_ts, last_ts = conn.execute(
+                "SELECT COUNT(*), SUM(count), MIN(count), MAX(count), MIN(ts), MAX(ts) "
+                "FROM counts WHERE ts >= ? AND ts < ?", self._range(start, end)).fetchone()
+            if not samples:
+                return None
+
+            # Cada conteo se pondera por el tiempo hasta el registro siguiente
+            weighted_total, duration = conn.execute(
+                "SELECT COALESCE(SUM(count * (next_ts - ts)), 0), COALESCE(SUM(next_ts - ts), 0) FROM ("
+                "  SELECT ts, count, LEAD(ts) OVER (ORDER BY ts) AS next_ts"
+                "  FROM counts WHERE ts >= ? AND ts < ?"
+                ") WHERE next_ts IS NOT NULL", self._range(start, end)).fetchone()
+            last_count, = conn.execute(
+                "SELECT count FROM counts WHERE ts >= ? AND ts < ? ORDER BY ts DESC LIMIT 1",
+                self._range(start, end)).fetchone()
+
+        return {
+            'samples': samples,
+            'total': total,
+            'min': minimum,
+            'max': maximum,
+            'weighted_total': weighted_total,
+            'duration': duration,
+            'first_ts': first_ts,
+            'last_ts': last_ts,
+            'last_count': last_count,
+            'last_ids': self.ids_at(last_ts)
+        }
+
+    def query_rollups(self, resolution, start=None, end=None):
+        """
+        Calcula en la base de datos los agregados de cada intervalo de un rango.
+
+        Como en RollupBuckets, cada conteo se pondera solo hasta el registro
+        siguiente del mismo intervalo.
+
+        Args:
+            resolution (str): 'minute', 'hour' o 'day'
+            start (float): Inicio del rango, epoch (inclusive)
+            end (float): Fin del rango, epoch (exclusive)
+
+        Returns:
+            dict: {clave del intervalo: resumen con las claves de query_statistics
+                   salvo last_ids}, en orden cronológico
+        """
+        if resolution not in ROLLUP_FORMATS:
+            raise ValueError(f"Resolución no soportada: {resolution}")
+
+        self.flush()
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT bucket, COUNT(*), SUM(count), MIN(count), MAX(count), MIN(ts), MAX(ts),"
+                "       COALESCE(SUM(count * (next_ts - ts)), 0), COALESCE(SUM(next_ts - ts), 0),"
+                "       MAX(CASE WHEN next_ts IS NULL THEN count END) FROM ("
+                "  SELECT ts, count, bucket, LEAD(ts) OVER (PARTITION BY bucket ORDER BY ts) AS next_ts"
+                "  FROM (SELECT ts, count, strftime(?, ts, 'unixepoch', 'localtime') AS bucket"
+                "        FROM counts WHERE ts >= ? AND ts < ?)"
+                ") GROUP BY bucket ORDER BY bucket",
+                (ROLLUP_FORMATS[resolution],) + self._range(start, end)).fetchall()
+
+        keys = ('samples', 'total', 'min', 'max', 'first_ts', 'last_ts', 'weighted_total', 'duration',
+                'last_count')
+        return {row[0]: dict(zip(keys, row[1:])) for row in rows}
+
+    @staticmethod
+    def _range(start, end):
+        """Convierte un rango opcional en parámetros de consulta."""
+        return (float('-inf') if start is None else start,
+                float('inf') if end is None else end)
@@ -0,0 +1,95 @@
+import cv2
+import numpy as np
+from src.occupancy.count import OccupancyCounter
+from src.occupancy.alerts import AlertEngine
+from src.occupancy.history import OccupancyHistory
+
+MAX_ZONES = 32  # Un bit por zona en la máscara
+
+
+class ZoneOccupancy:
+    def __init__(self, zones, alert_options=None, sinks=None, history_options=None):
+        """
+        Inicializa el conteo de ocupación por zonas poligonales.
+
+        Cada zona se rasteriza una sola vez, a la resolución del frame, en una
+        máscara donde el bit i de cada píxel indica si pertenece a la zona i
+        (las zonas pueden superponerse). Asignar todos los centroides a sus
+        zonas es entonces una sola indexación de NumPy por frame. Cada zona
+        tiene su propio OccupancyCounter con su capacidad y sus alertas.
+
+        Args:
+            zones (list): Diccionarios {'name', 'points': [(x, y), ...], 'capacity'}
+            alert_options (dict): Parámetros del AlertEngine de cada zona
+            sinks (list): Destinos compartidos de las alertas de las zonas
+            history_options (dict): Parámetros del OccupancyHistory de cada zona
+                                    (capacidad, retención, ventana y reducción)
+        """
+        if len(zones) > MAX_ZONES:
+            raise ValueError(f"Se admiten como máximo {MAX_ZONES} zonas")
+
+        self.names = [zone['name'] for zone in zones]
+        self.polygons = [np.array(zone['points'], dtype=np.int32).reshape(-1, 2) for zone in zones]
+        self.counters = {
+            zone['name']: OccupancyCounter(
+                max_capacity=zone.get('capacity'),
+                history=OccupancyHistory(**(history_options or {})),
+                alert_engine=AlertEngine(sinks=sinks, source=zone['name'], **(alert_options or {})))
+            for zone in zones
+        }
+        self._bits = np.uint32(1) << np.arange(len(zones), dtype=np.uint32)
+        self._masks = {}
+
+    def get_mask(self, frame_shape):
+        """Retorna (y cachea) la máscara de zonas para una forma de frame."""
+        key = tuple(frame_shape[:2])
+        if key not in self._masks:
+            mask = np.zeros(key, dtype=np.uint32)
+            layer = np.zeros(key, dtype=np.uint8)
+            for bit, polygon in zip(self._bits, self.polygons):
+                layer[:] = 0
+                cv2.fillPoly(layer, [polygon], 1)
+                mask[layer > 0] |= bit
+            self._masks[key] = mask
+        return self._masks[key]
+
+    def update(self, tracked_objects, frame_shape, timestamp=None):
+        """
+        Actualiza el contador de cada zona con los tracks cuyo centroide cae en ella.
+
+        Args:
+            tracked_objects (TrackedObjectsView): Vista retornada por el tracker
+            frame_shape (tuple): Forma del frame (alto, ancho, ...)
+            timestamp (datetime): Instante del registro; por defecto el actual
+        """
+        mask = self.get_mask(frame_shape)
+        height, width = mask.shape
+
+        centroids = tracked_objects.centroids
+        xs = np.clip(centroids[:, 0], 0, width - 1)
+        ys = np.clip(centroids[:, 1], 0, height - 1)
+        in_frame = (xs == centroids[:, 0]) & (ys == centroids[:, 1])
+
+        # Pertenencia (tracks x zonas) a partir de los bits del píxel del centroide
+        bits = np.where(in_frame, mask[ys, xs], 0)
+        membership = (bits[:, None] & self._bits) != 0
+        for name, inside in zip(self.names, membership.T):
+            self.counters[name].update_ids(tracked_objects.ids[inside].tolist(), timestamp=timestamp)
+
+    def get_counts(self):
+        """Retorna el conteo actual de cada zona."""
+        return {name: counter.get_current_count() for name, counter in self.counters.items()}
+
+    def get_alerts(self):
+        """Retorna y limpia las alertas pendientes de todas las zonas."""
+        alerts = []
+        for name, counter in self.counters.items():
+            for alert in counter.get_alerts():
+                alert['zone'] = name
+                alerts.append(alert)
+        return alerts
+
+    def reset_session(self):
+        """Reinicia los datos de sesión de todas las zonas."""
+        for counter in self.counters.values():
+            counter.reset_session()
@@ -0,0 +1,378 @@
+import cv2
+import csv
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from scipy.optimize import linear_sum_assignment
+from src.utils.constants import MAX_TRACKING_DISTANCE
+
+SEEK_MARGIN_FRAMES = 60  # Frames antes del inicio pedido desde donde se avanza con grab()
+
+
+def split_segments(total_frames, num_segments):
+    """
+    Divide un video en segmentos contiguos de frames.
+
+    Args:
+        total_frames (int): Número total de frames del video
+        num_segments (int): Número de segmentos deseado
+
+    Returns:
+        list: Lista de tuplas (frame inicial, frame final exclusivo)
+    """
+    num_segments = max(1, min(num_segments, total_frames))
+    bounds = np.linspace(0, total_frames, num_segments + 1).astype(int)
+    return [(int(bounds[i]), int(bounds[i + 1])) for i in range(num_segments)]
+
+
+def _init_worker(threads_per_worker):
+    """Limita los hilos internos de cada proceso para no sobresuscribir la CPU."""
+    cv2.setNumThreads(1)
+    try:
+        import torch
+        torch.set_num_threads(threads_per_worker)
+    except ImportError:
+        pass
+
+
+def _seek(cap, frame_index, margin=SEEK_MARGIN_FRAMES):
+    """
+    Posiciona la captura exactamente en frame_index.
+
+    En códecs con frames intermedios (H.264/HEVC) CAP_PROP_POS_FRAMES no
+    siempre cae en el frame pedido, y muchos backends reportan el índice
+    pedido y no el real, lo que desplazaría los timestamps y los estados de
+    borde de cada segmento. Se busca un punto anterior, se decodifica un
+    frame y su posición real se deduce de su instante (CAP_PROP_POS_MSEC);
+    desde ahí se avanza con grab() contando frames. Si el instante no es
+    confiable se avanza desde el inicio del video.
+    """
+    if frame_index <= 0:
+        return
+
+    start = max(0, frame_index - margin)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    position = None
+    if start > 0 and fps > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+        if cap.grab():
+            msec = cap.get(cv2.CAP_PROP_POS_MSEC)
+            grabbed = int(round(msec * fps / 1000.0))
+            if msec > 0 and grabbed < frame_index:
+                position = grabbed + 1
+
+    if position is None:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        position = 0
+    for _ in range(frame_index - position):
+        if not cap.grab():
+            break
+
+
+def _snapshot(tracker):
+    """Retorna los IDs y centroides actualmente rastreados."""
+    tracked_objects = tracker.get_tracked_objects()
+    return tracked_objects.ids.copy(), tracked_objects.centroids.astype(np.float64)
+
+
+def _process_segment(video_path, model_path, model_options, tracker_type, confidence, batch_size,
+                     start, end, warmup_start, motion_gate_options=None, tiling_options=None,
+                     cost_options=None, counting_lines=None):
+    """
+    Procesa un segmento del video en un proceso independiente.
+
+    Los frames [warmup_start, start) solo sirven para calentar el tracker, de
+    modo que su estado en el frame start - 1 pueda empatarse con el estado
+    final del segmento anterior.
+
+    Si motion_gate_options no es None, se crea una MotionGate con esas opciones
+    y los frames sin movimiento conservan el estado anterior del tracker. Si
+    tiling_options no es None, la detección se hace por mosaicos. cost_options
+    son los argumentos del AssociationCost del tracker. Con counting_lines se
+    registran las entradas - salidas de cada frame del segmento.
+
+    Returns:
+        dict: Conteo e IDs locales por frame, y estados del tracker en los bordes
+    """
+    from src.detection.model_loader import ModelLoader
+    from src.detection.detect import PersonDetector
+    from src.detection.tiled import TiledPersonDetector
+    from src.tracking.factory import create_tracker
+    from src.tracking.costs import AssociationCost
+    from src.occupancy.line_crossing import LineCrossingCounter
+    from src.preprocessing.motion_gate import MotionGate
+
+    model_loader = ModelLoader(model_path, **model_options)
+    if not model_loader.load_model():
+        raise Exception(f"No se pudo cargar el modelo: {model_path}")
+    detector = PersonDetector(model_loader.get_model(), confidence_threshold=confidence,
+                              batch_size=batch_size)
+    if tiling_options is not None:
+        detector = TiledPersonDetector(detector, **tiling_options)
+    tracker = create_tracker(tracker_type, cost=AssociationCost(**(cost_options or {})))
+    line_counter = LineCrossingCounter(counting_lines) if counting_lines else None
+    motion_gate = MotionGate(**motion_gate_options) if motion_gate_options is not None else None
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise Exception(f"No se pudo abrir el video: {video_path}")
+    _seek(cap, warmup_start)
+
+    counts = np.zeros(end - start, dtype=np.int32)
+    net = np.zeros(end - start, dtype=np.int32)
+    flat_ids = []
+    entry_state = (np.empty(0, dtype=np.int64), np.empty((0, 2)))
+    frames = [None] * batch_size
+    frame_index = warmup_start
+    tracked_frame = None  # Frame de la última actualización del tracker
+    finished = False
+
+    try:
+        while not finished and frame_index < end:
+            # Decodificar sobre buffers reutilizables hasta completar un lote;
+            # los frames sin movimiento reutilizan el buffer sobrante
+            pending = []
+            num_frames = 0
+            while num_frames < batch_size and frame_index + len(pending) < end:
+                ret, frames[num_frames] = cap.read(frames[num_frames])
+                if not ret:
+                    finished = True
+                    break
+                if motion_gate is None or motion_gate.should_detect(frames[num_frames]):
+                    pending.append(num_frames)
+                    num_frames += 1
+                else:
+                    pending.append(None)
+            if not pending:
+                break
+
+            detections_batch = detector.detect_persons_batch(frames[:num_frames])
+            for batch_index in pending:
+                if batch_index is not None:
+                    elapsed = frame_index - tracked_frame if tracked_frame is not None else 1
+                    tracker.update(detections_batch[batch_index], elapsed_frames=elapsed)
+                    tracked_frame = frame_index
+
+                if frame_index == start - 1:
+                    entry_state = _snapshot(tracker)
+                elif frame_index >= start:
+                    tracked_objects = tracker.get_tracked_objects()
+                    ids = tracked_objects.ids.tolist()
+                    counts[frame_index - start] = len(ids)
+                    flat_ids.extend(ids)
+                    if line_counter is not None:
+                        entries, exits = line_counter.update(tracked_objects)
+                        net[frame_index - start] = entries - exits
+                frame_index += 1
+    finally:
+        cap.release()
+
+    processed = max(0, frame_index - start)
+    return {
+        'start': start,
+        'counts': counts[:processed],
+        'net': net[:processed] if line_counter is not None else None,
+        'line_counts': line_counter.get_line_counts() if line_counter is not None else None,
+        'ids': np.array(flat_ids, dtype=np.int64),
+        'entry_state': entry_state,
+        'exit_state': _snapshot(tracker)
+    }
+
+
+def _match_states(previous_state, entry_state, max_distance=MAX_TRACKING_DISTANCE):
+    """
+    Empareja los tracks de dos segmentos observados en el mismo frame.
+
+    Returns:
+        dict: ID local del segmento nuevo -> ID local del segmento anterior
+    """
+    prev_ids, prev_centroids = previous_state
+    entry_ids, entry_centroids = entry_state
+    if len(prev_ids) == 0 or len(entry_ids) == 0:
+        return {}
+
+    D = np.linalg.norm(entry_centroids[:, np.newaxis] - prev_centroids, axis=2)
+    rows, cols = linear_sum_assignment(D)
+    keep = D[rows, cols] <= max_distance
+    return dict(zip(entry_ids[rows[keep]].tolist(), prev_ids[cols[keep]].tolist()))
+
+
+class ParallelVideoAnalyzer:
+    def __init__(self, counter, model_path, model_options=None, tracker_type="simple",
+                 confidence_threshold=0.5, batch_size=8,
+                 workers=None, segments=None, overlap_frames=30, motion_gate_options=None,
+                 tiling_options=None, cost_options=None, counting_lines=None):
+        """
+        Inicializa el analizador offline por segmentos en paralelo.
+
+        Cada segmento se procesa en un proceso con su propio ModelLoader,
+        PersonDetector y tracker. Los IDs se unen en los bordes para
+        no contar dos veces a la misma persona.
+
+        Args:
+            counter (OccupancyCounter): Contador de ocupación del video completo
+            model_path (str): Ruta del modelo YOLO
+            model_options (dict): Argumentos adicionales de ModelLoader (backend, imgsz, ...)
+            tracker_type (str): Tipo de tracker de cada proceso ('simple' o 'kalman')
+            confidence_threshold (float): Umbral de confianza de detección
+            batch_size (int): Frames por llamada al modelo en cada proceso
+            workers (int): Procesos en paralelo (por defecto, núcleos disponibles)
+            segments (int): Número de segmentos (por defecto, igual a workers)
+            overlap_frames (int): Frames previos usados para calentar el tracker
+            motion_gate_options (dict): Argumentos de MotionGate para cada proceso,
+                                        o None para detectar en todos los frames
+            tiling_options (dict): Argumentos de TiledPersonDetector para cada
+                                   proceso, o None para detectar sobre el frame completo
+            cost_options (dict): Argumentos de AssociationCost del tracker de cada proceso
+            counting_lines (list): Líneas virtuales; si se indican, la ocupación
+                                   es entradas - salidas acumuladas entre segmentos
+        """
+        self.counter = counter
+        self.model_path = model_path
+        self.model_options = model_options or {}
+        self.tracker_type = tracker_type
+        self.confidence_threshold = confidence_threshold
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count() or 1
+        self.segments = segments or self.workers
+        self.overlap_frames = overlap_frames
+        self.motion_gate_options = motion_gate_options
+        self.tiling_options = tiling_options
+        self.cost_options = cost_options
+        self.counting_lines = counting_lines
+
+    def analyze(self, video_path, csv_path=None, start_time=None):
+        """
+        Procesa un video completo repartiendo sus segmentos entre procesos.
+
+        Args:
+            video_path (str): Ruta del archivo de video
+            csv_path (str): Ruta opcional del CSV con el conteo por frame
+            start_time (datetime): Instante real del primer frame
+
+        Returns:
+            dict: Resumen del procesamiento
+        """
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise Exception(f"No se pudo abrir el video: {video_path}")
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+
+        if total_frames <= 0:
+            raise Exception(f"No se pudo determinar la duración del video: {video_path}")
+        if start_time is None:
+            start_time = datetime.fromtimestamp(os.path.getmtime(video_path)) - timedelta(seconds=total_frames / fps)
+
+        started = time.perf_counter()
+
+        # Exportar el backend una sola vez antes de lanzar los procesos, para
+        # que todos encuentren el artefacto en caché; si falla, los procesos
+        # usan PyTorch en lugar de intentar exportar todos a la vez
+        model_options = self.model_options
+        if model_options.get('backend', 'pytorch') != 'pytorch':
+            from src.detection.model_loader import ModelLoader
+            try:
+                ModelLoader(self.model_path, **model_options).export_backend()
+            except Exception as e:
+                print(f"No se pudo exportar el backend, los procesos usarán PyTorch: {e}")
+                model_options = {**model_options, 'backend': 'pytorch'}
+
+        threads_per_worker = max(1, (os.cpu_count() or 1) // self.workers)
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(threads_per_worker,)) as executor:
+            futures = [
+                executor.submit(_process_segment, video_path, self.model_path, model_options,
+                                self.tracker_type,
+                                self.confidence_threshold, self.batch_size, start, end,
+                                max(0, start - self.overlap_frames), self.motion_gate_options,
+                                self.tiling_options, self.cost_options, self.counting_lines)
+                for start, end in split_segments(total_frames, self.segments)
+            ]
+            results = [future.result() for future in futures]
+
+        processed = self._stitch(results, fps, start_time, csv_path)
+
+        elapsed = time.perf_counter() - started
+        video_duration = processed / fps
+        summary = {
+            'video_path': video_path,
+            'frames_processed': processed,
+            'segments': len(results),
+            'video_duration_s': video_duration,
+            'processing_time_s': elapsed,
+            'processing_fps': processed / elapsed if elapsed > 0 else 0.0,
+            'realtime_factor': video_duration / elapsed if elapsed > 0 else 0.0
+        }
+        if self.counting_lines:
+            # Las entradas y salidas de cada segmento son disjuntas, se suman
+            line_counts = {}
+            for result in results:
+                for name, counts in result['line_counts'].items():
+                    totals = line_counts.setdefault(name, {'entries': 0, 'exits': 0})
+                    totals['entries'] += counts['entries']
+                    totals['exits'] += counts['exits']
+            summary['line_counts'] = line_counts
+        return summary
+
+    def _stitch(self, results, fps, start_time, csv_path):
+        """Traduce los IDs locales a globales y alimenta el contador en orden."""
+        csv_file = None
+        writer = None
+        if csv_path:
+            csv_file = open(csv_path, 'w', newline='', encoding='utf-8')
+            writer = csv.writer(csv_file)
+            writer.writerow(['frame', 'video_time_s', 'timestamp', 'count', 'ids'])
+
+        next_global_id = 0
+        occupancy = 0
+        previous_map = {}
+        previous_exit = None
+        processed = 0
+
+        try:
+            for result in results:
+                # IDs que continúan desde el segmento anterior
+                id_map = {}
+                if previous_exit is not None:
+                    matches = _match_states(previous_exit, result['entry_state'])
+                    id_map = {local: previous_map[prev] for local, prev in matches.items()
+                              if prev in previous_map}
+
+                offsets = np.concatenate(([0], np.cumsum(result['counts'])))
+                for i in range(len(result['counts'])):
+                    current_ids = []
+                    for local_id in result['ids'][offsets[i]:offsets[i + 1]].tolist():
+                        if local_id not in id_map:
+                            id_map[local_id] = next_global_id
+                            next_global_id += 1
+                        current_ids.append(id_map[local_id])
+
+                    frame_index = result['start'] + i
+                    video_time = frame_index / fps
+                    timestamp = start_time + timedelta(seconds=video_time)
+                    if result['net'] is not None:
+                        occupancy += int(result['net'][i])
+                        self.counter.update_count(occupancy, current_ids, timestamp=timestamp)
+                    else:
+                        self.counter.update_ids(current_ids, timestamp=timestamp)
+
+                    if writer:
+                        writer.writerow([frame_index, f"{video_time:.3f}", timestamp.isoformat(),
+                                         self.counter.current_count,
+                                         ' '.join(str(obj_id) for obj_id in current_ids)])
+                    processed += 1
+
+                # Los IDs del estado final que no aparecieron en ningún frame
+                # registrado no tienen traducción y se tratarán como nuevos
+                previous_map = id_map
+                previous_exit = result['exit_state']
+        finally:
+            if csv_file:
+                csv_file.close()
+
+        return processed
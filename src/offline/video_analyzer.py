@@ -0,0 +1,191 @@
+import cv2
+import csv
+import numpy as np
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+
+
+class VideoAnalyzer:
+    def __init__(self, detector, tracker, counter, queue_size=16, motion_gate=None,
+                 line_counter=None, zones=None):
+        """
+        Inicializa el analizador offline de videos.
+
+        Decodifica el archivo de forma secuencial en un hilo aparte (sin
+        descartar frames) mientras el hilo principal ejecuta
+        detección por lotes → tracking → conteo a la máxima velocidad posible.
+
+        Args:
+            detector (PersonDetector): Detector de personas
+            tracker (SimpleTracker): Tracker de objetos
+            counter (OccupancyCounter): Contador de ocupación
+            queue_size (int): Frames decodificados en espera de detección
+            motion_gate (MotionGate): Compuerta opcional para omitir frames estáticos
+            line_counter (LineCrossingCounter): Conteo opcional por líneas virtuales
+                                                (ocupación = entradas - salidas)
+            zones (ZoneOccupancy): Conteo opcional por zonas poligonales
+        """
+        self.detector = detector
+        self.tracker = tracker
+        self.counter = counter
+        self.queue_size = queue_size
+        self.motion_gate = motion_gate
+        self.line_counter = line_counter
+        self.zones = zones
+
+    def analyze(self, video_path, csv_path=None, start_time=None):
+        """
+        Procesa todos los frames de un video.
+
+        Args:
+            video_path (str): Ruta del archivo de video
+            csv_path (str): Ruta opcional del CSV con el conteo por frame
+            start_time (datetime): Instante real del primer frame. Por defecto
+                                   se estima a partir de la fecha de modificación
+                                   del archivo menos su duración.
+
+        Returns:
+            dict: Resumen del procesamiento
+        """
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise Exception(f"No se pudo abrir el video: {video_path}")
+
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+        if start_time is None:
+            duration = total_frames / fps if total_frames > 0 else 0
+            start_time = datetime.fromtimestamp(os.path.getmtime(video_path)) - timedelta(seconds=duration)
+
+        # Pool de buffers reutilizables: el decodificador escribe sobre ellos
+        # y el hilo principal los devuelve al terminar de procesarlos
+        pool_size = self.queue_size + self.detector.batch_size
+        pool = [np.empty((height, width, 3), dtype=np.uint8) for _ in range(pool_size)]
+        free_queue = queue.Queue()
+        for index in range(len(pool)):
+            free_queue.put(index)
+        ready_queue = queue.Queue()
+        stop_event = threading.Event()
+
+        decoder = threading.Thread(target=self._decode_loop,
+                                   args=(cap, pool, free_queue, ready_queue, stop_event))
+        decoder.daemon = True
+        decoder.start()
+
+        csv_file = None
+        writer = None
+        if csv_path:
+            csv_file = open(csv_path, 'w', newline='', encoding='utf-8')
+            writer = csv.writer(csv_file)
+            writer.writerow(['frame', 'video_time_s', 'timestamp', 'count', 'ids'])
+
+        processed = 0
+        detected = 0
+        tracked_frame = None  # Frame de la última actualización del tracker
+        finished = False
+        started = time.perf_counter()
+        try:
+            while not finished:
+                # Reunir frames consecutivos hasta completar un lote para el
+                # detector; los frames sin movimiento liberan su buffer de inmediato
+                pending = []
+                to_detect = []
+                while len(to_detect) < self.detector.batch_size:
+                    item = ready_queue.get()
+                    if item is None:
+                        finished = True
+                        break
+
+                    frame_index, buffer_index = item
+                    if self.motion_gate is None or self.motion_gate.should_detect(pool[buffer_index]):
+                        pending.append((frame_index, len(to_detect)))
+                        to_detect.append(buffer_index)
+                    else:
+                        pending.append((frame_index, None))
+                        free_queue.put(buffer_index)
+                if not pending:
+                    break
+
+                detections_batch = self.detector.detect_persons_batch([pool[i] for i in to_detect])
+                for buffer_index in to_detect:
+                    free_queue.put(buffer_index)
+                detected += len(to_detect)
+
+                # El tracking sigue siendo secuencial, en el orden del video; en
+                # los frames omitidos el tracker conserva su estado anterior
+                for frame_index, batch_index in pending:
+                    if batch_index is not None:
+                        elapsed = frame_index - tracked_frame if tracked_frame is not None else 1
+                        self.tracker.update(detections_batch[batch_index], elapsed_frames=elapsed)
+                        tracked_frame = frame_index
+                    tracked_objects = self.tracker.get_tracked_objects()
+                    current_ids = tracked_objects.ids.tolist()
+
+                    video_time = frame_index / fps
+                    timestamp = start_time + timedelta(seconds=video_time)
+                    if self.line_counter is not None:
+                        self.line_counter.update(tracked_objects)
+                        self.counter.update_count(self.line_counter.occupancy, current_ids,
+                                                  timestamp=timestamp)
+                    else:
+                        self.counter.update_ids(current_ids, timestamp=timestamp)
+                    if self.zones is not None:
+                        self.zones.update(tracked_objects, (height, width), timestamp=timestamp)
+
+                    if writer:
+                        writer.writerow([frame_index, f"{video_time:.3f}", timestamp.isoformat(),
+                                         self.counter.current_count,
+                                         ' '.join(str(i) for i in current_ids)])
+                    processed += 1
+        finally:
+            # Desbloquear al decodificador si el procesamiento terminó antes
+            stop_event.set()
+            free_queue.put(None)
+            decoder.join()
+            cap.release()
+            if csv_file:
+                csv_file.close()
+
+        elapsed = time.perf_counter() - started
+        video_duration = processed / fps
+        summary = {
+            'video_path': video_path,
+            'frames_processed': processed,
+            'frames_detected': detected,
+            'video_duration_s': video_duration,
+            'processing_time_s': elapsed,
+            'processing_fps': processed / elapsed if elapsed > 0 else 0.0,
+            'realtime_factor': video_duration / elapsed if elapsed > 0 else 0.0
+        }
+        if self.line_counter is not None:
+            summary['line_counts'] = self.line_counter.get_line_counts()
+        if self.zones is not None:
+            summary['zone_peaks'] = {name: counter.get_peak_count()
+                                     for name, counter in self.zones.counters.items()}
+        return summary
+
+    def _decode_loop(self, cap, pool, free_queue, ready_queue, stop_event):
+        """Decodifica frames secuencialmente sobre los buffers libres del pool."""
+        frame_index = 0
+        try:
+            while not stop_event.is_set():
+                # Esperar un buffer libre: nunca se descartan frames
+                buffer_index = free_queue.get()
+                if buffer_index is None:
+                    break
+                ret, frame = cap.read(pool[buffer_index])
+                if not ret:
+                    break
+
+                # Si el decodificador reservó un array nuevo, conservarlo en el pool
+                pool[buffer_index] = frame
+                ready_queue.put((frame_index, buffer_index))
+                frame_index += 1
+        finally:
+            ready_queue.put(None)
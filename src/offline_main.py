@@ -0,0 +1,162 @@
+import argparse
+import sys
+import os
+from datetime import datetime
+
+# Agregar el directorio raíz al path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+def parse_args():
+    """Lee los argumentos de línea de comandos."""
+    parser = argparse.ArgumentParser(
+        description="Análisis offline (sin interfaz) de videos grabados")
+    parser.add_argument("videos", nargs="+", help="Archivos de video a procesar")
+    parser.add_argument("--output-dir", default=None,
+                        help="Directorio de salida (por defecto OUTPUT_DIR)")
+    parser.add_argument("--model", default=None,
+                        help="Ruta del modelo YOLO (por defecto YOLO_MODEL_PATH)")
+    parser.add_argument("--confidence", type=float, default=None,
+                        help="Umbral de confianza de detección")
+    parser.add_argument("--capacity", type=int, default=None,
+                        help="Capacidad máxima del espacio")
+    parser.add_argument("--start", default=None,
+                        help="Fecha y hora del primer frame (ISO 8601)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Procesos en paralelo; >1 procesa el video por segmentos")
+    return parser.parse_args()
+
+def main():
+    """Procesa uno o más videos sin interfaz gráfica."""
+    args = parse_args()
+
+    # Importar después de configurar el path
+    from config import settings
+    from src.detection.model_loader import ModelLoader
+    from src.detection.detect import PersonDetector
+    from src.detection.tiled import TiledPersonDetector
+    from src.tracking.factory import create_tracker
+    from src.tracking.costs import AssociationCost
+    from src.occupancy.count import OccupancyCounter
+    from src.occupancy.history import OccupancyHistory
+    from src.occupancy.line_crossing import LineCrossingCounter
+    from src.occupancy.zones import ZoneOccupancy
+    from src.offline.video_analyzer import VideoAnalyzer
+    from src.offline.parallel import ParallelVideoAnalyzer
+    from src.preprocessing.motion_gate import MotionGate
+    from src.system_logger import SystemLogger
+
+    logger = SystemLogger(settings.LOGS_DIR)
+    output_dir = args.output_dir or settings.OUTPUT_DIR
+    os.makedirs(output_dir, exist_ok=True)
+
+    model_path = args.model or settings.YOLO_MODEL_PATH
+    confidence = args.confidence if args.confidence is not None else settings.DETECTION_CONFIDENCE_THRESHOLD
+    workers = args.workers or settings.OFFLINE_WORKERS
+    model_options = {
+        'backend': settings.MODEL_BACKEND,
+        'imgsz': settings.MODEL_IMAGE_SIZE,
+        'warmup_runs': settings.MODEL_WARMUP_RUNS
+    }
+
+    # En modo paralelo cada proceso carga su propio modelo
+    detector = None
+    if workers <= 1:
+        model_loader = ModelLoader(model_path, **model_options)
+        if not model_loader.load_model():
+            logger.error("No se pudo cargar el modelo YOLO")
+            sys.exit(1)
+        detector = PersonDetector(model_loader.get_model(), confidence_threshold=confidence,
+                                  batch_size=settings.DETECTION_BATCH_SIZE)
+    start_time = datetime.fromisoformat(args.start) if args.start else None
+
+    cost_options = {
+        'cost': settings.TRACKING_COST,
+        'iou_weight': settings.TRACKING_IOU_WEIGHT,
+        'gate_scale': settings.TRACKING_GATE_SCALE
+    }
+
+    motion_gate_options = None
+    if settings.MOTION_GATE_ENABLED:
+        motion_gate_options = {
+            'threshold': settings.MOTION_THRESHOLD,
+            'refresh_interval': settings.MOTION_REFRESH_INTERVAL,
+            'downscale_width': settings.MOTION_DOWNSCALE_WIDTH
+        }
+
+    for video_path in args.videos:
+        name = os.path.splitext(os.path.basename(video_path))[0]
+        json_path = os.path.join(output_dir, f"{name}_occupancy.json")
+        csv_path = os.path.join(output_dir, f"{name}_occupancy.csv")
+
+        # Cada video es una sesión independiente
+        tiling_options = None
+        if settings.TILED_DETECTION_ENABLED:
+            tiling_options = {
+                'tile_size': settings.TILE_SIZE,
+                'overlap': settings.TILE_OVERLAP,
+                'nms_threshold': settings.NMS_THRESHOLD,
+                'rois': settings.CAMERA_ROIS.get(video_path,
+                                                 settings.CAMERA_ROIS.get(os.path.basename(video_path)))
+            }
+
+        zone_config = settings.CAMERA_ZONES.get(video_path,
+                                                settings.CAMERA_ZONES.get(os.path.basename(video_path)))
+        zones = None
+
+        history_options = {
+            'capacity': settings.HISTORY_CAPACITY,
+            'retention_seconds': settings.HISTORY_RETENTION_HOURS * 3600,
+            'raw_window_seconds': settings.HISTORY_RAW_WINDOW_MINUTES * 60,
+            'downsample_seconds': settings.HISTORY_DOWNSAMPLE_SECONDS,
+            'snapshot_interval': settings.HISTORY_SNAPSHOT_INTERVAL
+        }
+        history = OccupancyHistory(**history_options)
+        counter = OccupancyCounter(max_capacity=args.capacity, history=history)
+        if workers > 1:
+            if zone_config:
+                logger.warning("El conteo por zonas no está disponible en modo paralelo; se omite")
+            analyzer = ParallelVideoAnalyzer(counter, model_path, model_options=model_options,
+                                             confidence_threshold=confidence,
+                                             tracker_type=settings.TRACKER_TYPE,
+                                             cost_options=cost_options,
+                                             counting_lines=settings.COUNTING_LINES,
+                                             batch_size=settings.DETECTION_BATCH_SIZE,
+                                             workers=workers,
+                                             overlap_frames=settings.OFFLINE_SEGMENT_OVERLAP,
+                                             motion_gate_options=motion_gate_options,
+                                             tiling_options=tiling_options)
+        else:
+            motion_gate = MotionGate(**motion_gate_options) if motion_gate_options else None
+            video_detector = detector
+            if tiling_options is not None:
+                video_detector = TiledPersonDetector(detector, **tiling_options)
+            tracker = create_tracker(settings.TRACKER_TYPE, cost=AssociationCost(**cost_options),
+                                     trajectory_length=settings.TRAJECTORY_LENGTH)
+            line_counter = LineCrossingCounter(settings.COUNTING_LINES) if settings.COUNTING_LINES else None
+            zones = ZoneOccupancy(zone_config, history_options=history_options) if zone_config else None
+            analyzer = VideoAnalyzer(video_detector, tracker, counter,
+                                     queue_size=settings.OFFLINE_DECODE_QUEUE_SIZE,
+                                     motion_gate=motion_gate, line_counter=line_counter,
+                                     zones=zones)
+
+        logger.info(f"Procesando video: {video_path}")
+        try:
+            summary = analyzer.analyze(video_path, csv_path=csv_path, start_time=start_time)
+        except Exception as e:
+            logger.error(f"Error procesando {video_path}: {e}")
+            continue
+
+        counter.export_data(json_path)
+        if zones is not None:
+            for zone_name, zone_counter in zones.counters.items():
+                zone_counter.export_data(os.path.join(output_dir, f"{name}_{zone_name}_occupancy.json"))
+        logger.info(
+            f"{summary['frames_processed']} frames en {summary['processing_time_s']:.1f} s "
+            f"({summary['processing_fps']:.1f} FPS, {summary['realtime_factor']:.1f}x tiempo real) "
+            f"- pico: {counter.get_peak_count()} personas"
+        )
+        logger.info(f"Resultados: {json_path}, {csv_path}")
+
+if __name__ == "__main__":
+    main()
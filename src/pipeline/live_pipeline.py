@@ -0,0 +1,174 @@
+import threading
+import time
+import numpy as np
+from src.pipeline.queues import DropOldestQueue
+
+class LivePipeline:
+    def __init__(self, camera, detector, tracker, counter, render_fn,
+                 motion_gate=None, controller=None, num_buffers=4, line_counter=None,
+                 zones=None):
+        """
+        Inicializa el pipeline captura → detección → render.
+
+        La captura corre en el hilo de CameraCapture. Este pipeline agrega un
+        hilo de detección + tracking, que ejecuta la inferencia de forma
+        continua, y un hilo de render, que dibuja y convierte el frame para la
+        interfaz. Las etapas se conectan con colas acotadas que descartan el
+        elemento más antiguo, así que el hilo de Tk solo toma el último
+        resultado listo.
+
+        Args:
+            camera (CameraCapture): Fuente de frames
+            detector (PersonDetector): Detector de personas, o None
+            tracker (SimpleTracker): Tracker de objetos
+            counter (OccupancyCounter): Contador de ocupación
+            render_fn (callable): render_fn(frame, tracked_objects) -> imagen lista para mostrar
+            motion_gate (MotionGate): Compuerta opcional para omitir frames estáticos
+            controller (AdaptiveDetectionController): Controlador opcional que decide
+                                                      el salto de frames entre detecciones
+            num_buffers (int): Buffers de trabajo reutilizados entre etapas
+            line_counter (LineCrossingCounter): Conteo opcional por líneas virtuales;
+                                                si se indica, la ocupación es
+                                                entradas - salidas
+            zones (ZoneOccupancy): Conteo opcional por zonas poligonales
+        """
+        self.camera = camera
+        self.detector = detector
+        self.tracker = tracker
+        self.counter = counter
+        self.render_fn = render_fn
+        self.motion_gate = motion_gate
+        self.controller = controller
+        self.line_counter = line_counter
+        self.zones = zones
+
+        self.render_queue = DropOldestQueue(maxsize=1)
+        self.display_queue = DropOldestQueue(maxsize=1)
+
+        self._buffers = [None] * num_buffers
+        self._next_buffer = 0
+        self._stop_event = threading.Event()
+        self._threads = []
+
+        self.detection_fps = 0.0
+        self.skipped_frames = 0
+
+    def start(self):
+        """Inicia los hilos de detección y render."""
+        self._stop_event.clear()
+        self._threads = [
+            threading.Thread(target=self._detection_loop, daemon=True),
+            threading.Thread(target=self._render_loop, daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        """Detiene los hilos y descarta los resultados pendientes."""
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self.render_queue.clear()
+        self.display_queue.clear()
+
+    def get_latest(self):
+        """
+        Obtiene el último resultado listo para mostrar, sin bloquear.
+
+        Returns:
+            dict: {'image', 'count', 'detection_fps', 'skipped'} o None
+        """
+        return self.display_queue.get_latest()
+
+    def _acquire_buffer(self, view):
+        """Copia el frame prestado en el siguiente buffer de trabajo."""
+        index = self._next_buffer
+        self._next_buffer = (index + 1) % len(self._buffers)
+
+        buffer = self._buffers[index]
+        if buffer is None or buffer.shape != view.shape:
+            buffer = self._buffers[index] = view.copy()
+        else:
+            np.copyto(buffer, view)
+        return buffer
+
+    def _detection_loop(self):
+        """Detecta y rastrea sobre el frame más reciente, tan rápido como la CPU lo permita."""
+        last_sequence = -1
+        tracked_sequence = -1  # Frame de la última actualización del tracker
+        frames = 0
+        window_start = time.time()
+
+        while not self._stop_event.is_set():
+            latest = self.camera.read_latest(last_sequence)
+            if latest is None:
+                time.sleep(0.002)
+                continue
+
+            view, last_sequence, _, skipped = latest
+            self.skipped_frames += skipped
+            frame = self._acquire_buffer(view)
+            if not self.camera.is_valid(last_sequence):
+                # La captura sobrescribió el slot durante la copia; se toma el siguiente
+                self.skipped_frames += 1
+                continue
+
+            if self.detector:
+                try:
+                    # En frames saltados o sin movimiento el tracker conserva su estado
+                    # anterior; al volver a detectar predice los frames transcurridos
+                    if ((self.controller is None or self.controller.should_detect()) and
+                            (self.motion_gate is None or self.motion_gate.should_detect(frame))):
+                        elapsed = last_sequence - tracked_sequence if tracked_sequence >= 0 else 1
+                        self.tracker.update(self.detector.detect_persons(frame), elapsed_frames=elapsed)
+                        tracked_sequence = last_sequence
+
+                    # La vista es una instantánea: el render no ve cambios del siguiente update
+                    tracked_objects = self.tracker.get_tracked_objects()
+                    if self.line_counter is not None:
+                        self.line_counter.update(tracked_objects)
+                        self.counter.update_count(self.line_counter.occupancy,
+                                                  tracked_objects.ids.tolist())
+                    else:
+                        self.counter.update_ids(tracked_objects.ids.tolist())
+                    if self.zones is not None:
+                        self.zones.update(tracked_objects, frame.shape)
+                except Exception as e:
+                    print(f"Error en detección: {e}")
+                    tracked_objects = {}
+            else:
+                tracked_objects = {}
+
+            frames += 1
+            elapsed = time.time() - window_start
+            if elapsed > 1.0:
+                self.detection_fps = frames / elapsed
+                frames = 0
+                window_start = time.time()
+
+            self.render_queue.put({
+                'frame': frame,
+                'tracked_objects': tracked_objects,
+                'count': self.counter.get_current_count()
+            })
+
+    def _render_loop(self):
+        """Dibuja las detecciones y prepara la imagen para la interfaz."""
+        while not self._stop_event.is_set():
+            item = self.render_queue.get(timeout=0.1)
+            if item is None:
+                continue
+
+            try:
+                image = self.render_fn(item['frame'], item['tracked_objects'])
+            except Exception as e:
+                print(f"Error renderizando frame: {e}")
+                continue
+
+            self.display_queue.put({
+                'image': image,
+                'count': item['count'],
+                'detection_fps': self.detection_fps,
+                'skipped': self.skipped_frames
+            })
@@ -0,0 +1,382 @@
+import multiprocessing as mp
+import queue
+import threading
+import time
+import numpy as np
+from src.capture.camera import CameraCapture
+from src.capture.shared_frames import SharedFrameTransport
+from src.tracking.factory import create_tracker
+
+SOURCE_ID_SHIFT = 32  # Los IDs del sitio son (índice de la fuente << 32) | ID local
+
+
+def _detector_process(transport, results, ready, detector_factory, batch_size, stop_event):
+    """
+    Worker de detección en un proceso propio.
+
+    Lee los frames del transporte sin copiarlos, infiere en lotes y solo
+    envía de vuelta las detecciones. Si un lote trae varios frames de la
+    misma fuente solo se infiere el más nuevo. Al cargar el modelo envía
+    None por ready, o el mensaje de error si no se pudo cargar.
+    """
+    try:
+        detector = detector_factory()
+    except Exception as e:
+        ready.put(f"{type(e).__name__}: {e}")
+        return
+    ready.put(None)
+
+    while not stop_event.is_set():
+        message = transport.receive(timeout=0.1)
+        if message is None:
+            continue
+        messages = [message] + transport.receive_available(batch_size - 1)
+
+        newest = {}
+        for index, source, sequence, _ in messages:
+            if source not in newest or sequence > newest[source][2]:
+                newest[source] = (index, source, sequence)
+        batch = list(newest.values())
+        try:
+            detections = detector.detect_persons_batch([transport.view(index) for index, _, _ in batch])
+        except Exception as e:
+            print(f"Error en detección: {e}")
+            detections = [None] * len(batch)
+
+        # Los frames descartados también se reportan para seguir el avance de cada fuente
+        for index, source, sequence, _ in messages:
+            if newest[source][0] != index:
+                results.put((source, sequence, None))
+        for (_, source, sequence), frame_detections in zip(batch, detections):
+            results.put((source, sequence, frame_detections))
+        for index, _, _, _ in messages:
+            transport.release(index)
+
+
+class SourceState:
+    def __init__(self, index, source, camera, tracker):
+        """
+        Estado de una fuente: su captura, su tracker y el último conteo.
+
+        Args:
+            index (int): Posición de la fuente en el runtime
+            source (int | str): Índice de cámara o ruta del video
+            camera (CameraCapture): Captura de la fuente
+            tracker (SimpleTracker): Tracker exclusivo de la fuente
+        """
+        self.index = index
+        self.source = source
+        self.camera = camera
+        self.tracker = tracker
+        self.buffer = None  # Copia del frame en proceso; la captura puede sobrescribir su slot
+        self.last_sequence = -1
+        self.tracked_sequence = -1  # Secuencia de la última actualización del tracker
+        self.busy = False
+        self.ids = np.empty(0, dtype=np.int64)
+        self.processed_frames = 0
+        self.skipped_frames = 0
+
+    @property
+    def count(self):
+        """Personas rastreadas actualmente en esta fuente."""
+        return len(self.ids)
+
+
+class MultiSourceRuntime:
+    def __init__(self, sources, detector_factory, counter, workers=2, batch_size=8,
+                 tracker_type="simple", tracker_options=None, width=1280, height=720,
+                 use_processes=False, transport_slots=None):
+        """
+        Inicializa el conteo de ocupación de un sitio con varias cámaras o videos.
+
+        Los frames de todas las fuentes se reparten entre un grupo compartido
+        de workers de detección, cada uno con un solo modelo, que toman el
+        frame más reciente de cada fuente libre y los infieren en un lote. Una
+        fuente nunca está en dos lotes a la vez, así que su tracker se
+        actualiza en orden. El conteo del sitio es la unión de los IDs de
+        todas las fuentes (las cámaras no deben solaparse).
+
+        Con use_processes los workers son procesos (sin competir por el GIL):
+        las cámaras decodifican en un SharedFrameTransport y los procesos leen
+        los frames de la memoria compartida; solo viajan índices y
+        detecciones. En ese modo detector_factory debe poder serializarse
+        (función de módulo o functools.partial).
+
+        Args:
+            sources (list): Índices de cámara (int) o rutas de video (str)
+            detector_factory (callable): Crea un PersonDetector; se llama una vez por worker
+            counter (OccupancyCounter): Contador de ocupación del sitio
+            workers (int): Workers de detección (modelos cargados)
+            batch_size (int): Frames máximos por lote (uno por fuente)
+            tracker_type (str): 'simple' o 'kalman'
+            tracker_options (dict): Argumentos adicionales del tracker de cada fuente
+            width (int): Ancho de captura de las cámaras
+            height (int): Alto de captura de las cámaras
+            use_processes (bool): Workers en procesos con frames en memoria compartida
+            transport_slots (int): Frames en tránsito en modo procesos; por defecto
+                                   dos por fuente
+        """
+        if not sources:
+            raise ValueError("Se necesita al menos una fuente")
+
+        self.detector_factory = detector_factory
+        self.counter = counter
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.use_processes = use_processes
+
+        self.transport = None
+        if use_processes:
+            self.transport = SharedFrameTransport(transport_slots or 2 * len(sources), width, height)
+        self.sources = [
+            SourceState(index, source,
+                        CameraCapture(source, width, height, transport=self.transport,
+                                      source_index=index),
+                        create_tracker(tracker_type, **(tracker_options or {})))
+            for index, source in enumerate(sources)
+        ]
+
+        self._schedule_lock = threading.Lock()
+        self._site_lock = threading.Lock()
+        self._next_source = 0
+        self._stop_event = threading.Event()
+        self._threads = []
+        self._processes = []
+        self._startup_errors = []
+
+    def start(self):
+        """
+        Carga los modelos de los workers de detección e inicia la captura.
+
+        Los detectores se inician antes que las cámaras: así los procesos no
+        se crean con hilos de captura en marcha y los videos no avanzan
+        mientras se cargan los modelos.
+        """
+        self._stop_event.clear()
+        if self.use_processes:
+            self._start_processes()
+        else:
+            self._start_threads()
+
+        for state in self.sources:
+            if not state.camera.start_capture():
+                self.stop()
+                raise Exception(f"No se pudo iniciar la fuente: {state.source}")
+
+    def _start_threads(self):
+        """Inicia los hilos de detección y espera a que carguen sus modelos."""
+        self._startup_errors = []
+        ready = threading.Barrier(self.workers + 1)
+        self._threads = [threading.Thread(target=self._worker_loop, args=(ready,), daemon=True)
+                         for _ in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+        ready.wait()  # Los modelos quedan cargados antes de retornar
+
+        if self._startup_errors:
+            self.stop()
+            raise Exception(f"No se pudo iniciar el detector: {self._startup_errors[0]}")
+
+    def _start_processes(self, poll_interval=0.5):
+        """Inicia los procesos de detección y el hilo que aplica sus resultados."""
+        self._results = mp.Queue()
+        self._process_stop = mp.Event()
+        ready = mp.Queue()
+        self._processes = [
+            mp.Process(target=_detector_process,
+                       args=(self.transport, self._results, ready, self.detector_factory,
+                             self.batch_size, self._process_stop),
+                       daemon=True)
+            for _ in range(self.workers)
+        ]
+        for process in self._processes:
+            process.start()
+
+        # Los modelos quedan cargados antes de retornar; un proceso que falla
+        # sin avisar (por ejemplo, terminado por el sistema) también se detecta
+        error = None
+        pending = len(self._processes)
+        while pending and error is None:
+            try:
+                error = ready.get(timeout=poll_interval)
+                pending -= 1
+            except queue.Empty:
+                if any(process.exitcode is not None for process in self._processes):
+                    # El error del proceso puede estar aún en camino
+                    try:
+                        error = ready.get(timeout=poll_interval)
+                    except queue.Empty:
+                        error = None
+                    error = error or "un proceso de detección terminó al cargar el modelo"
+        if error is not None:
+            self.stop()
+            raise Exception(f"No se pudo iniciar el detector: {error}")
+
+        self._threads = [threading.Thread(target=self._result_loop, daemon=True)]
+        self._threads[0].start()
+
+    def stop(self):
+        """Detiene los workers y la captura de todas las fuentes."""
+        for state in self.sources:
+            if state.camera.running:
+                state.camera.stop_capture()
+        if self._processes:
+            self._process_stop.set()
+            for process in self._processes:
+                process.join()
+            self._processes = []
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def close(self):
+        """Libera la memoria compartida del transporte, si existe."""
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+
+    def run(self, duration=None, poll_interval=0.1):
+        """
+        Procesa hasta que terminen todos los videos o se cumpla la duración.
+
+        Args:
+            duration (float): Segundos máximos; None espera a que terminen los videos
+            poll_interval (float): Segundos entre comprobaciones
+        """
+        self.start()
+        deadline = None if duration is None else time.time() + duration
+        try:
+            while deadline is None or time.time() < deadline:
+                if self._all_finished():
+                    break
+                if not self._workers_alive():
+                    raise Exception("Se detuvieron todos los workers de detección")
+                time.sleep(poll_interval)
+        finally:
+            self.stop()
+
+    def get_source_counts(self):
+        """Retorna el conteo actual de cada fuente."""
+        return {state.source: state.count for state in self.sources}
+
+    def _all_finished(self):
+        """Verifica si todas las fuentes son videos terminados y ya se procesaron."""
+        with self._schedule_lock:
+            return all(state.camera.finished and not state.busy and
+                       state.last_sequence == self._published_sequence(state)
+                       for state in self.sources)
+
+    def _workers_alive(self):
+        """Verifica que siga en marcha al menos un worker y, con procesos, el hilo de resultados."""
+        if self.use_processes:
+            return (any(process.is_alive() for process in self._processes) and
+                    all(thread.is_alive() for thread in self._threads))
+        return any(thread.is_alive() for thread in self._threads)
+
+    def _published_sequence(self, state):
+        """Secuencia del último frame publicado por la captura de una fuente."""
+        if self.transport is not None:
+            return state.camera.sequence
+        return state.camera.buffer.latest_sequence
+
+    def _result_loop(self):
+        """Aplica en orden las detecciones que envían los procesos de detección."""
+        while True:
+            try:
+                source, sequence, detections = self._results.get(timeout=0.1)
+            except queue.Empty:
+                # Los procesos ya terminaron y no quedan resultados por aplicar
+                if self._stop_event.is_set():
+                    break
+                continue
+
+            # Un resultado más viejo que el último aplicado llegó tarde desde otro proceso
+            state = self.sources[source]
+            if sequence <= state.last_sequence:
+                continue
+            state.skipped_frames += sequence - state.last_sequence - 1
+            state.last_sequence = sequence
+            if detections is not None:
+                self._apply(state, detections)
+                self._update_site()
+
+    def _worker_loop(self, ready):
+        """Toma lotes de frames, detecta y actualiza los trackers de sus fuentes."""
+        try:
+            detector = self.detector_factory()
+        except Exception as e:
+            self._startup_errors.append(f"{type(e).__name__}: {e}")
+            return
+        finally:
+            ready.wait()
+
+        while not self._stop_event.is_set():
+            batch = self._claim_batch()
+            if not batch:
+                time.sleep(0.005)
+                continue
+
+            try:
+                detections = detector.detect_persons_batch([state.buffer for state in batch])
+            except Exception as e:
+                print(f"Error en detección: {e}")
+                detections = [None] * len(batch)
+
+            for state, frame_detections in zip(batch, detections):
+                if frame_detections is not None:
+                    self._apply(state, frame_detections)
+                with self._schedule_lock:
+                    state.busy = False
+            self._update_site()
+
+    def _apply(self, state, detections):
+        """Actualiza el tracker de una fuente con las detecciones de un frame."""
+        # Los frames saltados o descartados desde la última actualización también transcurren
+        elapsed = state.last_sequence - state.tracked_sequence if state.tracked_sequence >= 0 else 1
+        state.tracker.update(detections, elapsed_frames=elapsed)
+        state.tracked_sequence = state.last_sequence
+        state.ids = state.tracker.get_tracked_objects().ids.copy()
+        state.processed_frames += 1
+
+    def _claim_batch(self):
+        """
+        Reserva el frame más reciente de hasta batch_size fuentes libres.
+
+        Las fuentes se recorren en turno rotativo para que ninguna quede sin
+        atender cuando hay más fuentes que lugares en el lote.
+        """
+        batch = []
+        with self._schedule_lock:
+            count = len(self.sources)
+            for offset in range(count):
+                state = self.sources[(self._next_source + offset) % count]
+                if state.busy:
+                    continue
+                latest = state.camera.read_latest(state.last_sequence)
+                if latest is None:
+                    continue
+
+                view, sequence, _, skipped = latest
+                if state.buffer is None or state.buffer.shape != view.shape:
+                    state.buffer = np.empty_like(view)
+                np.copyto(state.buffer, view)
+                state.last_sequence = sequence
+                state.skipped_frames += skipped
+                if not state.camera.is_valid(sequence):
+                    # La captura sobrescribió el slot durante la copia
+                    state.skipped_frames += 1
+                    continue
+                state.busy = True
+                batch.append(state)
+                if len(batch) == self.batch_size:
+                    break
+            self._next_source = (self._next_source + 1) % max(1, count)
+        return batch
+
+    def _update_site(self):
+        """Actualiza el contador del sitio con la unión de los IDs de todas las fuentes."""
+        site_ids = np.concatenate(
+            [(np.int64(state.index) << SOURCE_ID_SHIFT) | state.ids for state in self.sources])
+        with self._site_lock:
+            self.counter.update_ids(site_ids.tolist())
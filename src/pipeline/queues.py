@@ -0,0 +1,53 @@
+import threading
+from collections import deque
+
+class DropOldestQueue:
+    def __init__(self, maxsize=1):
+        """
+        Inicializa una cola acotada que descarta el elemento más antiguo.
+
+        A diferencia de queue.Queue, put() nunca bloquea: si la cola está
+        llena se descarta el elemento más viejo, de modo que un consumidor
+        lento nunca frena al productor.
+
+        Args:
+            maxsize (int): Número máximo de elementos en espera
+        """
+        self._items = deque(maxlen=maxsize)
+        self._condition = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item):
+        """Agrega un elemento, descartando el más antiguo si la cola está llena."""
+        with self._condition:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._condition.notify()
+
+    def get(self, timeout=None):
+        """
+        Obtiene el elemento más antiguo en espera.
+
+        Returns:
+            object: El elemento, o None si se agotó el tiempo de espera
+        """
+        with self._condition:
+            if not self._items:
+                self._condition.wait(timeout)
+            return self._items.popleft() if self._items else None
+
+    def get_latest(self):
+        """Obtiene el elemento más reciente sin bloquear y descarta el resto."""
+        with self._condition:
+            if not self._items:
+                return None
+            item = self._items.pop()
+            self.dropped += len(self._items)
+            self._items.clear()
+            return item
+
+    def clear(self):
+        """Descarta todos los elementos en espera."""
+        with self._condition:
+            self._items.clear()
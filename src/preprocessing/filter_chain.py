@@ -0,0 +1,186 @@
+import cv2
+import numpy as np
+from src.preprocessing.image_preprocessing import ImageProcessor
+
+# Espacio de color que requiere cada filtro: 'gray', o None si acepta cualquiera
+FILTER_SPACES = {
+    'grayscale': 'gray',
+    'denoise': None,
+    'normalize': None,
+    'histogram': None,
+    'clahe': None,
+    'erosion': 'gray',
+    'dilation': 'gray',
+    'opening': 'gray',
+    'closing': 'gray'
+}
+
+# Pares consecutivos que equivalen a una sola operación morfológica
+FUSIONS = {
+    ('erosion', 'dilation'): 'opening',
+    ('dilation', 'erosion'): 'closing'
+}
+
+MORPH_OPERATIONS = {
+    'opening': cv2.MORPH_OPEN,
+    'closing': cv2.MORPH_CLOSE
+}
+
+
+class FilterChain:
+    def __init__(self, steps, output='bgr', processor=None):
+        """
+        Inicializa una cadena declarativa de filtros.
+
+        Ejemplo: FilterChain(['grayscale', 'denoise', ('opening', {'kernel_size': 3}), 'histogram']).
+
+        La cadena se planifica una vez por tipo de entrada: se agregan solo
+        las conversiones de color necesarias (las operaciones morfológicas se
+        aplican en gris y se vuelve a BGR una sola vez al final), se omiten
+        conversiones redundantes y erosión + dilación con el mismo kernel se
+        fusionan en apertura (o cierre). Al ejecutarla, los resultados se
+        escriben con dst= en buffers propios de la cadena, reutilizados entre
+        llamadas, y los filtros que lo admiten trabajan en el mismo buffer. La
+        imagen de entrada nunca se modifica, así que sirve igual para frames
+        de video en vivo (de solo lectura) y para imágenes fijas.
+
+        Args:
+            steps (list): Nombres de filtro o tuplas (nombre, {parámetros})
+            output (str): Espacio de color del resultado ('bgr' o 'gray')
+            processor (ImageProcessor): Procesador que provee kernels y CLAHE en caché
+        """
+        if output not in ('bgr', 'gray'):
+            raise ValueError(f"Espacio de salida no soportado: {output}")
+
+        self.steps = []
+        for step in steps:
+            name, params = (step, {}) if isinstance(step, str) else (step[0], dict(step[1]))
+            if name not in FILTER_SPACES:
+                raise ValueError(f"Filtro no soportado: {name}")
+            self.steps.append((name, params))
+
+        self.output = output
+        self.processor = processor or ImageProcessor()
+        self._plans = {}
+        self._buffers = {}
+
+    def plan(self, input_space='bgr'):
+        """
+        Retorna las operaciones que se ejecutan para una entrada dada.
+
+        Args:
+            input_space (str): 'bgr' o 'gray'
+
+        Returns:
+            list: Tuplas (operación, parámetros), incluidas las conversiones de color
+        """
+        if input_space in self._plans:
+            return self._plans[input_space]
+
+        # Fusionar pares de operaciones morfológicas con los mismos parámetros
+        steps = []
+        for name, params in self.steps:
+            if steps and (steps[-1][0], name) in FUSIONS and steps[-1][1] == params:
+                steps[-1] = (FUSIONS[(steps[-1][0], name)], params)
+            else:
+                steps.append((name, params))
+
+        operations = []
+        space = input_space
+        for name, params in steps:
+            if FILTER_SPACES[name] == 'gray' and space != 'gray':
+                operations.append(('bgr2gray', {}))
+                space = 'gray'
+            if name != 'grayscale':
+                operations.append((name, params))
+        if space != self.output:
+            operations.append(('gray2bgr', {}) if self.output == 'bgr' else ('bgr2gray', {}))
+
+        self._plans[input_space] = operations
+        return operations
+
+    def apply(self, image):
+        """
+        Aplica la cadena a una imagen BGR o en gris.
+
+        El resultado es un buffer de la cadena que se sobrescribe en la
+        siguiente llamada; copiarlo si se necesita conservarlo.
+
+        Returns:
+            np.ndarray: Imagen filtrada en el espacio de salida
+        """
+        space = 'gray' if image.ndim == 2 else 'bgr'
+        current = image
+        for name, params in self.plan(space):
+            current = getattr(self, f"_{name}")(current, image, params)
+
+        # Sin operaciones se retorna una copia para no exponer la entrada
+        return current if current is not image else self._buffer('out', image.shape, image, copy=True)
+
+    def _buffer(self, key, shape, source=None, copy=False):
+        """Retorna el buffer reutilizable key con la forma indicada."""
+        buffer = self._buffers.get(key)
+        if buffer is None or buffer.shape != shape:
+            buffer = np.empty(shape, dtype=np.uint8)
+            self._buffers[key] = buffer
+        if copy:
+            np.copyto(buffer, source)
+        return buffer
+
+    def _target(self, current, image):
+        """Destino de un filtro que conserva la forma: en el mismo buffer salvo si es la entrada."""
+        if current is not image:
+            return current
+        return self._buffer('gray' if current.ndim == 2 else 'bgr', current.shape)
+
+    def _bgr2gray(self, current, image, params):
+        return cv2.cvtColor(current, cv2.COLOR_BGR2GRAY, dst=self._buffer('gray', current.shape[:2]))
+
+    def _gray2bgr(self, current, image, params):
+        return cv2.cvtColor(current, cv2.COLOR_GRAY2BGR, dst=self._buffer('bgr', current.shape + (3,)))
+
+    def _denoise(self, current, image, params):
+        kernel_size = params.get('kernel_size', 5)
+        return cv2.GaussianBlur(current, (kernel_size, kernel_size), 0, dst=self._target(current, image))
+
+    def _normalize(self, current, image, params):
+        return cv2.normalize(current, self._target(current, image), 0, 255, cv2.NORM_MINMAX)
+
+    def _erosion(self, current, image, params):
+        kernel = self.processor.get_kernel(params.get('kernel_size', 5), params.get('kernel_shape'))
+        return cv2.erode(current, kernel, dst=self._target(current, image))
+
+    def _dilation(self, current, image, params):
+        kernel = self.processor.get_kernel(params.get('kernel_size', 5), params.get('kernel_shape'))
+        return cv2.dilate(current, kernel, dst=self._target(current, image))
+
+    def _morphology(self, current, image, params, operation):
+        kernel = self.processor.get_kernel(params.get('kernel_size', 5), params.get('kernel_shape'))
+        return cv2.morphologyEx(current, operation, kernel, dst=self._target(current, image))
+
+    def _opening(self, current, image, params):
+        return self._morphology(current, image, params, MORPH_OPERATIONS['opening'])
+
+    def _closing(self, current, image, params):
+        return self._morphology(current, image, params, MORPH_OPERATIONS['closing'])
+
+    def _equalize_luma(self, current, image, to_space, from_space, equalize):
+        """Ecualiza solo el canal de luminancia de una imagen en color."""
+        converted = cv2.cvtColor(current, to_space, dst=self._buffer('luma_space', current.shape))
+        channel = cv2.extractChannel(converted, 0, dst=self._buffer('luma', current.shape[:2]))
+        equalize(channel, channel)
+        cv2.insertChannel(channel, converted, 0)
+        return cv2.cvtColor(converted, from_space, dst=self._target(current, image))
+
+    def _histogram(self, current, image, params):
+        if current.ndim == 2:
+            return cv2.equalizeHist(current, dst=self._target(current, image))
+        return self._equalize_luma(current, image, cv2.COLOR_BGR2YUV, cv2.COLOR_YUV2BGR,
+                                   lambda src, dst: cv2.equalizeHist(src, dst=dst))
+
+    def _clahe(self, current, image, params):
+        clahe = self.processor.get_clahe(params.get('clip_limit', 2.0), params.get('tile_grid_size', (8, 8)))
+        if current.ndim == 2:
+            return clahe.apply(current, dst=self._target(current, image))
+        return self._equalize_luma(current, image, cv2.COLOR_BGR2LAB, cv2.COLOR_LAB2BGR,
+                                   lambda src, dst: clahe.apply(src, dst=dst))
@@ -1,46 +1,104 @@
+import threading
+from collections import OrderedDict
 import cv2
-import numpy as np
+
+KERNEL_SHAPES = {
+    'rect': cv2.MORPH_RECT,
+    'ellipse': cv2.MORPH_ELLIPSE,
+    'cross': cv2.MORPH_CROSS
+}
 
 class ImageProcessor:
+    def __init__(self, cache_size=32, kernel_shape='rect'):
+        """
+        Inicializa el procesador de imágenes.
+
+        Los elementos estructurantes y los objetos CLAHE se crean una sola vez
+        por combinación de parámetros y se guardan en una caché LRU acotada,
+        de modo que aplicar filtros a cada frame de un video no reserva
+        kernels ni objetos nuevos.
+
+        Args:
+            cache_size (int): Kernels y objetos CLAHE máximos en caché
+            kernel_shape (str): Forma por defecto de los kernels ('rect', 'ellipse' o 'cross')
+        """
+        if kernel_shape not in KERNEL_SHAPES:
+            raise ValueError(f"Forma de kernel no soportada: {kernel_shape}")
+
+        self.cache_size = cache_size
+        self.kernel_shape = kernel_shape
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cached(self, key, factory):
+        """Retorna el objeto de la caché para key, creándolo con factory si no existe."""
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+            value = factory()
+            self._cache[key] = value
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return value
+
+    def get_kernel(self, kernel_size=5, kernel_shape=None):
+        """
+        Retorna el elemento estructurante (de solo lectura) para una forma y tamaño.
+
+        Args:
+            kernel_size (int): Lado del kernel
+            kernel_shape (str): 'rect', 'ellipse' o 'cross'; por defecto el del procesador
+        """
+        kernel_shape = kernel_shape or self.kernel_shape
+        if kernel_shape not in KERNEL_SHAPES:
+            raise ValueError(f"Forma de kernel no soportada: {kernel_shape}")
+
+        def create():
+            kernel = cv2.getStructuringElement(KERNEL_SHAPES[kernel_shape], (kernel_size, kernel_size))
+            kernel.flags.writeable = False
+            return kernel
+
+        return self._cached(('kernel', kernel_shape, kernel_size), create)
+
+    def get_clahe(self, clip_limit=2.0, tile_grid_size=(8, 8)):
+        """Retorna el objeto CLAHE para un límite de contraste y una grilla."""
+        tile_grid_size = tuple(tile_grid_size)
+        return self._cached(('clahe', clip_limit, tile_grid_size),
+                            lambda: cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=tile_grid_size))
+
     @staticmethod
     def convert_to_grayscale(image):
         """RF2: Conversión a escala de grises."""
         return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    
+
     @staticmethod
     def normalize_image(image):
         """RF2: Normalización de imagen."""
         return cv2.normalize(image, None, 0, 255, cv2.NORM_MINMAX)
-    
+
     @staticmethod
     def remove_noise(image, kernel_size=5):
         """RF2: Eliminación de ruido usando filtro gaussiano."""
         return cv2.GaussianBlur(image, (kernel_size, kernel_size), 0)
-    
-    @staticmethod
-    def morphological_opening(image, kernel_size=5):
+
+    def morphological_opening(self, image, kernel_size=5, kernel_shape=None):
         """RF3: Operación morfológica - Apertura."""
-        kernel = np.ones((kernel_size, kernel_size), np.uint8)
-        return cv2.morphologyEx(image, cv2.MORPH_OPEN, kernel)
-    
-    @staticmethod
-    def morphological_closing(image, kernel_size=5):
+        return cv2.morphologyEx(image, cv2.MORPH_OPEN, self.get_kernel(kernel_size, kernel_shape))
+
+    def morphological_closing(self, image, kernel_size=5, kernel_shape=None):
         """RF3: Operación morfológica - Cierre."""
-        kernel = np.ones((kernel_size, kernel_size), np.uint8)
-        return cv2.morphologyEx(image, cv2.MORPH_CLOSE, kernel)
-    
-    @staticmethod
-    def erosion(image, kernel_size=5):
+        return cv2.morphologyEx(image, cv2.MORPH_CLOSE, self.get_kernel(kernel_size, kernel_shape))
+
+    def erosion(self, image, kernel_size=5, kernel_shape=None):
         """RF3: Operación morfológica - Erosión."""
-        kernel = np.ones((kernel_size, kernel_size), np.uint8)
-        return cv2.erode(image, kernel, iterations=1)
-    
-    @staticmethod
-    def dilation(image, kernel_size=5):
+        return cv2.erode(image, self.get_kernel(kernel_size, kernel_shape), iterations=1)
+
+    def dilation(self, image, kernel_size=5, kernel_shape=None):
         """RF3: Operación morfológica - Dilatación."""
-        kernel = np.ones((kernel_size, kernel_size), np.uint8)
-        return cv2.dilate(image, kernel, iterations=1)
-    
+        return cv2.dilate(image, self.get_kernel(kernel_size, kernel_shape), iterations=1)
+
     @staticmethod
     def histogram_equalization(image):
         """RF4: Ecualización de histograma."""
@@ -52,17 +110,15 @@ class ImageProcessor:
         else:
             # Imagen en escala de grises
             return cv2.equalizeHist(image)
-    
-    @staticmethod
-    def adaptive_histogram_equalization(image):
+
+    def adaptive_histogram_equalization(self, image, clip_limit=2.0, tile_grid_size=(8, 8)):
         """RF4: Ecualización adaptativa de histograma."""
+        clahe = self.get_clahe(clip_limit, tile_grid_size)
         if len(image.shape) == 3:
             # Imagen en color
             lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
-            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
             lab[:,:,0] = clahe.apply(lab[:,:,0])
             return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
         else:
             # Imagen en escala de grises
-            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
             return clahe.apply(image)
@@ -0,0 +1,71 @@
+import cv2
+from src.preprocessing.image_preprocessing import ImageProcessor
+
+class MotionGate:
+    def __init__(self, threshold=0.005, refresh_interval=30, downscale_width=160,
+                 blur_size=5, pixel_threshold=25, processor=None):
+        """
+        Inicializa la compuerta de movimiento.
+
+        Decide si vale la pena ejecutar el detector comparando una versión
+        reducida, en gris y suavizada del frame contra la del último frame
+        que sí pasó por el detector.
+
+        Args:
+            threshold (float): Fracción mínima de píxeles cambiados (0-1)
+            refresh_interval (int): Forzar detección cada K frames aunque no haya movimiento
+            downscale_width (int): Ancho de la imagen reducida usada para comparar
+            blur_size (int): Tamaño del kernel gaussiano
+            pixel_threshold (int): Diferencia mínima de intensidad para considerar un píxel cambiado
+            processor (ImageProcessor): Procesador de imágenes a utilizar
+        """
+        self.threshold = threshold
+        self.refresh_interval = refresh_interval
+        self.downscale_width = downscale_width
+        self.blur_size = blur_size
+        self.pixel_threshold = pixel_threshold
+        self.processor = processor or ImageProcessor()
+
+        self.last_motion = 0.0
+        self._reference = None
+        self._frames_since_detection = 0
+
+    def _prepare(self, frame):
+        """Reduce, convierte a gris y suaviza el frame."""
+        height, width = frame.shape[:2]
+        scale = self.downscale_width / width
+        small = cv2.resize(frame, (self.downscale_width, max(1, int(height * scale))),
+                           interpolation=cv2.INTER_AREA)
+        if len(small.shape) == 3:
+            small = self.processor.convert_to_grayscale(small)
+        return self.processor.remove_noise(small, self.blur_size)
+
+    def should_detect(self, frame):
+        """
+        Indica si el frame debe pasar por el detector.
+
+        Returns:
+            bool: True si hubo movimiento suficiente o toca un refresco periódico
+        """
+        current = self._prepare(frame)
+
+        if self._reference is None or self._reference.shape != current.shape:
+            self.last_motion = 1.0
+        else:
+            diff = cv2.absdiff(current, self._reference)
+            _, changed = cv2.threshold(diff, self.pixel_threshold, 255, cv2.THRESH_BINARY)
+            self.last_motion = cv2.countNonZero(changed) / changed.size
+
+        self._frames_since_detection += 1
+        if (self.last_motion >= self.threshold or
+                self._frames_since_detection >= self.refresh_interval):
+            self._reference = current
+            self._frames_since_detection = 0
+            return True
+
+        return False
+
+    def reset(self):
+        """Olvida el frame de referencia; el siguiente frame siempre se detecta."""
+        self._reference = None
+        self._frames_since_detection = 0
@@ -0,0 +1,76 @@
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+
+
+def gated_assignment(track_points, detection_points, radius, cost_fn=None):
+    """
+    Asocia tracks y detecciones resolviendo solo los pares dentro del radio.
+
+    Primero se buscan con un KD-tree los pares candidatos (detecciones a
+    menos de `radius` de cada track); el grafo bipartito resultante se
+    separa en componentes conexas independientes y el algoritmo húngaro se
+    ejecuta por componente. Con multitudes dispersas el costo crece de
+    forma aproximadamente lineal en lugar de cúbica.
+
+    Args:
+        track_points (np.ndarray): Posiciones de los tracks (N, 2)
+        detection_points (np.ndarray): Posiciones de las detecciones (M, 2)
+        radius (float | np.ndarray): Radio de compuerta, global o uno por track (N,)
+        cost_fn (callable): cost_fn(rows, cols, distances) -> costo de cada par
+                            candidato; por defecto la distancia euclidiana
+
+    Returns:
+        tuple: (filas, columnas) de los pares asociados
+    """
+    empty = np.empty(0, dtype=np.int64)
+    n_tracks, n_detections = len(track_points), len(detection_points)
+    if n_tracks == 0 or n_detections == 0:
+        return empty, empty
+
+    # Pares candidatos dentro de la compuerta
+    tree = cKDTree(detection_points)
+    neighbours = tree.query_ball_point(track_points, r=radius)
+    counts = np.fromiter((len(n) for n in neighbours), dtype=np.int64, count=n_tracks)
+    if counts.sum() == 0:
+        return empty, empty
+    rows = np.repeat(np.arange(n_tracks), counts)
+    cols = np.fromiter((c for n in neighbours for c in n), dtype=np.int64, count=counts.sum())
+
+    distances = np.linalg.norm(np.asarray(track_points, dtype=np.float64)[rows] -
+                               np.asarray(detection_points, dtype=np.float64)[cols], axis=1)
+    costs = distances if cost_fn is None else cost_fn(rows, cols, distances)
+
+    # Componentes conexas del grafo bipartito (tracks 0..N-1, detecciones N..N+M-1)
+    size = n_tracks + n_detections
+    graph = coo_matrix((np.ones(len(rows)), (rows, cols + n_tracks)), shape=(size, size))
+    _, labels = connected_components(graph, directed=False)
+    edge_labels = labels[rows]
+
+    order = np.argsort(edge_labels, kind='stable')
+    rows, cols, costs, edge_labels = rows[order], cols[order], costs[order], edge_labels[order]
+    starts = np.flatnonzero(np.r_[True, edge_labels[1:] != edge_labels[:-1]])
+    ends = np.r_[starts[1:], len(rows)]
+
+    # Componentes de un solo par: asociación directa sin resolver nada
+    single = ends - starts == 1
+    matched_rows = [rows[starts[single]]]
+    matched_cols = [cols[starts[single]]]
+
+    for start, end in zip(starts[~single], ends[~single]):
+        comp_rows, comp_cols, comp_costs = rows[start:end], cols[start:end], costs[start:end]
+        track_ids, local_rows = np.unique(comp_rows, return_inverse=True)
+        detection_ids, local_cols = np.unique(comp_cols, return_inverse=True)
+
+        # Los pares fuera de la compuerta reciben un costo prohibitivo
+        forbidden = comp_costs.max() * (end - start) + 1.0
+        C = np.full((len(track_ids), len(detection_ids)), forbidden)
+        C[local_rows, local_cols] = comp_costs
+        r, c = linear_sum_assignment(C)
+        keep = C[r, c] < forbidden
+        matched_rows.append(track_ids[r[keep]])
+        matched_cols.append(detection_ids[c[keep]])
+
+    return np.concatenate(matched_rows), np.concatenate(matched_cols)
@@ -0,0 +1,96 @@
+import numpy as np
+from src.utils.constants import MAX_TRACKING_DISTANCE
+from src.tracking.assignment import gated_assignment
+
+COST_TYPES = ('centroid', 'iou', 'combined')
+
+
+def pair_iou(boxes_a, boxes_b):
+    """
+    Calcula el IoU de pares de cajas alineados, en un solo paso vectorizado.
+
+    Args:
+        boxes_a (np.ndarray): Cajas (K, 4) en formato (x1, y1, x2, y2)
+        boxes_b (np.ndarray): Cajas (K, 4) emparejadas con boxes_a por fila
+
+    Returns:
+        np.ndarray: IoU de cada par (K,)
+    """
+    boxes_a = np.asarray(boxes_a, dtype=np.float64)
+    boxes_b = np.asarray(boxes_b, dtype=np.float64)
+    top_left = np.maximum(boxes_a[:, :2], boxes_b[:, :2])
+    bottom_right = np.minimum(boxes_a[:, 2:], boxes_b[:, 2:])
+    intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=1)
+    area_a = np.prod(np.clip(boxes_a[:, 2:] - boxes_a[:, :2], 0, None), axis=1)
+    area_b = np.prod(np.clip(boxes_b[:, 2:] - boxes_b[:, :2], 0, None), axis=1)
+    union = area_a + area_b - intersection
+    return np.divide(intersection, union, out=np.zeros_like(union), where=union > 0)
+
+
+def box_scale(boxes):
+    """Tamaño característico de cada caja: raíz de su área, en píxeles."""
+    boxes = np.asarray(boxes, dtype=np.float64)
+    sides = np.clip(boxes[:, 2:] - boxes[:, :2], 0, None)
+    return np.sqrt(sides[:, 0] * sides[:, 1])
+
+
+class AssociationCost:
+    def __init__(self, cost="centroid", iou_weight=0.5, gate_scale=None,
+                 max_distance=MAX_TRACKING_DISTANCE, min_gate=10.0):
+        """
+        Inicializa el costo de asociación entre tracks y detecciones.
+
+        Con gate_scale=None la compuerta es fija (max_distance píxeles), como
+        el tracker original. Con un valor, el radio de cada track es
+        gate_scale veces el tamaño de su caja, de modo que el umbral se
+        adapta a la resolución y a la distancia de cada persona a la cámara.
+
+        Args:
+            cost (str): 'centroid' (distancia normalizada por el radio de la
+                        compuerta), 'iou' (1 - IoU) o 'combined' (suma ponderada)
+            iou_weight (float): Peso del término IoU en el costo 'combined' (0-1)
+            gate_scale (float): Radio de compuerta relativo al tamaño de la caja
+            max_distance (float): Radio de compuerta fijo si gate_scale es None
+            min_gate (float): Radio mínimo en píxeles con compuerta escalada
+        """
+        if cost not in COST_TYPES:
+            raise ValueError(f"Costo de asociación no soportado: {cost}")
+        self.cost = cost
+        self.iou_weight = iou_weight
+        self.gate_scale = gate_scale
+        self.max_distance = max_distance
+        self.min_gate = min_gate
+
+    def gate_radii(self, track_bboxes):
+        """Radio de compuerta de cada track (escalar si la compuerta es fija)."""
+        if self.gate_scale is None:
+            return float(self.max_distance)
+        return np.maximum(self.gate_scale * box_scale(track_bboxes), self.min_gate)
+
+    def assign(self, track_points, track_bboxes, detection_points, detection_bboxes):
+        """
+        Asocia tracks y detecciones con el costo configurado.
+
+        Args:
+            track_points (np.ndarray): Posición (actual o predicha) de cada track (N, 2)
+            track_bboxes (np.ndarray): Caja de cada track alineada con su posición (N, 4)
+            detection_points (np.ndarray): Centroides de las detecciones (M, 2)
+            detection_bboxes (np.ndarray): Cajas de las detecciones (M, 4)
+
+        Returns:
+            tuple: (filas, columnas) de los pares asociados
+        """
+        radii = self.gate_radii(track_bboxes) if len(track_bboxes) else self.max_distance
+
+        def pair_costs(rows, cols, distances):
+            # Todos los pares candidatos en un solo paso vectorizado
+            pair_radii = radii[rows] if isinstance(radii, np.ndarray) else radii
+            centroid_cost = distances / pair_radii
+            if self.cost == 'centroid':
+                return centroid_cost
+            iou_cost = 1.0 - pair_iou(track_bboxes[rows], detection_bboxes[cols])
+            if self.cost == 'iou':
+                return iou_cost
+            return self.iou_weight * iou_cost + (1.0 - self.iou_weight) * centroid_cost
+
+        return gated_assignment(track_points, detection_points, radii, pair_costs)
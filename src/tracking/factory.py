@@ -0,0 +1,25 @@
+from src.tracking.object_tracker import SimpleTracker
+from src.tracking.kalman_tracker import KalmanTracker
+
+TRACKER_TYPES = {
+    'simple': SimpleTracker,
+    'kalman': KalmanTracker
+}
+
+def create_tracker(tracker_type="simple", **kwargs):
+    """
+    Crea un tracker por nombre.
+
+    Todos los trackers exponen update(detections, elapsed_frames=1) y
+    get_tracked_objects(), por lo que son intercambiables.
+
+    Args:
+        tracker_type (str): 'simple' (último centroide) o 'kalman' (predictivo)
+        **kwargs: Argumentos del constructor del tracker
+
+    Returns:
+        object: Instancia del tracker
+    """
+    if tracker_type not in TRACKER_TYPES:
+        raise ValueError(f"Tipo de tracker no soportado: {tracker_type}")
+    return TRACKER_TYPES[tracker_type](**kwargs)
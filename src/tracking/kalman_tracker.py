@@ -0,0 +1,155 @@
+import numpy as np
+from src.utils.constants import MAX_TRACKING_DISTANCE
+from src.detection.detect import as_detection_array
+from src.tracking.track_store import TrackStore
+from src.tracking.costs import AssociationCost
+
+# Modelo de velocidad constante: estado [x, y, vx, vy]; la medición es [x, y],
+# por lo que H selecciona las dos primeras componentes (P[:, :2] en el código)
+F = np.array([[1, 0, 1, 0],
+              [0, 1, 0, 1],
+              [0, 0, 1, 0],
+              [0, 0, 0, 1]], dtype=np.float64)
+Q_BASE = np.array([[0.25, 0, 0.5, 0],
+                   [0, 0.25, 0, 0.5],
+                   [0.5, 0, 1, 0],
+                   [0, 0.5, 0, 1]], dtype=np.float64)
+
+
+def transition(elapsed_frames=1):
+    """
+    Retorna F y Q (con ruido de proceso unitario) para avanzar elapsed_frames frames.
+
+    Q es el ruido de aceleración blanca discreta: [[dt⁴/4, dt³/2], [dt³/2, dt²]]
+    por eje; con dt = 1 coincide con Q_BASE.
+    """
+    dt = float(elapsed_frames)
+    if dt == 1.0:
+        return F, Q_BASE
+    F_dt = F.copy()
+    F_dt[0, 2] = F_dt[1, 3] = dt
+    Q_dt = np.array([[dt ** 4 / 4, 0, dt ** 3 / 2, 0],
+                     [0, dt ** 4 / 4, 0, dt ** 3 / 2],
+                     [dt ** 3 / 2, 0, dt ** 2, 0],
+                     [0, dt ** 3 / 2, 0, dt ** 2]])
+    return F_dt, Q_dt
+
+
+class KalmanTracker:
+    def __init__(self, max_frames_without_detection=10, max_distance=MAX_TRACKING_DISTANCE,
+                 process_noise=1.0, measurement_noise=10.0, initial_capacity=64, cost=None,
+                 trajectory_length=32):
+        """
+        Inicializa el tracker predictivo tipo SORT.
+
+        El estado de todos los tracks (posición, velocidad y covarianza) vive
+        en arreglos contiguos de NumPy, de modo que la predicción y la
+        corrección se calculan para todos los tracks en un solo paso. La
+        asociación usa la posición predicha, lo que reduce los cambios de ID
+        con personas rápidas o frames sin detección.
+
+        Args:
+            max_frames_without_detection (int): Número máximo de frames sin detección
+                                                antes de eliminar un objeto.
+            max_distance (float): Distancia máxima entre predicción y detección
+                                  (si no se indica un costo).
+            process_noise (float): Varianza del ruido de aceleración del modelo.
+            measurement_noise (float): Varianza del ruido de medición del centroide.
+            initial_capacity (int): Tracks reservados inicialmente (crece al doble).
+            cost (AssociationCost): Costo y compuerta de asociación.
+            trajectory_length (int): Posiciones recientes guardadas por track.
+        """
+        self.max_frames_without_detection = max_frames_without_detection
+        self.max_distance = max_distance
+        self.cost = cost or AssociationCost(max_distance=max_distance)
+        self.process_noise = process_noise
+        self.Q = Q_BASE * process_noise
+        self.R = np.eye(2) * measurement_noise
+        self.P0 = np.diag([measurement_noise, measurement_noise, 100.0, 100.0])
+
+        self.store = TrackStore(initial_capacity, trajectory_length)
+        self.store.add_column('states', (4,))
+        self.store.add_column('covariances', (4, 4))
+
+    @property
+    def next_id(self):
+        """ID siguiente a asignar."""
+        return self.store.next_id
+
+    def update(self, detections, elapsed_frames=1):
+        """
+        Predice, asocia y corrige todos los tracks con las nuevas detecciones.
+
+        Args:
+            detections (np.ndarray): Arreglo DETECTION_DTYPE (o lista de diccionarios).
+            elapsed_frames (int): Frames transcurridos desde la actualización anterior;
+                                  mayor que 1 si hubo frames sin detección (compuerta
+                                  de movimiento, salto adaptativo o frames descartados),
+                                  para que la predicción no se atrase.
+
+        Returns:
+            int: Número de objetos actualmente rastreados.
+        """
+        detections = as_detection_array(detections)
+        store = self.store
+        slots = store.active_slots()
+
+        # Predicción vectorizada de todos los tracks activos
+        if len(slots):
+            F_dt, Q_dt = transition(max(1, elapsed_frames))
+            store.states[slots] = store.states[slots] @ F_dt.T
+            store.covariances[slots] = F_dt @ store.covariances[slots] @ F_dt.T + Q_dt * self.process_noise
+
+        # La caja de cada track se traslada a la posición predicha para el IoU
+        predicted = store.states[slots, :2]
+        bboxes = store.bboxes[slots]
+        offsets = np.rint(predicted - (bboxes[:, :2] + bboxes[:, 2:]) / 2.0).astype(np.int32)
+        rows, cols = self.cost.assign(predicted, bboxes + np.tile(offsets, 2),
+                                      detections['centroid'], detections['bbox'])
+        matched_slots, matched_dets = slots[rows], cols
+
+        # Corrección vectorizada de los tracks asociados
+        if len(matched_slots):
+            P = store.covariances[matched_slots]
+            z = detections['centroid'][matched_dets].astype(np.float64)
+            y = z - store.states[matched_slots, :2]
+            S = P[:, :2, :2] + self.R
+            K = P[:, :, :2] @ np.linalg.inv(S)
+            store.states[matched_slots] += (K @ y[:, :, np.newaxis])[:, :, 0]
+            store.covariances[matched_slots] = P - K @ P[:, :2, :]
+            store.bboxes[matched_slots] = detections['bbox'][matched_dets]
+
+        # La posición publicada es la estimación filtrada
+        if len(slots):
+            store.centroids[slots] = np.rint(store.states[slots, :2])
+
+        # Envejecer los no asociados y eliminar los perdidos
+        store.age(slots, matched_slots, self.max_frames_without_detection)
+
+        # Registrar detecciones nuevas
+        unmatched = np.ones(len(detections), dtype=bool)
+        unmatched[matched_dets] = False
+        self._register(detections[unmatched])
+
+        store.record_trajectories()
+        return len(store)
+
+    def _register(self, detections):
+        """Crea tracks para las detecciones no asociadas."""
+        if len(detections) == 0:
+            return
+
+        new = self.store.register(detections['centroid'], detections['bbox'])
+        self.store.states[new, :2] = detections['centroid']
+        self.store.states[new, 2:] = 0.0
+        self.store.covariances[new] = self.P0
+
+    def get_tracked_objects(self):
+        """
+        Retorna los objetos actualmente rastreados con sus datos asociados.
+
+        Returns:
+            TrackedObjectsView: Vista de solo lectura con la posición filtrada
+                                de cada objeto rastreado.
+        """
+        return self.store.view()
@@ -0,0 +1,187 @@
+from collections.abc import Mapping
+import numpy as np
+
+
+class TrackedObjectsView(Mapping):
+    def __init__(self, ids, centroids, bboxes, misses, previous=None, frame_index=0):
+        """
+        Vista de solo lectura de los objetos rastreados en un instante.
+
+        Expone los arreglos directamente (ids, centroids, bboxes, misses y
+        previous, la posición de cada track en la actualización anterior) y,
+        por compatibilidad, se comporta como el diccionario
+        {id: {'centroid', 'bbox', 'frames_without_detection'}} que retornaba
+        antes el tracker; los diccionarios por objeto solo se crean al
+        accederlos.
+        """
+        if previous is None:
+            previous = centroids.copy()
+        for array in (ids, centroids, bboxes, misses, previous):
+            array.flags.writeable = False
+        self.ids = ids
+        self.centroids = centroids
+        self.bboxes = bboxes
+        self.misses = misses
+        self.previous = previous
+        self.frame_index = frame_index  # Actualizaciones del tracker hasta esta vista
+        self._rows = None
+
+    def __getitem__(self, obj_id):
+        if self._rows is None:
+            self._rows = {obj_id: row for row, obj_id in enumerate(self.ids.tolist())}
+        row = self._rows[obj_id]
+        return {
+            'centroid': tuple(self.centroids[row].tolist()),
+            'bbox': self.bboxes[row].tolist(),
+            'frames_without_detection': int(self.misses[row])
+        }
+
+    def __iter__(self):
+        return iter(self.ids.tolist())
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class TrackStore:
+    def __init__(self, initial_capacity=64, trajectory_length=32):
+        """
+        Almacenamiento de tracks como estructura de arreglos.
+
+        Cada atributo de track es un arreglo de NumPy preasignado, indexado
+        por slot, con una máscara de slots activos. La capacidad crece al
+        doble cuando hace falta, de modo que registrar, envejecer y eliminar
+        tracks son operaciones sobre arreglos sin reservas por frame. La
+        trayectoria de cada track se guarda en un buffer circular acotado.
+
+        Args:
+            initial_capacity (int): Slots reservados inicialmente
+            trajectory_length (int): Posiciones guardadas por track (mínimo 2)
+        """
+        self.next_id = 0
+        self.frame_index = 0
+        self.trajectory_length = max(2, trajectory_length)
+        self.capacity = initial_capacity
+        self._columns = []
+        self.add_column('ids', (), np.int64)
+        self.add_column('centroids', (2,), np.int32)
+        self.add_column('bboxes', (4,), np.int32)
+        self.add_column('misses', (), np.int32)
+        self.add_column('active', (), bool)
+        self.add_column('trajectories', (self.trajectory_length, 2), np.int32)
+        self.add_column('steps', (), np.int64)  # Posiciones escritas en la trayectoria
+
+    def add_column(self, name, shape=(), dtype=np.float64):
+        """
+        Agrega un atributo por track que crecerá junto con el resto.
+
+        Args:
+            name (str): Nombre del atributo (queda accesible como store.<name>)
+            shape (tuple): Forma de cada elemento
+            dtype: Tipo de dato del arreglo
+        """
+        setattr(self, name, np.zeros((self.capacity,) + tuple(shape), dtype=dtype))
+        self._columns.append(name)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.active))
+
+    def active_slots(self):
+        """Retorna los índices de los slots activos."""
+        return np.flatnonzero(self.active)
+
+    def register(self, centroids, bboxes):
+        """
+        Registra tracks nuevos en slots libres.
+
+        Args:
+            centroids (np.ndarray): Centroides (N, 2)
+            bboxes (np.ndarray): Cajas (N, 4)
+
+        Returns:
+            np.ndarray: Slots asignados, para completar columnas adicionales
+        """
+        count = len(centroids)
+        free = np.flatnonzero(~self.active)
+        if len(free) < count:
+            self._grow(self.capacity - len(free) + count)
+            free = np.flatnonzero(~self.active)
+        slots = free[:count]
+
+        self.ids[slots] = np.arange(self.next_id, self.next_id + count)
+        self.next_id += count
+        self.centroids[slots] = centroids
+        self.bboxes[slots] = bboxes
+        self.misses[slots] = 0
+        self.steps[slots] = 0
+        self.active[slots] = True
+        return slots
+
+    def age(self, slots, matched_slots, max_misses):
+        """
+        Incrementa los frames sin detección y desactiva los tracks perdidos.
+
+        Args:
+            slots (np.ndarray): Slots activos al inicio del frame
+            matched_slots (np.ndarray): Slots asociados a una detección en este frame
+            max_misses (int): Frames sin detección tolerados
+
+        Returns:
+            np.ndarray: Slots desactivados
+        """
+        self.misses[slots] += 1
+        self.misses[matched_slots] = 0
+        removed = slots[self.misses[slots] > max_misses]
+        self.active[removed] = False
+        return removed
+
+    def record_trajectories(self):
+        """Agrega la posición actual de cada track activo a su trayectoria."""
+        slots = self.active_slots()
+        self.trajectories[slots, self.steps[slots] % self.trajectory_length] = self.centroids[slots]
+        self.steps[slots] += 1
+        self.frame_index += 1
+
+    def trajectory(self, obj_id):
+        """
+        Retorna la trayectoria reciente de un track, de la más antigua a la actual.
+
+        Args:
+            obj_id (int): ID del track
+
+        Returns:
+            np.ndarray: Posiciones (K, 2), vacío si el ID no está activo
+        """
+        slots = np.flatnonzero(self.active & (self.ids == obj_id))
+        if len(slots) == 0:
+            return np.empty((0, 2), dtype=np.int32)
+        slot = slots[0]
+        count = min(int(self.steps[slot]), self.trajectory_length)
+        order = (self.steps[slot] - count + np.arange(count)) % self.trajectory_length
+        return self.trajectories[slot, order]
+
+    def view(self):
+        """Retorna una vista de solo lectura de los tracks activos."""
+        slots = self.active_slots()
+
+        # Posición anterior: penúltimo punto de la trayectoria (el actual si es nuevo)
+        steps = self.steps[slots]
+        previous = self.trajectories[slots, (np.maximum(steps, 2) - 2) % self.trajectory_length]
+        previous[steps == 0] = self.centroids[slots[steps == 0]]
+
+        return TrackedObjectsView(self.ids[slots], self.centroids[slots],
+                                  self.bboxes[slots], self.misses[slots],
+                                  previous, self.frame_index)
+
+    def _grow(self, required):
+        """Duplica la capacidad de todas las columnas hasta alojar los slots requeridos."""
+        capacity = max(1, self.capacity)
+        while capacity < required:
+            capacity *= 2
+
+        for column in self._columns:
+            array = getattr(self, column)
+            grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+            grown[:len(array)] = array
+            setattr(self, column, grown)
+        self.capacity = capacity
@@ -20,7 +20,16 @@ class PersonDetectionGUI:
         self.tracker = None
         self.counter = None
         self.processor = None
+        self.filter_chains = {}
+        self.live_filter_chain = None
+        self.motion_gate = None
+        self.controller = None
+        self.line_counter = None
+        self.zones = None
+        self.pipeline = None
         self.logger = None
+        self.alert_sinks = []
+        self.ui_alerts = None
 
         self.running = False
         self.current_frame = None
@@ -212,25 +221,24 @@ class PersonDetectionGUI:
             self.alert_label.config(text="", foreground="green")
 
     def update_alerts(self):
-        """Actualiza las alertas basadas en la ocupación."""
-        if self.max_capacity <= 0:
+        """Actualiza las alertas según el nivel confirmado por el motor de alertas."""
+        if self.max_capacity <= 0 or not self.counter:
             return
 
-        if self.current_count >= self.max_capacity:
+        level = self.counter.alert_engine.level
+        if level == 'full':
             # Capacidad completa
             self.alert_label.config(
                 text="⚠️ CAPACIDAD COMPLETA - No se pueden admitir más personas",
                 foreground="red"
             )
-            # Reproducir sonido de alerta si está disponible
-            self.root.bell()
-        elif self.capacity_percentage >= 90:
+        elif level == 'critical':
             # Casi lleno
             self.alert_label.config(
                 text="⚠️ ALERTA: Capacidad casi completa (>90%)",
                 foreground="orange"
             )
-        elif self.capacity_percentage >= 75:
+        elif level == 'warning':
             # Advertencia
             self.alert_label.config(
                 text="⚠️ ADVERTENCIA: Alta ocupación (>75%)",
@@ -243,6 +251,10 @@ class PersonDetectionGUI:
                 foreground="green"
             )
 
+        # Sonido solo cuando el motor emite una alerta nueva, no en cada actualización
+        if self.ui_alerts and any(alert['level'] == 'full' for alert in self.ui_alerts.drain()):
+            self.root.bell()
+
     def show_statistics(self):
         """Muestra estadísticas detalladas en una ventana emergente."""
         if not self.counter:
@@ -281,6 +293,8 @@ class PersonDetectionGUI:
         ttk.Label(stats_frame, text=f"• Máximo registrado: {stats['max']} personas").pack(anchor="w")
         ttk.Label(stats_frame, text=f"• Mínimo registrado: {stats['min']} personas").pack(anchor="w")
         ttk.Label(stats_frame, text=f"• Promedio: {stats['average']:.1f} personas").pack(anchor="w")
+        ttk.Label(stats_frame,
+                  text=f"• Promedio en el tiempo: {stats['time_weighted_average']:.1f} personas").pack(anchor="w")
         ttk.Label(stats_frame, text=f"• Total de registros: {stats['total_records']}").pack(anchor="w")
 
         # Botón cerrar
@@ -293,25 +307,94 @@ class PersonDetectionGUI:
             from src.capture.camera import CameraCapture
             from src.detection.model_loader import ModelLoader
             from src.detection.detect import PersonDetector
-            from src.tracking.object_tracker import SimpleTracker
+            from src.detection.tiled import TiledPersonDetector
+            from src.detection.adaptive import AdaptiveDetectionController
+            from src.tracking.factory import create_tracker
+            from src.tracking.costs import AssociationCost
             from src.occupancy.count import OccupancyCounter
+            from src.occupancy.history import OccupancyHistory
+            from src.occupancy.store import OccupancyStore
+            from src.occupancy.line_crossing import LineCrossingCounter
+            from src.occupancy.zones import ZoneOccupancy
+            from src.occupancy.alerts import AlertEngine, LogSink, WebhookSink, UISink
             from src.preprocessing.image_preprocessing import ImageProcessor
+            from src.preprocessing.filter_chain import FilterChain
+            from src.preprocessing.motion_gate import MotionGate
             from src.system_logger import SystemLogger
+            from config import settings
 
             # Inicializar componentes
+            self.logger = SystemLogger()
             self.camera = CameraCapture()
 
-            model_loader = ModelLoader()
+            model_loader = ModelLoader(settings.YOLO_MODEL_PATH, backend=settings.MODEL_BACKEND,
+                                       imgsz=settings.MODEL_IMAGE_SIZE,
+                                       warmup_runs=settings.MODEL_WARMUP_RUNS)
             if model_loader.load_model():
                 self.detector = PersonDetector(model_loader.get_model())
+                if settings.TILED_DETECTION_ENABLED:
+                    self.detector = TiledPersonDetector(
+                        self.detector, tile_size=settings.TILE_SIZE, overlap=settings.TILE_OVERLAP,
+                        nms_threshold=settings.NMS_THRESHOLD,
+                        rois=settings.CAMERA_ROIS.get(settings.DEFAULT_CAMERA_INDEX))
                 print("Modelo YOLO cargado exitosamente")
             else:
                 print("No se pudo cargar el modelo YOLO - continuando sin detección")
 
-            self.tracker = SimpleTracker()
-            self.counter = OccupancyCounter(max_capacity=self.max_capacity)
+            cost = AssociationCost(settings.TRACKING_COST, iou_weight=settings.TRACKING_IOU_WEIGHT,
+                                   gate_scale=settings.TRACKING_GATE_SCALE)
+            self.tracker = create_tracker(settings.TRACKER_TYPE, cost=cost,
+                                          trajectory_length=settings.TRAJECTORY_LENGTH)
+            history_options = {
+                'capacity': settings.HISTORY_CAPACITY,
+                'retention_seconds': settings.HISTORY_RETENTION_HOURS * 3600,
+                'raw_window_seconds': settings.HISTORY_RAW_WINDOW_MINUTES * 60,
+                'downsample_seconds': settings.HISTORY_DOWNSAMPLE_SECONDS,
+                'snapshot_interval': settings.HISTORY_SNAPSHOT_INTERVAL
+            }
+            history = OccupancyHistory(**history_options)
+            store = None
+            if settings.OCCUPANCY_STORE_ENABLED:
+                store = OccupancyStore(settings.OCCUPANCY_DB_PATH,
+                                       batch_size=settings.OCCUPANCY_STORE_BATCH_SIZE,
+                                       snapshot_interval=settings.HISTORY_SNAPSHOT_INTERVAL)
+
+            # Las alertas se entregan en segundo plano al log, al webhook y a la interfaz
+            self.ui_alerts = UISink()
+            self.alert_sinks = [LogSink(self.logger), self.ui_alerts]
+            if settings.ALERT_WEBHOOK_URL:
+                self.alert_sinks.append(WebhookSink(settings.ALERT_WEBHOOK_URL))
+            alert_options = {
+                'hysteresis': settings.ALERT_HYSTERESIS,
+                'min_dwell_seconds': settings.ALERT_MIN_DWELL_SECONDS,
+                'rate_limit_seconds': settings.ALERT_RATE_LIMIT_SECONDS
+            }
+            self.counter = OccupancyCounter(max_capacity=self.max_capacity, history=history,
+                                            store=store,
+                                            alert_engine=AlertEngine(sinks=self.alert_sinks,
+                                                                     **alert_options))
+            if settings.COUNTING_LINES:
+                self.line_counter = LineCrossingCounter(settings.COUNTING_LINES)
+            if settings.CAMERA_ZONES.get(settings.DEFAULT_CAMERA_INDEX):
+                self.zones = ZoneOccupancy(settings.CAMERA_ZONES[settings.DEFAULT_CAMERA_INDEX],
+                                           alert_options=alert_options, sinks=self.alert_sinks,
+                                           history_options=history_options)
             self.processor = ImageProcessor()
-            self.logger = SystemLogger()
+            if settings.LIVE_FILTER_CHAIN:
+                # Cadena propia del hilo de render: sus buffers no se comparten con la GUI
+                self.live_filter_chain = FilterChain(settings.LIVE_FILTER_CHAIN, processor=ImageProcessor())
+            if settings.MOTION_GATE_ENABLED:
+                self.motion_gate = MotionGate(threshold=settings.MOTION_THRESHOLD,
+                                              refresh_interval=settings.MOTION_REFRESH_INTERVAL,
+                                              downscale_width=settings.MOTION_DOWNSCALE_WIDTH,
+                                              processor=self.processor)
+
+            if self.detector and settings.ADAPTIVE_CONTROL_ENABLED:
+                self.controller = AdaptiveDetectionController(
+                    self.detector, target_latency_ms=settings.ADAPTIVE_TARGET_LATENCY_MS,
+                    image_sizes=settings.ADAPTIVE_IMAGE_SIZES,
+                    max_stride=settings.ADAPTIVE_MAX_STRIDE, logger=self.logger)
+                self.detector = self.controller
 
             return True
         except Exception as e:
@@ -329,6 +412,15 @@ class PersonDetectionGUI:
                     return
 
             if self.camera.start_capture():
+                from src.pipeline.live_pipeline import LivePipeline
+
+                self.pipeline = LivePipeline(self.camera, self.detector, self.tracker, self.counter,
+                                             render_fn=self.render_frame,
+                                             motion_gate=self.motion_gate,
+                                             controller=self.controller,
+                                             line_counter=self.line_counter,
+                                             zones=self.zones)
+                self.pipeline.start()
                 self.running = True
                 self.status_label.config(text="Estado: Ejecutándose")
                 self.update_video()
@@ -340,57 +432,71 @@ class PersonDetectionGUI:
     def stop_camera(self):
         """Detiene la cámara y detección."""
         self.running = False
+        if self.pipeline:
+            self.pipeline.stop()
+            self.pipeline = None
         if self.camera:
+            # Conservar el último frame para captura y filtros
+            frame = self.camera.get_frame()
+            if frame is not None:
+                self.current_frame = frame
             self.camera.stop_capture()
         self.status_label.config(text="Estado: Detenido")
         if self.logger:
             self.logger.info("Sistema detenido")
 
     def update_video(self):
-        """Actualiza el video en tiempo real."""
-        if self.running and self.camera:
-            frame = self.camera.get_frame()
-            if frame is not None:
-                self.current_frame = frame.copy()
+        """Muestra el último frame procesado por el pipeline."""
+        if self.running and self.pipeline:
+            result = self.pipeline.get_latest()
+            if result is not None:
+                # Solo el blit ocurre en el hilo de Tk
+                photo = ImageTk.PhotoImage(result['image'])
+                self.original_label.config(image=photo)
+                self.original_label.image = photo
 
-                # Realizar detección si el detector está disponible
                 if self.detector:
-                    try:
-                        detections = self.detector.detect_persons(frame)
-                        count = self.tracker.update(detections)
-
-                        # Obtener IDs actuales para el contador
-                        tracked_objects = self.tracker.get_tracked_objects()
-                        current_ids = list(tracked_objects.keys())
-
-                        self.counter.update_ids(current_ids)
-                        self.current_count = self.counter.get_current_count()
-
-                        # Dibujar detecciones
-                        self.draw_detections(frame, tracked_objects)
-
-                        # Actualizar información
-                        self.count_label.config(text=f"Personas detectadas: {self.current_count}")
-                        self.update_capacity_display()
+                    self.current_count = result['count']
+                    self.count_label.config(text=f"Personas detectadas: {self.current_count}")
+                    self.update_capacity_display()
 
-                        # Procesar alertas
-                        alerts = self.counter.get_alerts()
-                        for alert in alerts:
-                            if self.logger:
-                                self.logger.warning(alert['message'])
-
-                    except Exception as e:
-                        print(f"Error en detección: {e}")
-
-                # Actualizar FPS
-                self.fps_label.config(text=f"FPS: {self.camera.get_fps():.1f}")
-
-                # Mostrar frame
-                self.display_frame(frame, self.original_label)
+                # Actualizar FPS de captura y de detección
+                self.fps_label.config(
+                    text=f"FPS: {self.camera.get_fps():.1f} (detección: {result['detection_fps']:.1f})")
 
         if self.running:
             self.root.after(50, self.update_video)
 
+    def render_frame(self, frame, tracked_objects):
+        """Dibuja las detecciones y prepara la imagen; se ejecuta en el hilo de render."""
+        if self.live_filter_chain:
+            frame = self.live_filter_chain.apply(frame)
+        if self.detector:
+            self.draw_detections(frame, tracked_objects)
+        if self.line_counter:
+            self.draw_counting_lines(frame)
+        if self.zones:
+            self.draw_zones(frame)
+        return self.to_display_image(frame)
+
+    def draw_zones(self, frame):
+        """Dibuja las zonas con su conteo actual."""
+        counts = self.zones.get_counts()
+        for name, polygon in zip(self.zones.names, self.zones.polygons):
+            cv2.polylines(frame, [polygon], True, (255, 128, 0), 2)
+            x, y = polygon.min(axis=0)
+            cv2.putText(frame, f'{name}: {counts[name]}', (int(x) + 5, int(y) + 20),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 128, 0), 2)
+
+    def draw_counting_lines(self, frame):
+        """Dibuja las líneas virtuales con sus entradas y salidas."""
+        for name, (x1, y1, x2, y2), entries, exits in zip(
+                self.line_counter.names, self.line_counter.lines.astype(int),
+                self.line_counter.entries, self.line_counter.exits):
+            cv2.line(frame, (x1, y1), (x2, y2), (0, 255, 255), 2)
+            cv2.putText(frame, f'{name}: +{entries} -{exits}', (x1 + 5, y1 + 20),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 2)
+
     def draw_detections(self, frame, tracked_objects):
         """Dibuja las detecciones en el frame."""
         COLORS = {
@@ -432,32 +538,43 @@ class PersonDetectionGUI:
             cv2.putText(frame, f'Ocupacion: {self.capacity_percentage:.1f}%', (20, 95),
                         cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
 
+    def to_display_image(self, frame):
+        """Redimensiona el frame y lo convierte a una imagen PIL para mostrar."""
+        # Redimensionar frame para ajustarse al widget
+        height, width = frame.shape[:2]
+        max_width, max_height = 600, 400
+
+        if width > max_width or height > max_height:
+            scale = min(max_width / width, max_height / height)
+            new_width = int(width * scale)
+            new_height = int(height * scale)
+            frame = cv2.resize(frame, (new_width, new_height))
+
+        # Convertir a formato compatible con Tkinter
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return Image.fromarray(frame_rgb)
+
     def display_frame(self, frame, label_widget):
         """Muestra un frame en el widget especificado."""
         try:
-            # Redimensionar frame para ajustarse al widget
-            height, width = frame.shape[:2]
-            max_width, max_height = 600, 400
-
-            if width > max_width or height > max_height:
-                scale = min(max_width / width, max_height / height)
-                new_width = int(width * scale)
-                new_height = int(height * scale)
-                frame = cv2.resize(frame, (new_width, new_height))
-
-            # Convertir a formato compatible con Tkinter
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            image = Image.fromarray(frame_rgb)
-            photo = ImageTk.PhotoImage(image)
+            photo = ImageTk.PhotoImage(self.to_display_image(frame))
 
             label_widget.config(image=photo)
             label_widget.image = photo
         except Exception as e:
             print(f"Error mostrando frame: {e}")
 
+    def get_current_frame(self):
+        """Retorna el frame actual: el último de la cámara si está activa."""
+        if self.running and self.camera:
+            frame = self.camera.get_frame()
+            if frame is not None:
+                self.current_frame = frame
+        return self.current_frame
+
     def capture_frame(self):
         """Captura el frame actual."""
-        if self.current_frame is not None:
+        if self.get_current_frame() is not None:
             try:
                 timestamp = time.strftime("%Y%m%d_%H%M%S")
                 filename = f"frame_{timestamp}.png"
@@ -503,7 +620,7 @@ class PersonDetectionGUI:
 
     def apply_filter(self, filter_type):
         """Aplica filtros de procesamiento a la imagen actual."""
-        if self.current_frame is None:
+        if self.get_current_frame() is None:
             messagebox.showwarning("Advertencia", "No hay imagen para procesar")
             return
 
@@ -511,34 +628,11 @@ class PersonDetectionGUI:
             self.initialize_components()
 
         try:
-            image = self.current_frame.copy()
-
-            if filter_type == 'grayscale':
-                processed = self.processor.convert_to_grayscale(image)
-                # Convertir de vuelta a BGR para mostrar
-                processed = cv2.cvtColor(processed, cv2.COLOR_GRAY2BGR)
-            elif filter_type == 'denoise':
-                processed = self.processor.remove_noise(image)
-            elif filter_type == 'histogram':
-                processed = self.processor.histogram_equalization(image)
-            elif filter_type == 'erosion':
-                gray = self.processor.convert_to_grayscale(image)
-                processed = self.processor.erosion(gray)
-                processed = cv2.cvtColor(processed, cv2.COLOR_GRAY2BGR)
-            elif filter_type == 'dilation':
-                gray = self.processor.convert_to_grayscale(image)
-                processed = self.processor.dilation(gray)
-                processed = cv2.cvtColor(processed, cv2.COLOR_GRAY2BGR)
-            elif filter_type == 'opening':
-                gray = self.processor.convert_to_grayscale(image)
-                processed = self.processor.morphological_opening(gray)
-                processed = cv2.cvtColor(processed, cv2.COLOR_GRAY2BGR)
-            elif filter_type == 'closing':
-                gray = self.processor.convert_to_grayscale(image)
-                processed = self.processor.morphological_closing(gray)
-                processed = cv2.cvtColor(processed, cv2.COLOR_GRAY2BGR)
-            else:
-                processed = image
+            if filter_type not in self.filter_chains:
+                from src.preprocessing.filter_chain import FilterChain
+                self.filter_chains[filter_type] = FilterChain([filter_type], processor=self.processor)
+            # La cadena no modifica current_frame; su resultado se reutiliza en la siguiente llamada
+            processed = self.filter_chains[filter_type].apply(self.current_frame).copy()
 
             self.processed_frame = processed
             self.display_frame(processed, self.processed_label)
@@ -582,4 +676,8 @@ class PersonDetectionGUI:
     def on_closing(self):
         """Maneja el cierre de la aplicación."""
         self.stop_camera()
+        if self.counter:
+            self.counter.close()
+        for sink in self.alert_sinks:
+            sink.close()
         self.root.destroy()
\ No newline at end of file
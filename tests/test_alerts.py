@@ -0,0 +1,133 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from src.occupancy.alerts import AlertEngine, WebhookSink, UISink
+
+
+def feed(engine, counts, max_capacity=100, start=0.0, step=1.0):
+    """Evalúa una secuencia de conteos (uno por segundo) y retorna los niveles alertados."""
+    alerts = []
+    for index, count in enumerate(counts):
+        alert = engine.evaluate(count, max_capacity, timestamp=start + index * step)
+        if alert is not None:
+            alerts.append(alert['level'])
+    return alerts
+
+
+def test_level_requires_min_dwell():
+    engine = AlertEngine(min_dwell_seconds=2.0, rate_limit_seconds=0.0)
+
+    # Un pico de un segundo no alcanza a confirmarse
+    assert feed(engine, [80, 50, 50]) == []
+    assert engine.level is None
+
+    assert feed(engine, [80, 80, 80], start=10.0) == ['warning']
+    assert engine.level == 'warning'
+
+
+def test_hysteresis_keeps_level_inside_band():
+    engine = AlertEngine(hysteresis=0.05, min_dwell_seconds=0.0, rate_limit_seconds=0.0)
+
+    assert feed(engine, [76]) == ['warning']
+    # Por debajo del umbral (75 %) pero dentro de la banda: no baja ni vuelve a alertar
+    assert feed(engine, [72, 76, 71, 76], start=1.0) == []
+    assert engine.level == 'warning'
+
+    # Por debajo del umbral menos la histéresis sí baja
+    assert feed(engine, [69], start=10.0) == []
+    assert engine.level is None
+
+
+def test_flicker_between_levels_confirms_once():
+    engine = AlertEngine(min_dwell_seconds=2.0, rate_limit_seconds=0.0)
+
+    alerts = feed(engine, [92, 100, 92, 100, 92, 100, 92, 100])
+    assert alerts == ['critical']
+
+
+def test_rate_limit_per_level():
+    engine = AlertEngine(min_dwell_seconds=0.0, rate_limit_seconds=60.0)
+
+    assert feed(engine, [80]) == ['warning']
+    assert feed(engine, [10], start=1.0) == []
+    # La misma alerta dentro del intervalo se suprime, pero otro nivel no
+    assert feed(engine, [80, 95], start=2.0) == ['critical']
+    assert feed(engine, [10, 80], start=100.0) == ['warning']
+
+
+def test_without_capacity_resets():
+    engine = AlertEngine(min_dwell_seconds=0.0)
+    assert feed(engine, [80]) == ['warning']
+    assert engine.evaluate(80, None) is None
+    assert engine.level is None
+
+
+def test_source_prefixes_message():
+    engine = AlertEngine(min_dwell_seconds=0.0, source='fila')
+    alert = engine.evaluate(100, 100, timestamp=0.0)
+    assert alert['source'] == 'fila'
+    assert alert['message'].startswith('[fila] ')
+    assert alert['remaining_capacity'] == 0
+
+
+def test_dispatch_to_ui_sink():
+    sink = UISink()
+    engine = AlertEngine(min_dwell_seconds=0.0, sinks=[sink])
+    engine.dispatch(engine.evaluate(80, 100, timestamp=0.0))
+    assert [alert['level'] for alert in sink.drain()] == ['warning']
+    assert sink.drain() == []
+
+
+@pytest.fixture
+def webhook_server():
+    """Servidor HTTP local que guarda el cuerpo JSON de cada POST."""
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers['Content-Length'])
+            received.append(json.loads(self.rfile.read(length)))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/alerts", received
+    server.shutdown()
+    server.server_close()
+
+
+def test_webhook_sink_posts_alerts(webhook_server):
+    url, received = webhook_server
+    sink = WebhookSink(url, timeout=2.0)
+    engine = AlertEngine(min_dwell_seconds=0.0, rate_limit_seconds=0.0, sinks=[sink])
+
+    for index, count in enumerate([80, 95, 100]):
+        alert = engine.evaluate(count, 100, timestamp=float(index))
+        engine.dispatch(alert)
+    sink.close(timeout=5.0)
+
+    assert [alert['level'] for alert in received] == ['warning', 'critical', 'full']
+    assert received[-1]['current_count'] == 100
+    assert sink.sent == 3 and sink.failed == 0
+
+
+def test_webhook_sink_does_not_block_on_failures():
+    # Puerto sin servidor: los envíos fallan en el hilo del sink, no en el llamador
+    sink = WebhookSink("http://127.0.0.1:9/alerts", timeout=0.5)
+    engine = AlertEngine(min_dwell_seconds=0.0, rate_limit_seconds=0.0, sinks=[sink])
+
+    started = time.perf_counter()
+    engine.dispatch(engine.evaluate(80, 100, timestamp=0.0))
+    assert time.perf_counter() - started < 0.1
+
+    sink.close(timeout=5.0)
+    assert sink.failed == 1 and sink.sent == 0
@@ -0,0 +1,69 @@
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from src.tracking.assignment import gated_assignment
+
+
+def brute_force(track_points, detection_points, radius):
+    """Húngaro sobre la matriz completa, descartando pares fuera del radio."""
+    D = np.linalg.norm(track_points[:, None] - detection_points[None], axis=2)
+    C = np.where(D <= radius, D, 1e9)
+    rows, cols = linear_sum_assignment(C)
+    keep = C[rows, cols] < 1e9
+    return rows[keep], cols[keep], D
+
+
+def test_empty_inputs():
+    rows, cols = gated_assignment(np.empty((0, 2)), np.array([[1.0, 1.0]]), 10.0)
+    assert len(rows) == len(cols) == 0
+    rows, cols = gated_assignment(np.array([[1.0, 1.0]]), np.empty((0, 2)), 10.0)
+    assert len(rows) == len(cols) == 0
+
+
+def test_pairs_outside_gate_are_not_matched():
+    tracks = np.array([[0.0, 0.0], [100.0, 0.0]])
+    detections = np.array([[5.0, 0.0], [160.0, 0.0]])
+    rows, cols = gated_assignment(tracks, detections, 20.0)
+    assert list(zip(rows.tolist(), cols.tolist())) == [(0, 0)]
+
+
+def test_per_track_radius():
+    tracks = np.array([[0.0, 0.0], [100.0, 0.0]])
+    detections = np.array([[15.0, 0.0], [115.0, 0.0]])
+    rows, cols = gated_assignment(tracks, detections, np.array([10.0, 20.0]))
+    assert list(zip(rows.tolist(), cols.tolist())) == [(1, 1)]
+
+
+def test_shared_candidates_are_solved_optimally():
+    # Dos tracks compiten por la detección del medio; el óptimo no es el voraz
+    tracks = np.array([[0.0, 0.0], [10.0, 0.0]])
+    detections = np.array([[8.0, 0.0], [-9.0, 0.0]])
+    rows, cols = gated_assignment(tracks, detections, 12.0)
+    assert sorted(zip(rows.tolist(), cols.tolist())) == [(0, 1), (1, 0)]
+
+
+def test_crowd_matches_brute_force():
+    rng = np.random.default_rng(0)
+    tracks = rng.uniform(0, 2000, size=(400, 2))
+    detections = tracks + rng.normal(0, 6, size=tracks.shape)
+    order = rng.permutation(len(detections))
+    detections = np.vstack([detections[order], rng.uniform(0, 2000, size=(50, 2))])
+    radius = 30.0
+
+    rows, cols = gated_assignment(tracks, detections, radius)
+    expected_rows, expected_cols, D = brute_force(tracks, detections, radius)
+
+    assert len(rows) == len(expected_rows)
+    assert np.isclose(D[rows, cols].sum(), D[expected_rows, expected_cols].sum())
+    assert (D[rows, cols] <= radius).all()
+    # Cada track y cada detección aparece como mucho una vez
+    assert len(set(rows.tolist())) == len(rows) and len(set(cols.tolist())) == len(cols)
+
+
+def test_custom_cost_function():
+    tracks = np.array([[0.0, 0.0]])
+    detections = np.array([[3.0, 0.0], [6.0, 0.0]])
+    # Un costo que prefiere la detección más lejana
+    rows, cols = gated_assignment(tracks, detections, 10.0,
+                                  cost_fn=lambda rows, cols, distances: 10.0 - distances)
+    assert cols.tolist() == [1]
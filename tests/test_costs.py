@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from src.tracking.costs import AssociationCost, box_scale, pair_iou
+
+
+def boxes_around(points, sizes):
+    """Cajas (x1, y1, x2, y2) centradas en cada punto con el lado indicado."""
+    points = np.asarray(points, dtype=np.float64)
+    half = np.asarray(sizes, dtype=np.float64)[:, None] / 2.0
+    return np.hstack([points - half, points + half]).astype(np.int32)
+
+
+def test_pair_iou():
+    a = np.array([[0, 0, 10, 10], [0, 0, 10, 10], [0, 0, 10, 10]])
+    b = np.array([[0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]])
+    assert np.allclose(pair_iou(a, b), [1.0, 50 / 150, 0.0])
+    # Cajas degeneradas no dividen por cero
+    assert pair_iou(np.array([[0, 0, 0, 0]]), np.array([[0, 0, 0, 0]])).tolist() == [0.0]
+
+
+def test_box_scale():
+    assert np.allclose(box_scale(np.array([[0, 0, 4, 9], [0, 0, 10, 10]])), [6.0, 10.0])
+
+
+def test_rejects_unknown_cost():
+    with pytest.raises(ValueError):
+        AssociationCost("appearance")
+
+
+def test_fixed_gate():
+    cost = AssociationCost(max_distance=20)
+    assert cost.gate_radii(np.zeros((3, 4))) == 20.0
+
+
+def test_scaled_gate_follows_box_size():
+    cost = AssociationCost(gate_scale=0.5, min_gate=10.0)
+    tracks = [(100, 100), (400, 100)]
+    track_boxes = boxes_around(tracks, [200, 10])
+    assert np.allclose(cost.gate_radii(track_boxes), [100.0, 10.0])
+
+    # La misma distancia (60 px) está dentro de la compuerta de la persona
+    # cercana (caja grande) y fuera de la de la lejana (caja pequeña)
+    detections = [(160, 100), (460, 100)]
+    rows, cols = cost.assign(np.array(tracks), track_boxes, np.array(detections),
+                             boxes_around(detections, [200, 10]))
+    assert list(zip(rows.tolist(), cols.tolist())) == [(0, 0)]
+
+
+def test_iou_cost_prefers_overlapping_box():
+    # Dos detecciones equidistantes del track; solo una tiene una caja parecida
+    track = np.array([[100, 100]])
+    track_box = boxes_around(track, [40])
+    detections = np.array([[110, 100], [90, 100]])
+    detection_boxes = np.vstack([boxes_around(detections[:1], [40]),
+                                 boxes_around(detections[1:], [8])])
+
+    centroid = AssociationCost("centroid", max_distance=50)
+    iou = AssociationCost("iou", max_distance=50)
+    combined = AssociationCost("combined", iou_weight=0.5, max_distance=50)
+
+    _, iou_cols = iou.assign(track, track_box, detections, detection_boxes)
+    _, combined_cols = combined.assign(track, track_box, detections, detection_boxes)
+    _, centroid_cols = centroid.assign(track, track_box, detections, detection_boxes)
+    assert iou_cols.tolist() == [0]
+    assert combined_cols.tolist() == [0]
+    assert len(centroid_cols) == 1
+
+
+def test_iou_cost_still_gated_by_distance():
+    track = np.array([[0, 0]])
+    detections = np.array([[200, 0]])
+    cost = AssociationCost("iou", max_distance=50)
+    rows, _ = cost.assign(track, boxes_around(track, [500]), detections,
+                          boxes_around(detections, [500]))
+    assert len(rows) == 0
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from src.capture.camera import CameraCapture
+from src.capture.frame_buffer import FrameRingBuffer
+
+
+def write_frame(buffer, value, timestamp=0.0):
+    """Escribe un frame de valor constante como lo hace la captura."""
+    index, slot = buffer.get_write_slot()
+    slot[:] = value
+    return buffer.commit(index, slot, timestamp)
+
+
+def test_read_latest_returns_newest_and_skipped():
+    buffer = FrameRingBuffer(num_slots=3, width=4, height=2)
+    assert buffer.read_latest() is None
+
+    for value in range(3):
+        write_frame(buffer, value, timestamp=float(value))
+
+    frame, sequence, timestamp, skipped = buffer.read_latest(last_sequence=0)
+    assert sequence == 2 and timestamp == 2.0 and skipped == 1
+    assert (frame == 2).all()
+    assert not frame.flags.writeable
+    assert buffer.read_latest(last_sequence=2) is None
+
+
+def test_slot_being_written_is_invalid():
+    buffer = FrameRingBuffer(num_slots=2, width=4, height=2)
+    write_frame(buffer, 1)
+    sequence = write_frame(buffer, 2)
+    _, old_sequence, _, _ = buffer.read_latest(last_sequence=0)
+    assert old_sequence == sequence == 1
+    assert buffer.is_valid(0) and buffer.is_valid(1)
+
+    # El productor toma el slot del frame 0 para escribir el frame 2
+    buffer.get_write_slot()
+    assert not buffer.is_valid(0)
+    assert buffer.is_valid(1)
+
+
+def test_commit_copies_frames_of_other_resolution():
+    buffer = FrameRingBuffer(num_slots=2, width=4, height=2)
+    index, _ = buffer.get_write_slot()
+    sequence = buffer.commit(index, np.full((3, 5, 3), 7, dtype=np.uint8), 0.0)
+
+    frame, latest, _, _ = buffer.read_latest()
+    assert latest == sequence == 0
+    assert frame.shape == (3, 5, 3) and (frame == 7).all()
+
+
+def test_requires_two_slots():
+    with pytest.raises(ValueError):
+        FrameRingBuffer(num_slots=1)
+
+
+def test_camera_allocates_buffer_only_without_transport(tmp_path):
+    camera = CameraCapture(str(tmp_path / "missing.avi"))
+    assert camera.buffer is None
+    assert camera.read_latest() is None
+    assert camera.get_frame() is None
+    assert not camera.is_valid(0)
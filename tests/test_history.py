@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from src.occupancy.history import OccupancyHistory
+
+START = datetime(2024, 1, 1, 8, 0, 0)
+
+
+def fill(history, seconds, ids_for=lambda i: [i // 10]):
+    """Agrega un registro por segundo; el conteo es i % 7 y los IDs cambian cada 10 s."""
+    for i in range(seconds):
+        history.append(START + timedelta(seconds=i), i % 7, ids_for(i))
+
+
+def test_retention_applies_before_history_is_full():
+    history = OccupancyHistory(capacity=10000, retention_seconds=100, raw_window_seconds=50,
+                               downsample_seconds=10)
+    fill(history, 600)
+
+    timestamps = history.get_timestamps()
+    last = (START + timedelta(seconds=599)).timestamp()
+    assert len(history) < 100
+    # La retención corre cada downsample_seconds
+    assert timestamps[0] >= last - 100 - 10
+
+
+def test_old_records_keep_the_peak_of_each_interval():
+    history = OccupancyHistory(capacity=10000, retention_seconds=10000, raw_window_seconds=60,
+                               downsample_seconds=10)
+    fill(history, 300)
+
+    timestamps = history.get_timestamps() - START.timestamp()
+    counts = history.get_counts()
+    old = timestamps < 300 - 60 - 10
+    buckets = np.floor(timestamps[old] / 10)
+    assert len(np.unique(buckets)) == len(buckets)
+    assert (counts[old] == 6).all()
+    assert list(timestamps) == sorted(timestamps)
+
+
+def test_raw_window_is_never_downsampled():
+    history = OccupancyHistory(capacity=100, retention_seconds=10000, raw_window_seconds=10000,
+                               downsample_seconds=10)
+    fill(history, 250)
+
+    timestamps = history.get_timestamps() - START.timestamp()
+    assert len(history) <= 100
+    # Al llenarse solo con registros recientes se descartan los más antiguos, sin huecos
+    assert timestamps[-1] == 249
+    assert (np.diff(timestamps) == 1).all()
+
+
+def test_ids_survive_compaction():
+    history = OccupancyHistory(capacity=100, retention_seconds=10000, raw_window_seconds=30,
+                               downsample_seconds=10, snapshot_interval=5)
+    fill(history, 400, ids_for=lambda i: [i // 10, 1000 + i // 25])
+
+    for row in range(len(history)):
+        second = int(history.get_timestamps()[row] - START.timestamp())
+        expected = [second // 10, 1000 + second // 25]
+        assert history.ids_at(row) == expected
+        assert history.ids_at_time(START + timedelta(seconds=second)) == expected
+
+
+def test_dwell_times_use_recorded_time():
+    history = OccupancyHistory()
+    for second, ids in [(0, [1]), (5, [1, 2]), (12, [2]), (20, [2, 3]), (30, [3])]:
+        history.append(START + timedelta(seconds=second), len(ids), ids)
+
+    # Los presentes cuentan hasta el último registro, no hasta la hora actual
+    assert history.dwell_times() == {1: 12.0, 2: 25.0, 3: 10.0}
+    assert history.dwell_time(3) == 10.0
+    assert history.dwell_time(3, now=START + timedelta(seconds=40)) == 20.0
+    assert history.dwell_time(99) == 0.0
+
+
+def test_dwell_times_replay_is_deterministic():
+    def replay():
+        history = OccupancyHistory(capacity=100, raw_window_seconds=30, downsample_seconds=10,
+                                   snapshot_interval=5)
+        fill(history, 400)
+        return history.dwell_times()
+
+    first = replay()
+    assert first == replay()
+    # Cada ID está 10 s; el último sigue presente hasta el registro de t = 399
+    assert first[39] == 9.0
+    assert all(first[obj_id] == 10.0 for obj_id in first if obj_id != 39)
@@ -0,0 +1,63 @@
+import numpy as np
+
+from src.detection.detect import DETECTION_DTYPE
+from src.tracking.costs import AssociationCost
+from src.tracking.factory import create_tracker
+from src.tracking.kalman_tracker import KalmanTracker, Q_BASE, transition
+
+
+def person_at(x, y, half=10):
+    """Una detección centrada en (x, y)."""
+    return np.array([((x - half, y - half, x + half, y + half), (x, y), 0.9)],
+                    dtype=DETECTION_DTYPE)
+
+
+def track_walk(tracker, skip, speed=10, frames_before=8):
+    """Sigue a una persona que camina a speed px/frame y se deja de detectar skip frames."""
+    for frame in range(frames_before):
+        tracker.update(person_at(100 + speed * frame, 200))
+    frame = frames_before - 1 + skip + 1
+    tracker.update(person_at(100 + speed * frame, 200), elapsed_frames=skip + 1)
+    return tracker.get_tracked_objects()
+
+
+def test_transition_matches_single_step():
+    F_1, Q_1 = transition(1)
+    assert np.array_equal(Q_1, Q_BASE)
+    # Dos pasos de un frame equivalen a un paso de dos frames en la media
+    F_2, _ = transition(2)
+    assert np.allclose(F_1 @ F_1, F_2)
+
+
+def test_prediction_covers_skipped_frames():
+    tracker = KalmanTracker(cost=AssociationCost(max_distance=20))
+    tracked = track_walk(tracker, skip=5)
+
+    # La persona sigue con el mismo ID aunque se movió 60 px desde la última detección
+    assert tracked.ids.tolist() == [0]
+    assert abs(tracked.centroids[0, 0] - (100 + 10 * 13)) <= 3
+
+
+def test_single_step_prediction_loses_track_after_skip():
+    # Sin contar los frames saltados la predicción se atrasa y la compuerta no alcanza
+    tracker = KalmanTracker(cost=AssociationCost(max_distance=20))
+    for frame in range(8):
+        tracker.update(person_at(100 + 10 * frame, 200))
+    tracker.update(person_at(100 + 10 * 13, 200))
+    assert tracker.next_id == 2
+
+
+def test_skipped_frames_widen_covariance():
+    one, many = KalmanTracker(), KalmanTracker()
+    for tracker in (one, many):
+        tracker.update(person_at(100, 100))
+    one.update(np.empty(0, dtype=DETECTION_DTYPE), elapsed_frames=1)
+    many.update(np.empty(0, dtype=DETECTION_DTYPE), elapsed_frames=5)
+    assert many.store.covariances[0, 0, 0] > one.store.covariances[0, 0, 0]
+
+
+def test_simple_tracker_accepts_elapsed_frames():
+    tracker = create_tracker("simple")
+    tracker.update(person_at(100, 100))
+    tracker.update(person_at(120, 100), elapsed_frames=3)
+    assert tracker.get_tracked_objects().ids.tolist() == [0]
@@ -0,0 +1,81 @@
+import numpy as np
+
+from src.detection.detect import DETECTION_DTYPE
+from src.occupancy.line_crossing import LineCrossingCounter
+from src.tracking.factory import create_tracker
+
+# Línea vertical de arriba hacia abajo: mirando de A a B, la derecha es x menor
+DOOR = {'name': 'puerta', 'points': (400, 0, 400, 720)}
+
+
+def people_at(*points):
+    return np.array([((x - 10, y - 10, x + 10, y + 10), (x, y), 0.9) for x, y in points],
+                    dtype=DETECTION_DTYPE)
+
+
+def walk(counter, tracker, path):
+    """Actualiza tracker y contador por cada posición; retorna las (entradas, salidas) por paso."""
+    results = []
+    for points in path:
+        tracker.update(people_at(*points))
+        results.append(counter.update(tracker.get_tracked_objects()))
+    return results
+
+
+def test_crossing_direction():
+    counter = LineCrossingCounter([DOOR])
+    tracker = create_tracker("simple")
+
+    # De la derecha (x < 400) a la izquierda es entrada
+    assert walk(counter, tracker, [[(370, 300)], [(390, 300)], [(410, 300)]]) == [(0, 0), (0, 0), (1, 0)]
+    # Y volver es salida
+    assert walk(counter, tracker, [[(390, 300)]]) == [(0, 1)]
+    assert counter.get_line_counts() == {'puerta': {'entries': 1, 'exits': 1}}
+    assert counter.occupancy == 0
+
+
+def test_invert_swaps_direction():
+    counter = LineCrossingCounter([dict(DOOR, invert=True)])
+    tracker = create_tracker("simple")
+    walk(counter, tracker, [[(390, 300)], [(410, 300)]])
+    assert counter.get_line_counts()['puerta'] == {'entries': 0, 'exits': 1}
+
+
+def test_passing_beyond_segment_end_is_not_counted():
+    counter = LineCrossingCounter([{'name': 'corta', 'points': (400, 0, 400, 100)}])
+    tracker = create_tracker("simple")
+    walk(counter, tracker, [[(390, 300)], [(410, 300)]])
+    assert counter.get_line_counts()['corta'] == {'entries': 0, 'exits': 0}
+
+
+def test_several_people_and_lines():
+    lines = [DOOR, {'name': 'pasillo', 'points': (0, 500, 800, 500)}]
+    counter = LineCrossingCounter(lines, initial_occupancy=2)
+    tracker = create_tracker("simple")
+    walk(counter, tracker, [[(390, 100), (600, 490)], [(410, 100), (600, 510)]])
+
+    counts = counter.get_line_counts()
+    assert counts['puerta'] == {'entries': 1, 'exits': 0}
+    assert counts['pasillo']['entries'] + counts['pasillo']['exits'] == 1
+    assert counter.occupancy == 2 + counter.entries.sum() - counter.exits.sum()
+
+
+def test_same_tracker_state_is_counted_once():
+    counter = LineCrossingCounter([DOOR])
+    tracker = create_tracker("simple")
+    walk(counter, tracker, [[(390, 300)], [(410, 300)]])
+
+    # Un frame omitido por la compuerta entrega la misma vista otra vez
+    assert counter.update(tracker.get_tracked_objects()) == (0, 0)
+    assert counter.entries.sum() == 1
+
+
+def test_occupancy_never_negative_and_reset():
+    counter = LineCrossingCounter([DOOR])
+    tracker = create_tracker("simple")
+    walk(counter, tracker, [[(410, 300)], [(390, 300)]])
+    assert counter.exits.sum() == 1 and counter.occupancy == 0
+
+    counter.reset(initial_occupancy=5)
+    assert counter.occupancy == 5
+    assert counter.get_line_counts()['puerta'] == {'entries': 0, 'exits': 0}
@@ -0,0 +1,116 @@
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from src.detection.detect import DETECTION_DTYPE
+from src.occupancy.count import OccupancyCounter
+from src.pipeline.multi_source import MultiSourceRuntime
+
+WIDTH, HEIGHT = 160, 120
+FRAMES = 30
+FPS = 30.0
+
+
+class BrightRegionDetector:
+    """Detector de prueba: una persona en la región clara del frame."""
+    batch_size = 8
+
+    def detect_persons_batch(self, frames):
+        return [self._detect(frame) for frame in frames]
+
+    @staticmethod
+    def _detect(frame):
+        ys, xs = np.nonzero(frame[:, :, 0] > 128)
+        if not len(xs):
+            return np.empty(0, dtype=DETECTION_DTYPE)
+        x1, y1, x2, y2 = xs.min(), ys.min(), xs.max(), ys.max()
+        return np.array([((x1, y1, x2, y2), ((x1 + x2) // 2, (y1 + y2) // 2), 0.9)],
+                        dtype=DETECTION_DTYPE)
+
+
+def create_detector():
+    return BrightRegionDetector()
+
+
+def failing_detector():
+    raise FileNotFoundError("modelo.pt")
+
+
+@pytest.fixture(scope="module")
+def video_paths(tmp_path_factory):
+    """Dos videos cortos, cada uno con un cuadrado claro que se desplaza (una persona)."""
+    directory = tmp_path_factory.mktemp("videos")
+    paths = []
+    for video_index in range(2):
+        path = str(directory / f"walk_{video_index}.avi")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), FPS, (WIDTH, HEIGHT))
+        for index in range(FRAMES):
+            frame = np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+            x = 10 + 3 * index
+            y = 20 + 50 * video_index
+            frame[y:y + 40, x:x + 20] = 255
+            writer.write(frame)
+        writer.release()
+        paths.append(path)
+    return paths
+
+
+def run_with_timeout(runtime, timeout=30.0):
+    """Ejecuta runtime.run() y falla si no termina a tiempo."""
+    errors = []
+
+    def target():
+        try:
+            runtime.run()
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "run() no terminó"
+    if errors:
+        raise errors[0]
+
+
+def create_runtime(sources, factory, use_processes):
+    return MultiSourceRuntime(sources, factory, OccupancyCounter(max_capacity=10), workers=2,
+                              batch_size=4, width=WIDTH, height=HEIGHT,
+                              use_processes=use_processes)
+
+
+@pytest.mark.parametrize("use_processes", [False, True], ids=["threads", "processes"])
+def test_runs_videos_to_completion(video_paths, use_processes):
+    runtime = create_runtime(video_paths, create_detector, use_processes)
+    try:
+        run_with_timeout(runtime)
+    finally:
+        runtime.close()
+
+    for state in runtime.sources:
+        assert state.processed_frames > 0
+        assert state.processed_frames + state.skipped_frames + state.camera.dropped_frames == FRAMES
+        assert state.count == 1
+
+    # Un ID por fuente, distintos en el sitio
+    assert runtime.counter.get_current_count() == 2
+    assert runtime.get_source_counts() == {path: 1 for path in video_paths}
+
+
+@pytest.mark.parametrize("use_processes", [False, True], ids=["threads", "processes"])
+def test_detector_load_failure_raises(video_paths, use_processes):
+    runtime = create_runtime(video_paths, failing_detector, use_processes)
+    try:
+        with pytest.raises(Exception, match="modelo.pt"):
+            run_with_timeout(runtime)
+    finally:
+        runtime.close()
+
+    assert not any(state.camera.running for state in runtime.sources)
+
+
+def test_rejects_empty_sources():
+    with pytest.raises(ValueError):
+        MultiSourceRuntime([], create_detector, OccupancyCounter())
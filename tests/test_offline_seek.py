@@ -0,0 +1,73 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.offline.parallel import _seek, split_segments
+
+FRAMES = 100
+
+
+@pytest.fixture(scope="module")
+def numbered_video(tmp_path_factory):
+    """Video cuyo frame i tiene intensidad 20 + 2 * i."""
+    path = str(tmp_path_factory.mktemp("videos") / "numbered.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 25.0, (64, 48))
+    for index in range(FRAMES):
+        writer.write(np.full((48, 64, 3), 20 + 2 * index, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+class InaccurateSeekCapture:
+    """Captura cuyo seek cae unos frames antes del pedido y reporta el índice pedido."""
+
+    def __init__(self, path, error=7):
+        self.cap = cv2.VideoCapture(path)
+        self.error = error
+        self.reported = 0
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            self.reported = value
+            if value > 0:
+                value = max(0, value - self.error)
+        return self.cap.set(prop, value)
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return self.reported
+        return self.cap.get(prop)
+
+    def grab(self):
+        self.reported += 1
+        return self.cap.grab()
+
+    def read(self):
+        self.reported += 1
+        return self.cap.read()
+
+
+def frame_number(frame):
+    return int(round((frame[:, :, 1].mean() - 20) / 2))
+
+
+@pytest.mark.parametrize("target", [0, 1, 10, 61, 99])
+def test_seek_is_frame_accurate(numbered_video, target):
+    cap = cv2.VideoCapture(numbered_video)
+    _seek(cap, target)
+    ret, frame = cap.read()
+    assert ret and frame_number(frame) == target
+
+
+@pytest.mark.parametrize("target", [5, 40, 75, 99])
+def test_seek_corrects_inaccurate_backend(numbered_video, target):
+    cap = InaccurateSeekCapture(numbered_video)
+    _seek(cap, target)
+    ret, frame = cap.read()
+    assert ret and frame_number(frame) == target
+
+
+def test_split_segments_cover_video():
+    segments = split_segments(FRAMES, 3)
+    assert segments[0][0] == 0 and segments[-1][1] == FRAMES
+    assert all(end == start for (_, end), (start, _) in zip(segments, segments[1:]))
@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.occupancy.count import OccupancyCounter
+from src.occupancy.history import OccupancyHistory
+from src.occupancy.store import OccupancyStore
+
+START = datetime(2024, 1, 1, 10, 0, 0)
+
+
+def at(seconds):
+    return START + timedelta(seconds=seconds)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "occupancy.db")
+
+
+def open_counter(db_path):
+    store = OccupancyStore(db_path, flush_interval=0.01, snapshot_interval=3)
+    return OccupancyCounter(history=OccupancyHistory(capacity=1000), store=store)
+
+
+def test_records_and_ids_persist(db_path):
+    store = OccupancyStore(db_path, flush_interval=0.01, snapshot_interval=2)
+    for second, ids in enumerate([[1], [1, 2], [2, 3], [3], []]):
+        store.append(at(second).timestamp(), len(ids), ids)
+    store.close()
+
+    reopened = OccupancyStore(db_path, flush_interval=0.01)
+    assert [count for _, count in reopened.query_counts()] == [1, 2, 2, 1, 0]
+    assert reopened.ids_at(at(2).timestamp()) == [2, 3]
+    assert reopened.ids_at(None) == []
+    summary = reopened.query_statistics()
+    assert (summary['samples'], summary['max'], summary['last_count']) == (5, 2, 0)
+    reopened.close()
+
+
+def test_flush_after_close_returns(db_path):
+    store = OccupancyStore(db_path, flush_interval=0.01)
+    store.append(at(0).timestamp(), 1, [1])
+    store.close()
+    store.flush()
+    assert store.get_state('missing', 'default') == 'default'
+
+
+def test_resume_restores_counts_rollups_and_history(db_path):
+    counter = open_counter(db_path)
+    for second, ids in enumerate([[1], [1, 2], [1, 2, 3], [2, 3], [3]]):
+        counter.update_ids(ids, timestamp=at(second * 10))
+    expected_hourly = counter.get_hourly_statistics()
+    expected_minutes = counter.get_rollups('minute')
+    counter.close()
+
+    resumed = open_counter(db_path)
+    assert resumed.get_current_count() == 1
+    assert resumed.get_peak_count() == 3
+    assert resumed.get_active_ids() == [3]
+    assert resumed.get_statistics()['total_records'] == 5
+    assert resumed.get_hourly_statistics() == expected_hourly
+    assert resumed.get_rollups('minute') == expected_minutes
+
+    assert list(resumed.history.get_counts()) == [1, 2, 3, 2, 1]
+    assert resumed.history.ids_at_time(at(25)) == [1, 2, 3]
+    assert resumed.get_ids_at(at(35)) == [2, 3]
+    resumed.close()
+
+
+def test_downtime_is_not_weighted_after_resume(db_path):
+    counter = open_counter(db_path)
+    counter.update_ids([1, 2], timestamp=at(0))
+    counter.update_ids([1, 2], timestamp=at(10))
+    counter.close()
+
+    # Media hora detenida, dentro del mismo intervalo horario
+    resumed = open_counter(db_path)
+    ids = list(range(8))
+    resumed.update_ids(ids, timestamp=at(1800))
+    resumed.update_ids(ids, timestamp=at(1810))
+
+    # (2 * 10 s + 8 * 10 s) / 20 s
+    assert resumed.get_statistics()['time_weighted_average'] == pytest.approx(5.0)
+    hour = resumed.get_hourly_statistics()[START.strftime('%Y-%m-%d %H:%M')]
+    assert hour['time_weighted_average'] == pytest.approx(5.0)
+    assert hour['samples'] == 4
+    resumed.close()
+
+
+def test_reset_session_starts_a_new_resumed_session(db_path):
+    counter = open_counter(db_path)
+    counter.update_ids([1, 2], timestamp=at(0))
+    counter.reset_session()
+    counter.close()
+
+    resumed = open_counter(db_path)
+    assert resumed.get_statistics() is None
+    assert len(resumed.history) == 0
+    resumed.close()